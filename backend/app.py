@@ -7,9 +7,8 @@ import traceback
 import json
 import decimal
 from datetime import date, datetime
-from config import LOG_FOLDER, SQL_SCRIPTS_FOLDER
-from utils.sql_helper import convert_md_to_sql_files
-from migrations.setup_db import run_migrations
+from config import FLASK_DEBUG, REPORT_SCHEDULER_ENABLED
+from utils.startup import configure_logging, run_startup_tasks
 
 # Özel JSON Encoder - Decimal ve Datetime objelerini serileştirmek için
 class CustomJSONEncoder(json.JSONEncoder):
@@ -21,51 +20,42 @@ class CustomJSONEncoder(json.JSONEncoder):
         return super(CustomJSONEncoder, self).default(obj)
 
 # Loglama yapılandırması
-os.makedirs(LOG_FOLDER, exist_ok=True)
-log_file = os.path.join(LOG_FOLDER, 'app.log')
+configure_logging()
 
-# Ana logger'ı yapılandır
-logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
+# Not: SQL şablonlarının dönüştürülmesi ve migration'lar import sırasında değil,
+# açılışta bir kez çalışır (gunicorn.conf.py'deki on_starting veya aşağıdaki __main__).
+# Böylece gunicorn'daki her worker bu işleri tekrarlamaz.
 
-# Dosya handler'ı
-file_handler = logging.FileHandler(log_file)
-file_handler.setLevel(logging.DEBUG)
-
-# Konsol handler'ı
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.DEBUG)
-
-# Format
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-console_handler.setFormatter(formatter)
-
-# Handler'ları ekle
-logger.addHandler(file_handler)
-logger.addHandler(console_handler)
-
-# SQL dosyalarının yolunu kontrol et
-sql_files_dir = os.path.join(SQL_SCRIPTS_FOLDER, "sql_files")
-if not os.path.exists(sql_files_dir):
-    os.makedirs(sql_files_dir, exist_ok=True)
-    logging.info("SQL dosyaları dizini oluşturuldu: %s", sql_files_dir)
-
-# MD formatındaki SQL dosyalarını SQL formatına dönüştür
+# Rapor şablonlarını belleğe yükle
 try:
-    convert_md_to_sql_files()
-    logging.info("SQL sorgularının dönüştürülmesi tamamlandı.")
+    from utils.report_registry import report_registry
+    report_registry.reload()
 except Exception as e:
-    logging.error("SQL sorgularının dönüştürülmesi sırasında hata: %s", str(e))
+    logging.error("Rapor kayıt defteri yüklenirken hata: %s", str(e))
     logging.error(traceback.format_exc())
 
-# Veritabanı migration'larını çalıştır
-try:
-    run_migrations()
-    logging.info("Veritabanı migrasyonları tamamlandı.")
-except Exception as e:
-    logging.error("Veritabanı migrasyonları sırasında hata: %s", str(e))
-    logging.error(traceback.format_exc())
+def start_background_services():
+    """
+    Şablon dosyalarını izleyen thread'i ve gösterge paneli zamanlayıcısını başlatır.
+    Import sırasında değil, yalnızca istekleri karşılayan süreçte çağrılır: gunicorn'da
+    her worker'ın post_worker_init kancasından, geliştirme sunucusunda reloader'ın
+    izleyici sürecinde değil uygulama sürecinde (aşağıdaki __main__).
+    """
+    try:
+        report_registry.start_watcher()
+    except Exception as e:
+        logging.error("Rapor şablonu izleyicisi başlatılırken hata: %s", str(e))
+        logging.error(traceback.format_exc())
+
+    # Her worker zamanlayıcıyı başlatır, işleri liderlik kirasını alan tek worker
+    # çalıştırır (bkz. utils/scheduler.py)
+    if REPORT_SCHEDULER_ENABLED:
+        try:
+            from utils.scheduler import report_scheduler
+            report_scheduler.start()
+        except Exception as e:
+            logging.error("Rapor zamanlayıcısı başlatılırken hata: %s", str(e))
+            logging.error(traceback.format_exc())
 
 # Uygulama ve Socket.IO başlatma
 app = Flask(__name__)
@@ -142,7 +132,15 @@ def server_error(error):
         'error_details': str(error) if app.debug else None
     }), 500
 
-# Başlat
+# Başlat (geliştirme sunucusu). Üretimde: gunicorn -c gunicorn.conf.py app:app
 if __name__ == '__main__':
+    # Reloader açıkken bu blok hem izleyici süreçte hem de uygulama sürecinde çalışır;
+    # açılış işleri yalnızca izleyici (veya reloader kapalıysa tek) süreçte yapılır.
+    if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        run_startup_tasks()
+        report_registry.reload()
+    # Arka plan thread'leri yalnızca istekleri karşılayan süreçte başlatılır
+    if not FLASK_DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_services()
     # socketio.run(app, host='0.0.0.0', port=8000, debug=True)
-    app.run(host='0.0.0.0', port=8000, debug=True) 
\ No newline at end of file
+    app.run(host='0.0.0.0', port=8000, debug=FLASK_DEBUG) 
\ No newline at end of file
@@ -16,10 +16,42 @@ SUPABASE_DATABASE = os.getenv('SUPABASE_DATABASE')
 SUPABASE_USER = os.getenv('SUPABASE_USER')
 SUPABASE_PASSWORD = os.getenv('SUPABASE_PASSWORD')
 
+# Veritabanı Bağlantı Havuzu Ayarları
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))  # Boş bağlantı bekleme süresi (saniye)
+DB_POOL_MAX_LIFETIME = int(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))  # Bağlantının en fazla yaşayacağı süre (saniye)
+DB_POOL_PING_INTERVAL = int(os.getenv('DB_POOL_PING_INTERVAL', '30'))  # Bu süreden uzun boşta kalan bağlantı SELECT 1 ile test edilir
+
+# Rapor sorguları bağlantı başına hazırlanmış ifade (PREPARE/EXECUTE) olarak çalıştırılır.
+# pgbouncer transaction modunda hata alınırsa otomatik olarak kapatılır.
+DB_PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', 'true').lower() in ('1', 'true', 'yes')
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv('DB_PREPARED_STATEMENT_CACHE_SIZE', '100'))  # Bağlantı başına en fazla ifade sayısı
+
+# Bağlantı Supabase transaction pooler'ı (pgbouncer, port 6543) üzerinden mi? Bu modda her
+# transaction farklı bir backend'e gidebilir; backend PID'i istemciye ait olmadığından rapor
+# işleri pg_cancel_backend ile iptal edilmez. Belirtilmezse port 6543 ise açık kabul edilir.
+DB_TRANSACTION_POOLER = os.getenv(
+    'DB_TRANSACTION_POOLER', str(':6543/' in (SUPABASE_URL or '') or SUPABASE_PORT == '6543')
+).lower() in ('1', 'true', 'yes')
+
 # Uygulama Ayarları
 SECRET_KEY = os.getenv('SECRET_KEY')
 JWT_SECRET = os.getenv('JWT_SECRET')
 JWT_EXPIRATION = 86400  # 24 saat (saniye cinsinden)
+FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'true').lower() in ('1', 'true', 'yes')  # Yalnızca geliştirme sunucusu (python app.py) için
+
+# Üretim sunucusu (gunicorn -c gunicorn.conf.py app:app)
+# Her worker ayrı bir süreçtir ve kendi bağlantı havuzunu (DB_POOL_MAX_SIZE) açar;
+# gevent/eventlet worker'larında bir worker içindeki eşzamanlı istekler (greenlet'ler)
+# veritabanını beklerken birbirine yol verir.
+GUNICORN_BIND = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+GUNICORN_WORKER_CLASS = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')  # gevent, eventlet, gthread veya sync
+GUNICORN_WORKERS = int(os.getenv('GUNICORN_WORKERS', '0'))  # 0: CPU çekirdeği sayısı
+GUNICORN_WORKER_CONNECTIONS = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '100'))  # Worker başına eşzamanlı greenlet sayısı
+GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', '4'))  # Yalnızca gthread worker'ı için
+GUNICORN_TIMEOUT = int(os.getenv('GUNICORN_TIMEOUT', '120'))  # Yanıt vermeyen worker'ın yeniden başlatılma süresi (saniye)
+GUNICORN_MAX_REQUESTS = int(os.getenv('GUNICORN_MAX_REQUESTS', '0'))  # Bu kadar istekten sonra worker yenilenir (0: kapalı)
 
 # Sistem ID'si (farklı kurulumlar için)
 # NOT: Bu ID artık kurulum sihirbazında kullanıcı tarafından girilecek
@@ -116,6 +148,75 @@ DEFAULT_ADMIN_PASSWORD = 'admin123'
 # SQL Sorgu Dosyaları Klasörü
 SQL_SCRIPTS_FOLDER = os.path.join(os.path.dirname(__file__), 'sql_scripts')
 
+# Rapor şablonu değişikliklerinin kontrol aralığı (saniye)
+REPORT_REGISTRY_POLL_INTERVAL = int(os.getenv('REPORT_REGISTRY_POLL_INTERVAL', '5'))
+
+# Rapor Sonuç Önbelleği Ayarları
+REPORT_CACHE_MAX_BYTES = int(os.getenv('REPORT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+REPORT_CACHE_DEFAULT_TTL = int(os.getenv('REPORT_CACHE_DEFAULT_TTL', '300'))  # report_metadata.json'da cacheTtl yoksa (saniye)
+REPORT_CACHE_WATERMARK_INTERVAL = int(os.getenv('REPORT_CACHE_WATERMARK_INTERVAL', '5'))  # MAX(created_date) kontrol aralığı (saniye)
+
+# Kurulum durumu, tablo listesi ve tablo şeması önbelleğinin geçerlilik süresi (saniye).
+# Kurulum, sıfırlama ve tablo adı değişikliklerinde önbellek ayrıca hemen yenilenir.
+SCHEMA_CACHE_TTL = int(os.getenv('SCHEMA_CACHE_TTL', '300'))
+
+# HTTP önbellek başlıkları ve sıkıştırma (report_bp, admin_bp)
+REPORT_HTTP_MAX_AGE = int(os.getenv('REPORT_HTTP_MAX_AGE', '30'))  # Rapor sonucunun tarayıcıda sormadan kullanılabileceği süre (saniye, en fazla cacheTtl)
+REPORT_HTTP_STALE_WHILE_REVALIDATE = int(os.getenv('REPORT_HTTP_STALE_WHILE_REVALIDATE', '300'))  # Yenilenirken eski sonucun gösterilebileceği süre (saniye)
+HTTP_GZIP_MIN_BYTES = int(os.getenv('HTTP_GZIP_MIN_BYTES', '1024'))  # Bu boyuttan büyük JSON yanıtları gzip'lenir
+HTTP_GZIP_LEVEL = int(os.getenv('HTTP_GZIP_LEVEL', '6'))
+
+# Akış (streaming) modunda sunucudan tek seferde çekilecek satır sayısı
+REPORT_STREAM_BATCH_SIZE = int(os.getenv('REPORT_STREAM_BATCH_SIZE', '2000'))
+
+# Sayfalı rapor çalıştırmada izin verilen en büyük sayfa boyutu
+REPORT_MAX_PAGE_SIZE = int(os.getenv('REPORT_MAX_PAGE_SIZE', '1000'))
+
+# Özet (rollup) tabloları ayarları (rollup_hourly, sessions, qa_pairs, word_counts, message_topics)
+ROLLUP_REFRESH_INTERVAL = int(os.getenv('ROLLUP_REFRESH_INTERVAL', '60'))  # Rapor öncesi özet güncelleme aralığı (saniye)
+ROLLUP_OVERLAP_HOURS = int(os.getenv('ROLLUP_OVERLAP_HOURS', '1'))  # Geç yazılan mesajlar için geriye dönük yeniden hesaplanan saat sayısı
+ROLLUP_BACKFILL_DAYS = int(os.getenv('ROLLUP_BACKFILL_DAYS', '7'))  # İlk oluşturmada tek transaction'da işlenen gün sayısı
+QA_FILL_RESPONSE_TIME = os.getenv('QA_FILL_RESPONSE_TIME', 'true').lower() in ('1', 'true', 'yes')  # Mesaj tablosundaki response_time kolonunu soru-cevap çiftlerinden doldur
+TOPIC_LABEL_BATCH_SIZE = int(os.getenv('TOPIC_LABEL_BATCH_SIZE', '5000'))  # Konu etiketlemede veritabanından tek seferde okunan mesaj sayısı
+
+# Rapor çalıştırma metrikleri (/api/admin/perf)
+REPORT_METRICS_BUFFER_SIZE = int(os.getenv('REPORT_METRICS_BUFFER_SIZE', '2000'))  # Bellekte tutulan son çalıştırma sayısı
+REPORT_METRICS_PERSIST = os.getenv('REPORT_METRICS_PERSIST', 'true').lower() in ('1', 'true', 'yes')  # report_runs tablosuna yaz
+REPORT_SLOW_QUERY_MS = float(os.getenv('REPORT_SLOW_QUERY_MS', '2000'))  # Bu sürenin üzerindeki çalıştırmalar yavaş sayılır
+REPORT_AUTO_EXPLAIN = os.getenv('REPORT_AUTO_EXPLAIN', 'false').lower() in ('1', 'true', 'yes')  # Yavaş sorguların planını EXPLAIN ANALYZE ile kaydet
+REPORT_AUTO_EXPLAIN_COOLDOWN = int(os.getenv('REPORT_AUTO_EXPLAIN_COOLDOWN', '300'))  # Aynı rapor için iki plan arasındaki en kısa süre (saniye)
+REPORT_METRICS_RETENTION_DAYS = int(os.getenv('REPORT_METRICS_RETENTION_DAYS', '30'))  # Bu süreden eski report_runs kayıtları silinir (gün, 0 = süresiz)
+REPORT_METRICS_CLEANUP_INTERVAL = int(os.getenv('REPORT_METRICS_CLEANUP_INTERVAL', '3600'))  # Zamanlayıcının eski kayıtları silme aralığı (saniye, 0 = kapalı)
+
+# Toplu rapor çalıştırma (/api/reports/batch)
+REPORT_BATCH_MAX_REPORTS = int(os.getenv('REPORT_BATCH_MAX_REPORTS', '20'))  # Tek istekte çalıştırılabilecek en fazla rapor
+REPORT_BATCH_WORKERS = int(os.getenv('REPORT_BATCH_WORKERS', '4'))  # Eşzamanlı çalışan rapor sayısı (tüm istekler için ortak)
+REPORT_BATCH_TIMEOUT = float(os.getenv('REPORT_BATCH_TIMEOUT', '60'))  # Toplu isteğin en uzun bekleme süresi (saniye)
+
+# Arka planda çalışan rapor işleri (/api/reports/<rapor>/jobs)
+REPORT_JOB_WORKERS = int(os.getenv('REPORT_JOB_WORKERS', '2'))  # Aynı anda çalışan iş sayısı (süreç başına)
+REPORT_JOB_TIMEOUT = int(os.getenv('REPORT_JOB_TIMEOUT', '600'))  # İş sorgularının statement_timeout değeri (saniye, 0 = sınırsız)
+REPORT_JOB_RETENTION_HOURS = int(os.getenv('REPORT_JOB_RETENTION_HOURS', '24'))  # Biten işlerin ve sonuçlarının saklanma süresi
+REPORT_JOB_CLEANUP_INTERVAL = int(os.getenv('REPORT_JOB_CLEANUP_INTERVAL', '300'))  # Eski işlerin temizlenme sıklığı (saniye)
+
+# Denetim kayıtları (logs tablosu) arka planda topluca yazılır (utils/audit_log.py)
+AUDIT_LOG_QUEUE_SIZE = int(os.getenv('AUDIT_LOG_QUEUE_SIZE', '10000'))  # Bekleyen en fazla kayıt; doluysa kayıt istek içinde yazılır
+AUDIT_LOG_BATCH_SIZE = int(os.getenv('AUDIT_LOG_BATCH_SIZE', '200'))  # Tek INSERT ile yazılan en fazla kayıt
+AUDIT_LOG_FLUSH_INTERVAL = float(os.getenv('AUDIT_LOG_FLUSH_INTERVAL', '1'))  # Parti dolmasa da yazmadan önce beklenen en uzun süre (saniye)
+AUDIT_LOG_RETENTION_DAYS = int(os.getenv('AUDIT_LOG_RETENTION_DAYS', '365'))  # Bu süreden eski aylık bölümler silinir (gün, 0 = süresiz)
+AUDIT_LOG_PARTITIONS_AHEAD = int(os.getenv('AUDIT_LOG_PARTITIONS_AHEAD', '2'))  # Önceden oluşturulan gelecek ay bölümü sayısı
+AUDIT_LOG_MAINTENANCE_INTERVAL = int(os.getenv('AUDIT_LOG_MAINTENANCE_INTERVAL', '3600'))  # Zamanlayıcının bölüm bakımı aralığı (saniye, 0 = kapalı)
+AUDIT_LOG_EXACT_COUNT_BELOW = int(os.getenv('AUDIT_LOG_EXACT_COUNT_BELOW', '10000'))  # /api/admin/logs toplamı bu tahminin altındaysa kesin sayılır
+
+# Gösterge paneli raporlarını önceden hesaplayan zamanlayıcı (utils/scheduler.py)
+REPORT_SCHEDULER_ENABLED = os.getenv('REPORT_SCHEDULER_ENABLED', 'true').lower() in ('1', 'true', 'yes')  # Tüm worker'lar arasında kira (lease) kaydı ile tek lider çalışır
+REPORT_SCHEDULER_TICK = float(os.getenv('REPORT_SCHEDULER_TICK', '5'))  # Lider worker'ın zamanı gelen işleri kontrol aralığı (saniye)
+REPORT_SCHEDULER_LEADER_RETRY = float(os.getenv('REPORT_SCHEDULER_LEADER_RETRY', '30'))  # Lider olmayan worker'ların liderliği yeniden deneme aralığı (saniye)
+REPORT_SCHEDULER_LEASE_TTL = float(os.getenv('REPORT_SCHEDULER_LEASE_TTL', '60'))  # Liderlik kirasının süresi; lider bu süre içinde yenilemezse başka worker devralır (saniye)
+REPORT_SCHEDULER_ROLLUP_INTERVAL = int(os.getenv('REPORT_SCHEDULER_ROLLUP_INTERVAL', '60'))  # Özet tablolarının güncellenme aralığı (saniye, 0 = kapalı)
+REPORT_SCHEDULER_SUMMARY_INTERVAL = int(os.getenv('REPORT_SCHEDULER_SUMMARY_INTERVAL', '60'))  # /api/reports/summary özetinin yeniden hesaplanma aralığı (saniye, 0 = kapalı)
+REPORT_SUMMARY_CACHE_TTL = int(os.getenv('REPORT_SUMMARY_CACHE_TTL', '120'))  # Sistem özetinin önbellekte tutulma süresi (saniye)
+
 # Log Ayarları
 LOG_FOLDER = os.path.join(os.path.dirname(__file__), 'logs')
 os.makedirs(LOG_FOLDER, exist_ok=True) 
\ No newline at end of file
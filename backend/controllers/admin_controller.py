@@ -7,14 +7,31 @@ import sys
 import os
 import json
 import traceback
+from decimal import Decimal
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.db import execute_query, is_setup_done, check_table_exists
+from utils.db import (
+    execute_query, is_setup_done, check_table_exists, get_pool_stats, get_prepared_statement_stats
+)
+from utils.audit_log import audit_log, create_audit_log_table, list_audit_logs, count_audit_logs
+from utils.report_cache import report_cache, delete_snapshots, list_snapshots
+from utils.scheduler import report_scheduler
+from utils.schema_cache import schema_cache
+from utils.rollups import ROLLUPS, refresh_rollup, get_rollup_status
+from utils.topics import (
+    TopicDictionaryError, parse_topic_dictionary, load_topic_dictionary, save_topic_dictionary,
+    get_dictionary_version, get_topic_label_status, start_topic_relabel
+)
+from utils.index_advisor import analyze_reports, create_recommended_index, RECOMMENDED_INDEXES
+from utils.report_metrics import report_metrics, get_persisted_summary
+from utils.http_cache import finalize_json_response
+from utils.pagination import parse_page_size, PaginationError
 from config import (
     JWT_SECRET, JWT_EXPIRATION, SYSTEM_TABLE_PREFIX, SYSTEM_ID,
     DEFAULT_ADMIN_USERNAME, DEFAULT_ADMIN_PASSWORD, update_system_id
 )
 
 admin_bp = Blueprint('admin', __name__)
+admin_bp.after_request(finalize_json_response)
 
 def get_token_payload(request):
     """JWT token'dan payload bilgisini çıkarır"""
@@ -179,17 +196,7 @@ def setup():
         # 4. Loglar tablosu
         try:
             logging.debug(f"Loglar tablosu oluşturuluyor: {SYSTEM_TABLE_PREFIX}logs")
-            execute_query(f"""
-            CREATE TABLE IF NOT EXISTS {SYSTEM_TABLE_PREFIX}logs (
-                id SERIAL PRIMARY KEY,
-                user_id INTEGER,
-                action VARCHAR(100) NOT NULL,
-                details JSONB,
-                ip_address VARCHAR(50),
-                created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES {SYSTEM_TABLE_PREFIX}users(id) ON DELETE SET NULL
-            )
-            """, commit=True)
+            create_audit_log_table()
             logging.info("Loglar tablosu oluşturuldu")
         except Exception as e:
             logging.error(f"Loglar tablosu oluşturma hatası: {e}")
@@ -276,6 +283,9 @@ def setup():
             logging.error(traceback.format_exc())
             raise
         
+        # Kurulum durumu ve yeni sistem tabloları şema önbelleğine yüklenir
+        schema_cache.refresh(table_name)
+        
         # Rapor tablosunu kontrol et
         logging.info(f"Tablo varlığı kontrol ediliyor: {table_name}")
         if not check_table_exists(table_name):
@@ -364,14 +374,7 @@ def login():
         """, (user['id'],), commit=True)
         
         # Logla
-        execute_query(f"""
-        INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-        VALUES (%s, 'admin_login', %s, %s)
-        """, (
-            user['id'], 
-            '{"status": "success"}',
-            request.remote_addr
-        ), commit=True)
+        audit_log.log(user['id'], 'admin_login', {'status': 'success'}, request.remote_addr)
         
         # JWT token oluştur
         token = jwt.encode({
@@ -469,14 +472,7 @@ def create_user(payload):
         )
         
         # Logla
-        execute_query(f"""
-        INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-        VALUES (%s, 'create_user', %s, %s)
-        """, (
-            payload['sub'], 
-            f'{{"created_user_id": {result["id"]}, "username": "{username}", "role": "{role}"}}',
-            request.remote_addr
-        ), commit=True)
+        audit_log.log(payload['sub'], 'create_user', {'created_user_id': result['id'], 'username': username, 'role': role}, request.remote_addr)
         
         return jsonify({
             'status': 'success',
@@ -559,14 +555,7 @@ def update_user(payload, user_id):
         execute_query(query, params, commit=True)
         
         # Logla
-        execute_query(f"""
-        INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-        VALUES (%s, 'update_user', %s, %s)
-        """, (
-            payload['sub'], 
-            f'{{"updated_user_id": {user_id}, "username": "{user["username"]}"}}',
-            request.remote_addr
-        ), commit=True)
+        audit_log.log(payload['sub'], 'update_user', {'updated_user_id': user_id, 'username': user['username']}, request.remote_addr)
         
         return jsonify({
             'status': 'success',
@@ -584,35 +573,45 @@ def update_user(payload, user_id):
 @admin_required
 def get_logs(payload):
     """
-    Sistem loglarını listele
+    Sistem loglarını en yeniden eskiye listele
+    
+    Query parametreleri:
+        limit (int): Sayfa boyutu (varsayılan 100)
+        cursor (str): Önceki yanıttaki next_cursor; verilirse sayfa keyset ile okunur
+        offset (int): cursor verilmediğinde atlanacak kayıt sayısı (eski istemciler için)
+        action (str): Yalnızca bu işlemin logları
+        user_id (int): Yalnızca bu kullanıcının logları
+        exact (bool): Toplamı tahmin yerine COUNT(*) ile kesin hesapla
     """
     try:
-        limit = request.args.get('limit', 100, type=int)
-        offset = request.args.get('offset', 0, type=int)
-        
-        query = f"""
-        SELECT l.id, l.action, l.details, l.ip_address, l.created_at,
-               u.username as user_username
-        FROM {SYSTEM_TABLE_PREFIX}logs l
-        LEFT JOIN {SYSTEM_TABLE_PREFIX}users u ON l.user_id = u.id
-        ORDER BY l.created_at DESC
-        LIMIT %s OFFSET %s
-        """
-        logs = execute_query(query, (limit, offset))
+        try:
+            limit = parse_page_size(request.args.get('limit', 100))
+            offset = max(request.args.get('offset', 0, type=int), 0)
+            user_id = request.args.get('user_id', type=int)
+            action = request.args.get('action') or None
+            exact = request.args.get('exact', '').lower() in ('1', 'true', 'yes')
+            
+            logs, next_cursor = list_audit_logs(
+                limit, cursor=request.args.get('cursor'), offset=offset, action=action, user_id=user_id
+            )
+        except PaginationError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
         
-        # Toplam log sayısını al
-        count_query = f"""
-        SELECT COUNT(*) as total
-        FROM {SYSTEM_TABLE_PREFIX}logs
-        """
-        count = execute_query(count_query, fetch_all=False)
+        # Toplam, istenmedikçe PostgreSQL istatistiklerinden tahmin edilir
+        total, estimated = count_audit_logs(action=action, user_id=user_id, exact=exact)
         
         return jsonify({
             'status': 'success',
             'logs': logs,
-            'total': count['total'],
+            'total': total,
+            'total_is_estimate': estimated,
             'limit': limit,
-            'offset': offset
+            'offset': offset,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
         
     except Exception as e:
@@ -685,16 +684,10 @@ def update_table_name(payload):
         WHERE config_key = 'TABLE_NAME'
         """
         execute_query(query, (table_name,), commit=True)
+        schema_cache.refresh(table_name)
         
         # Logla
-        execute_query(f"""
-        INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-        VALUES (%s, 'update_table_name', %s, %s)
-        """, (
-            payload['sub'], 
-            f'{{"table_name": "{table_name}"}}',
-            request.remote_addr
-        ), commit=True)
+        audit_log.log(payload['sub'], 'update_table_name', {'table_name': table_name}, request.remote_addr)
         
         return jsonify({
             'status': 'success',
@@ -767,16 +760,10 @@ def manage_table_name(payload):
             DO UPDATE SET config_value = %s, updated_at = CURRENT_TIMESTAMP
             """
             execute_query(query, (new_table_name, new_table_name), commit=True)
+            schema_cache.refresh(new_table_name)
             
             # Log kaydı
-            execute_query(f"""
-            INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-            VALUES (%s, 'update_table_name', %s, %s)
-            """, (
-                payload['sub'], 
-                f'{{"old_table_name": "", "new_table_name": "{new_table_name}"}}',
-                request.remote_addr
-            ), commit=True)
+            audit_log.log(payload['sub'], 'update_table_name', {'old_table_name': '', 'new_table_name': new_table_name}, request.remote_addr)
             
             return jsonify({
                 'status': 'success',
@@ -900,14 +887,7 @@ def manage_user(payload, user_id):
                 }), 404
             
             # Log kaydı
-            execute_query(f"""
-            INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-            VALUES (%s, 'update_user', %s, %s)
-            """, (
-                payload['sub'], 
-                f'{{"updated_user_id": {user_id}}}',
-                request.remote_addr
-            ), commit=True)
+            audit_log.log(payload['sub'], 'update_user', {'updated_user_id': user_id}, request.remote_addr)
             
             return jsonify({
                 'status': 'success',
@@ -943,14 +923,7 @@ def manage_user(payload, user_id):
             execute_query(query, (user_id,), commit=True)
             
             # Log kaydı
-            execute_query(f"""
-            INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-            VALUES (%s, 'delete_user', %s, %s)
-            """, (
-                payload['sub'], 
-                f'{{"deleted_user_id": {user_id}}}',
-                request.remote_addr
-            ), commit=True)
+            audit_log.log(payload['sub'], 'delete_user', {'deleted_user_id': user_id}, request.remote_addr)
             
             return jsonify({
                 'status': 'success',
@@ -1028,14 +1001,7 @@ def create_report(payload):
         )
         
         # Log kaydı
-        execute_query(f"""
-        INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-        VALUES (%s, 'create_report', %s, %s)
-        """, (
-            payload['sub'], 
-            f'{{"report_id": {result["id"]}, "report_name": "{report_name}"}}',
-            request.remote_addr
-        ), commit=True)
+        audit_log.log(payload['sub'], 'create_report', {'report_id': result['id'], 'report_name': report_name}, request.remote_addr)
         
         return jsonify({
             'status': 'success',
@@ -1144,14 +1110,7 @@ def manage_report(payload, report_id):
                 }), 404
             
             # Log kaydı
-            execute_query(f"""
-            INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-            VALUES (%s, 'update_report', %s, %s)
-            """, (
-                payload['sub'], 
-                f'{{"report_id": {report_id}}}',
-                request.remote_addr
-            ), commit=True)
+            audit_log.log(payload['sub'], 'update_report', {'report_id': report_id}, request.remote_addr)
             
             return jsonify({
                 'status': 'success',
@@ -1187,14 +1146,7 @@ def manage_report(payload, report_id):
             execute_query(query, (report_id,), commit=True)
             
             # Log kaydı
-            execute_query(f"""
-            INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-            VALUES (%s, 'delete_report', %s, %s)
-            """, (
-                payload['sub'], 
-                f'{{"deleted_report_id": {report_id}}}',
-                request.remote_addr
-            ), commit=True)
+            audit_log.log(payload['sub'], 'delete_report', {'deleted_report_id': report_id}, request.remote_addr)
             
             return jsonify({
                 'status': 'success',
@@ -1245,6 +1197,359 @@ def get_system_info():
             'message': f'Sistem bilgileri getirme sırasında hata oluştu: {str(e)}'
         }), 500
 
+@admin_bp.route('/db-pool', methods=['GET'])
+@admin_required
+def get_db_pool_stats(payload):
+    """
+    Veritabanı bağlantı havuzunun kullanım ve bekleme süresi metriklerini döndürür
+    """
+    try:
+        return jsonify({
+            'status': 'success',
+            'pool': get_pool_stats(),
+            'prepared_statements': get_prepared_statement_stats()
+        })
+    except Exception as e:
+        logging.error(f"Bağlantı havuzu metrikleri getirme hatası: {e}")
+        return jsonify({
+            'status': 'error',
+            'message': f'Bağlantı havuzu metrikleri getirilirken hata oluştu: {str(e)}'
+        }), 500
+
+@admin_bp.route('/report-cache', methods=['GET', 'DELETE'])
+@admin_required
+def manage_report_cache(payload):
+    """
+    Rapor sonuç önbelleğinin metriklerini döndürür (GET) veya önbelleği temizler (DELETE)
+    """
+    try:
+        if request.method == 'DELETE':
+            report_name = request.args.get('report_name')
+            removed = report_cache.invalidate(report_name=report_name)
+            # Zamanlayıcının paylaşılan sonuçları da silinir, yoksa bir sonraki istekte geri yüklenirdi
+            delete_snapshots(report_name=report_name)
+            logging.info(f"Rapor önbelleği temizlendi: {removed} kayıt silindi")
+            return jsonify({
+                'status': 'success',
+                'message': f'{removed} önbellek kaydı silindi'
+            })
+        
+        return jsonify({
+            'status': 'success',
+            'cache': report_cache.stats()
+        })
+    except Exception as e:
+        logging.error(f"Rapor önbelleği işlemi hatası: {e}")
+        return jsonify({
+            'status': 'error',
+            'message': f'Rapor önbelleği işlemi sırasında hata oluştu: {str(e)}'
+        }), 500
+
+@admin_bp.route('/scheduler', methods=['GET'])
+@admin_required
+def get_scheduler_status(payload):
+    """
+    Rapor zamanlayıcısının durumunu döndürür. İş metrikleri isteği karşılayan worker'a
+    aittir (yalnızca lider worker iş çalıştırır); paylaşılan sonuçlar tüm worker'lar için ortaktır.
+    """
+    try:
+        return jsonify({
+            'status': 'success',
+            'scheduler': report_scheduler.stats(),
+            'snapshots': list_snapshots()
+        })
+    except Exception as e:
+        logging.error(f"Zamanlayıcı durumu getirme hatası: {e}")
+        return jsonify({
+            'status': 'error',
+            'message': f'Zamanlayıcı durumu getirilirken hata oluştu: {str(e)}'
+        }), 500
+
+@admin_bp.route('/schema-cache', methods=['GET', 'DELETE'])
+@admin_required
+def manage_schema_cache(payload):
+    """
+    Şema önbelleğinin metriklerini ve istenen tablonun şemasını döndürür (GET)
+    veya önbelleği yeniden yükler (DELETE)
+    """
+    try:
+        if request.method == 'DELETE':
+            table_name = request.args.get('table_name') or os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
+            schema_cache.refresh(table_name)
+            return jsonify({
+                'status': 'success',
+                'message': 'Şema önbelleği yenilendi'
+            })
+        
+        response = {'status': 'success'}
+        # table_name verilirse tablonun kolonları, tipleri ve indeksleri de döner
+        if request.args.get('table_name'):
+            response['schema'] = schema_cache.get_table_schema(request.args['table_name'])
+        response['cache'] = schema_cache.stats()
+        return jsonify(response)
+    except Exception as e:
+        logging.error(f"Şema önbelleği işlemi hatası: {e}")
+        return jsonify({
+            'status': 'error',
+            'message': f'Şema önbelleği işlemi sırasında hata oluştu: {str(e)}'
+        }), 500
+
+@admin_bp.route('/rollups', methods=['GET', 'POST'])
+@admin_required
+def manage_rollups(payload):
+    """
+    Özet tablolarının durumunu döndürür (GET) veya özetleri günceller (POST).
+    POST gövdesinde rollup: 'hourly' | 'sessions' | 'qa_pairs' | 'word_counts' | 'message_topics'
+    verilirse yalnızca o özet, verilmezse tümü güncellenir; rebuild: true verilirse özet baştan
+    oluşturulur.
+    """
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            table_name = data.get('table_name') or os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
+            rollup_names = [data['rollup']] if data.get('rollup') else list(ROLLUPS)
+            
+            unknown = [name for name in rollup_names if name not in ROLLUPS]
+            if unknown:
+                return jsonify({
+                    'status': 'error',
+                    'message': f"Bilinmeyen özet: {', '.join(unknown)}"
+                }), 400
+            
+            if not check_table_exists(table_name):
+                return jsonify({
+                    'status': 'error',
+                    'message': f"'{table_name}' tablosu bulunamadı"
+                }), 404
+            
+            results = {}
+            for rollup_name in rollup_names:
+                results[rollup_name] = refresh_rollup(rollup_name, table_name, rebuild=bool(data.get('rebuild')))
+                logging.info(f"'{rollup_name}' özeti manuel olarak güncellendi: {table_name}, sonuç: {results[rollup_name]['status']}")
+            return jsonify({
+                'status': 'success',
+                'rollups': results
+            })
+        
+        rollups = [
+            {key: value.isoformat() if hasattr(value, 'isoformat') else value for key, value in row.items()}
+            for row in get_rollup_status()
+        ]
+        return jsonify({
+            'status': 'success',
+            'rollups': rollups
+        })
+    except Exception as e:
+        logging.error(f"Özet tablosu işlemi hatası: {e}")
+        logging.error(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': f'Özet tablosu işlemi sırasında hata oluştu: {str(e)}'
+        }), 500
+
+@admin_bp.route('/topics', methods=['GET', 'PUT'])
+@admin_required
+def manage_topics(payload):
+    """
+    Konu sözlüğünü (anahtar kelime -> konu) ve etiketleme durumunu döndürür (GET) veya
+    sözlüğü kaydeder (PUT). Sözlük değiştiğinde mesajlar arka planda partiler halinde
+    yeni sözlükle yeniden etiketlenir.
+    PUT gövdesi: {"default_topic": "Diğer", "topics": [{"topic": "...", "keywords": ["..."]}]}
+    """
+    try:
+        if request.method == 'PUT':
+            try:
+                dictionary = parse_topic_dictionary(request.get_json(silent=True))
+            except TopicDictionaryError as e:
+                return jsonify({
+                    'status': 'error',
+                    'message': str(e)
+                }), 400
+            
+            if get_dictionary_version(dictionary) == get_dictionary_version(load_topic_dictionary()):
+                return jsonify({
+                    'status': 'success',
+                    'message': 'Konu sözlüğü değişmedi',
+                    'version': get_dictionary_version(dictionary),
+                    'relabel': False
+                })
+            
+            version = save_topic_dictionary(dictionary)
+            table_name = os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
+            relabel = check_table_exists(table_name)
+            if relabel:
+                start_topic_relabel(table_name)
+            
+            # Logla
+            audit_log.log(payload['sub'], 'update_topic_dictionary', {'version': version, 'topics': len(dictionary['topics'])}, request.remote_addr)
+            
+            logging.info(f"Konu sözlüğü güncellendi (sürüm {version}), yeniden etiketleme başlatıldı: {relabel}")
+            return jsonify({
+                'status': 'success',
+                'message': 'Konu sözlüğü kaydedildi, mesajlar arka planda yeniden etiketleniyor',
+                'version': version,
+                'relabel': relabel
+            })
+        
+        dictionary = load_topic_dictionary()
+        version = get_dictionary_version(dictionary)
+        return jsonify({
+            'status': 'success',
+            'dictionary': dictionary,
+            'version': version,
+            'labels': get_topic_label_status(version)
+        })
+    except Exception as e:
+        logging.error(f"Konu sözlüğü işlemi hatası: {e}")
+        logging.error(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': f'Konu sözlüğü işlemi sırasında hata oluştu: {str(e)}'
+        }), 500
+
+@admin_bp.route('/index-advisor', methods=['GET'])
+@admin_required
+def get_index_advice(payload):
+    """
+    Tüm raporları EXPLAIN (FORMAT JSON) ile planlatır; mesaj tablosunda sıralı tarama
+    yapan raporları ve eksik indeks önerilerini döndürür
+    """
+    try:
+        table_name = request.args.get('table_name') or os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
+        
+        if not check_table_exists(table_name):
+            return jsonify({
+                'status': 'error',
+                'message': f"'{table_name}' tablosu bulunamadı"
+            }), 404
+        
+        return jsonify({
+            'status': 'success',
+            'advice': analyze_reports(table_name)
+        })
+    except Exception as e:
+        logging.error(f"İndeks analizi hatası: {e}")
+        logging.error(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': f'İndeks analizi sırasında hata oluştu: {str(e)}'
+        }), 500
+
+@admin_bp.route('/index-advisor/apply', methods=['POST'])
+@admin_required
+def apply_index_advice(payload):
+    """
+    Seçilen indeks önerilerini CREATE INDEX CONCURRENTLY ile oluşturur
+    
+    Body: {"indexes": ["session_created", "content_trgm", ...], "table_name": "customer_..."}
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        table_name = data.get('table_name') or os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
+        keys = data.get('indexes') or []
+        
+        if not keys:
+            return jsonify({
+                'status': 'error',
+                'message': 'Oluşturulacak indeks seçilmedi'
+            }), 400
+        
+        unknown = [key for key in keys if key not in RECOMMENDED_INDEXES]
+        if unknown:
+            return jsonify({
+                'status': 'error',
+                'message': f"Bilinmeyen indeks önerisi: {', '.join(unknown)}"
+            }), 400
+        
+        if not check_table_exists(table_name):
+            return jsonify({
+                'status': 'error',
+                'message': f"'{table_name}' tablosu bulunamadı"
+            }), 404
+        
+        results = []
+        for key in keys:
+            try:
+                results.append(create_recommended_index(table_name, key))
+            except Exception as e:
+                logging.error(f"İndeks oluşturma hatası ({key}): {e}")
+                results.append({'key': key, 'status': 'error', 'message': str(e).strip()})
+        
+        failed = [result for result in results if result['status'] == 'error']
+        return jsonify({
+            'status': 'error' if failed else 'success',
+            'message': f"{len(results) - len(failed)} indeks işlendi, {len(failed)} hata",
+            'results': results
+        }), 500 if failed else 200
+    except Exception as e:
+        logging.error(f"İndeks oluşturma hatası: {e}")
+        logging.error(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': f'İndeks oluşturma sırasında hata oluştu: {str(e)}'
+        }), 500
+
+@admin_bp.route('/perf', methods=['GET'])
+@admin_required
+def get_report_performance(payload):
+    """
+    Rapor bazında çalıştırma sürelerini (p50/p95/p99), satır/bayt ortalamalarını ve
+    son yavaş çalıştırmaları döndürür
+    
+    Query parametreleri:
+        report_name: Yalnızca bu raporun metrikleri
+        source: 'memory' (varsayılan, bu süreçteki son çalıştırmalar) veya 'db' (report_runs tablosu)
+        hours: source=db için geriye dönük saat sayısı (varsayılan 24)
+    """
+    try:
+        report_name = request.args.get('report_name') or None
+        source = request.args.get('source', 'memory').lower()
+        
+        if source not in ('memory', 'db'):
+            return jsonify({
+                'status': 'error',
+                'message': "source parametresi 'memory' veya 'db' olmalıdır"
+            }), 400
+        
+        if source == 'db':
+            try:
+                hours = int(request.args.get('hours', 24))
+            except ValueError:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'hours parametresi sayı olmalıdır'
+                }), 400
+            
+            reports = [
+                {
+                    key: value.isoformat() if hasattr(value, 'isoformat')
+                    else float(value) if isinstance(value, Decimal) else value
+                    for key, value in row.items()
+                }
+                for row in get_persisted_summary(hours, report_name)
+            ]
+        else:
+            reports = report_metrics.summary(report_name)
+        
+        slow_runs = [
+            run for run in report_metrics.slow_runs()
+            if report_name is None or run['report_name'] == report_name
+        ]
+        return jsonify({
+            'status': 'success',
+            'source': source,
+            'reports': reports,
+            'slow_runs': slow_runs,
+            'recorder': report_metrics.stats()
+        })
+    except Exception as e:
+        logging.error(f"Rapor performans metrikleri hatası: {e}")
+        logging.error(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': f'Performans metrikleri alınırken hata oluştu: {str(e)}'
+        }), 500
+
 @admin_bp.route('/reset-system', methods=['POST'])
 @admin_required
 def reset_system(payload):
@@ -1280,6 +1585,9 @@ def reset_system(payload):
             except Exception as e:
                 logging.error(f"Tablo silinemedi {table}: {e}")
         
+        # Silinen config tablosu nedeniyle kurulum durumu artık geçersiz
+        schema_cache.invalidate()
+        
         # .env dosyasında SYSTEM_ID'yi sil veya sıfırla
         env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
         
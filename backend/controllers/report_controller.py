@@ -1,24 +1,74 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
+from werkzeug.utils import secure_filename
 import logging
 import os
 import sys
-import re
+import time
 import traceback
 from flask_socketio import emit
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.db import execute_query, is_setup_done, check_table_exists, test_connection
-from utils.sql_helper import (
-    read_sql_file, extract_parameters, replace_placeholders, 
-    get_default_parameter_value, get_sql_file_path
+from utils.audit_log import audit_log
+from utils.report_runner import (
+    execute_report, execute_report_page, stream_report, parse_bool_param, parse_format_param,
+    count_rows, get_report_etag, STREAM_FORMATS, COLUMNAR_FORMAT
 )
-from config import SYSTEM_TABLE_PREFIX, SQL_SCRIPTS_FOLDER
+from utils.http_cache import not_modified, set_cache_headers, report_cache_control, finalize_json_response
+from utils.pagination import PaginationError
+from utils.report_registry import report_registry
+from utils.sql_helper import check_request_parameters, ReportParameterError
+from utils.system_summary import query_system_summary, get_system_summary as get_cached_system_summary
+from utils.report_cache import get_table_watermark
+from utils.report_metrics import report_metrics, track_report_run
+from utils.report_batch import parse_batch_items, run_report_batch, BatchRequestError
+from utils.report_export import export_report, EXPORT_MIMETYPES
+from utils.report_jobs import submit_job, get_job, cancel_job, JOB_SUCCEEDED, JOB_CANCELLING, JOB_CANCELLED
+from config import SYSTEM_TABLE_PREFIX
 import json
+from datetime import datetime, timezone
 
 report_bp = Blueprint('report', __name__)
+report_bp.after_request(finalize_json_response)
 
 # JWT token kontrolü için user_controller'dan alınan fonksiyonlar
 from controllers.user_controller import auth_required, get_token_payload
 
+def stream_response(report_name, sql_query, params, table_name, output_format, results_key):
+    """
+    Rapor sonucunu satırları bellekte toplamadan parça parça gönderen yanıtı oluşturur.
+    Çalıştırma metrikleri akış tamamlandığında kaydedilir.
+    """
+    run = report_metrics.start(report_name, table_name, output_format)
+    try:
+        stream = stream_report(
+            report_name, sql_query, params, table_name,
+            output_format=output_format, results_key=results_key, run=run
+        )
+    except Exception as e:
+        report_metrics.finish(run, error=e)
+        raise
+    
+    def generate():
+        run['bytes'] = 0
+        try:
+            for chunk in stream:
+                run['bytes'] += len(chunk)
+                yield chunk
+        finally:
+            report_metrics.finish(run)
+    
+    mimetype = 'application/x-ndjson' if output_format == 'ndjson' else 'application/json'
+    return Response(generate(), mimetype=mimetype, headers={'X-Report-Cache': 'bypass'})
+
+def results_payload(results, results_key):
+    """
+    Sonuçları yanıt gövdesine yerleştirir: satır listesi results_key altında, kolon
+    bazlı sonuç ise üst düzeyde columns/types/data olarak döner.
+    """
+    if isinstance(results, dict):
+        return results
+    return {results_key: results}
+
 @report_bp.route('/list', methods=['GET'])
 def get_reports():
     """
@@ -51,54 +101,28 @@ def get_reports():
         else:
             logging.info("Kurulum tamamlanmamış, SQL dosyalarından raporlar alınıyor")
         
-        # SQL script dosyalarından raporları bul
+        # Kayıt defterindeki (bellekteki) rapor şablonlarından raporları bul
         file_reports = []
         
         try:
-            if os.path.exists(SQL_SCRIPTS_FOLDER):
-                for file in os.listdir(SQL_SCRIPTS_FOLDER):
-                    if file.endswith('.md'):
-                        report_name = file[:-3]  # .md uzantısını kaldır
-                        
-                        # Bu rapor zaten veritabanında tanımlı mı kontrol et
-                        if not any(r['report_name'] == report_name for r in db_reports):
-                            try:
-                                # Dosyadan SQL sorgusunu oku
-                                sql_query = read_sql_file(report_name)
-                                
-                                # Markdown dosyasından başlık ve açıklamayı çıkarmaya çalış
-                                with open(os.path.join(SQL_SCRIPTS_FOLDER, file), 'r', encoding='utf-8') as f:
-                                    content = f.read()
-                                
-                                # Başlık (ilk satır)
-                                title_match = re.search(r'^# (.*?)$', content, re.MULTILINE)
-                                display_name = title_match.group(1) if title_match else report_name
-                                
-                                # Açıklama (ikinci satır)
-                                desc_match = re.search(r'^# .*?\n(.*?)(?=\n```|\n#|$)', content, re.DOTALL)
-                                description = desc_match.group(1).strip() if desc_match else ""
-                                
-                                # Parametreleri çıkar
-                                params = extract_parameters(sql_query)
-                                parameters = {}
-                                for param in params:
-                                    parameters[param] = get_default_parameter_value(param)
-                                
-                                file_reports.append({
-                                    'id': None,
-                                    'report_name': report_name,
-                                    'display_name': display_name,
-                                    'description': description,
-                                    'parameters': parameters,
-                                    'is_active': True,
-                                    'is_registered': False
-                                })
-                            except Exception as e:
-                                logging.error(f"Dosya okuma hatası ({file}): {e}")
-            else:
-                logging.warning(f"SQL_SCRIPTS_FOLDER yolu bulunamadı: {SQL_SCRIPTS_FOLDER}")
+            db_report_names = {r['report_name'] for r in db_reports}
+            for report in report_registry.list_reports():
+                # Bu rapor zaten veritabanında tanımlı mı kontrol et
+                if report['report_name'] in db_report_names:
+                    continue
+                
+                file_reports.append({
+                    'id': None,
+                    'report_name': report['report_name'],
+                    'display_name': report['display_name'],
+                    'description': report['description'],
+                    'category': report['category'],
+                    'parameters': dict(report['default_parameters']),
+                    'is_active': True,
+                    'is_registered': False
+                })
         except Exception as e:
-            logging.error(f"SQL dosyalarını okurken hata: {e}")
+            logging.error(f"Rapor şablonlarını okurken hata: {e}")
             logging.error(traceback.format_exc())
         
         # Veritabanı raporlarını formatlama
@@ -165,23 +189,16 @@ def register_report(payload):
         display_name = data.get('display_name', report_name)
         description = data.get('description', '')
         
-        # Rapor dosyasının varlığını kontrol et
-        try:
-            sql_file = get_sql_file_path(report_name)
-        except FileNotFoundError:
+        # Rapor şablonunun varlığını kontrol et
+        report = report_registry.get(report_name)
+        if report is None:
             return jsonify({
                 'status': 'error',
                 'message': f"'{report_name}' rapor dosyası bulunamadı"
             }), 404
         
-        # SQL sorgusunu oku
-        sql_query = read_sql_file(report_name)
-        
-        # Parametreleri çıkar
-        params = extract_parameters(sql_query)
-        parameters = {}
-        for param in params:
-            parameters[param] = get_default_parameter_value(param)
+        # Parametreler ve varsayılan değerleri
+        parameters = dict(report['default_parameters'])
         
         # Raporu veritabanına kaydet
         query = f"""
@@ -206,14 +223,7 @@ def register_report(payload):
         ), fetch_all=False, commit=True)
         
         # Logla
-        execute_query(f"""
-        INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-        VALUES (%s, 'register_report', %s, %s)
-        """, (
-            payload['sub'], 
-            json.dumps({'report_name': report_name}),
-            request.remote_addr
-        ), commit=True)
+        audit_log.log(payload['sub'], 'register_report', {'report_name': report_name}, request.remote_addr)
         
         return jsonify({
             'status': 'success',
@@ -262,17 +272,16 @@ def run_report_get(report_name):
                 'message': f'Veritabanı bağlantı hatası: {connection_test["message"]}'
             }), 500
             
-        # Rapor dosyasını bul
-        try:
-            sql_file = get_sql_file_path(report_name)
-        except FileNotFoundError:
+        # Rapor şablonunu bul
+        report = report_registry.get(report_name)
+        if report is None:
             return jsonify({
                 'status': 'error',
                 'message': f"'{report_name}' rapor dosyası bulunamadı"
             }), 404
         
-        # SQL sorgusunu oku
-        sql_query = read_sql_file(report_name)
+        # Derlenmiş SQL sorgusu
+        sql_query = report['sql']
         
         # Parametreleri belirle
         params = {}
@@ -282,46 +291,75 @@ def run_report_get(report_name):
             # URL parametrelerinden al
             params = request.args.to_dict()
         
-        # Tablo adını al - parametrelerden veya varsayılan
-        table_name = params.get('table_name') or os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
+        # Admin tarafından tanımlanan SQL ifadeleri istekle gönderilemez
+        try:
+            check_request_parameters(params)
+        except ReportParameterError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        # Tablo adını al - parametrelerden veya varsayılan (sorguda TABLE_NAME önceliklidir)
+        table_name = params.get('TABLE_NAME') or params.get('table_name') or os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
         
         # Tablo varlığını kontrol et
         if not check_table_exists(table_name):
-            logging.info(f"'{table_name}' tablosu bulundu")
+            logging.warning(f"'{table_name}' tablosu bulunamadı")
+            return jsonify({
+                'status': 'error',
+                'message': f"'{table_name}' tablosu bulunamadı"
+            }), 404
+        
+        # Önbelleği atlayıp sorguyu yeniden çalıştırma isteği
+        refresh = parse_bool_param(params, 'refresh')
+        
+        # Çıktı formatı: json (varsayılan), columnar, ndjson veya json-stream
+        output_format = parse_format_param(params)
+        columnar = output_format == COLUMNAR_FORMAT
+        if output_format not in ('json', COLUMNAR_FORMAT) and output_format not in STREAM_FORMATS:
+            return jsonify({
+                'status': 'error',
+                'message': f"Desteklenmeyen format: '{output_format}'"
+            }), 400
         
-        # Parametreleri yerleştir
-        sql_with_params = replace_placeholders(sql_query, params, table_name)
+        # Tablodaki veri değişmediyse istemcideki sonuç geçerli; sorgu çalıştırılmaz
+        etag, ttl = get_report_etag(report_name, sql_query, params, table_name, output_format)
+        cache_control = report_cache_control(ttl)
+        if not refresh:
+            cached_response = not_modified(etag, cache_control)
+            if cached_response is not None:
+                return cached_response
         
         try:
-            # Sorguyu çalıştır
-            logging.debug(f"Sorgu çalıştırılıyor: {sql_with_params}")
-            param_values = []
-            logging.debug(f"Parametreler: {param_values if param_values else None}")
-            results = execute_query(sql_with_params, param_values)
+            # Büyük sonuçlar için satırları bellekte toplamadan akış halinde gönder
+            if output_format in STREAM_FORMATS:
+                return set_cache_headers(
+                    stream_response(report_name, sql_query, params, table_name, output_format, 'results'),
+                    etag, cache_control
+                )
             
-            # Sonuçları serializable hale getir
-            serializable_results = []
-            for row in results:
-                serializable_row = {}
-                for key, value in row.items():
-                    # datetime, float, int, bool, None ve string dışındaki değerler için özel işlem
-                    if value is not None and not isinstance(value, (str, int, float, bool)):
-                        serializable_row[key] = str(value)
-                    else:
-                        serializable_row[key] = value
-                serializable_results.append(serializable_row)
+            # Sorguyu çalıştır (geçerli sonuç varsa önbellekten döner)
+            with track_report_run(report_name, table_name, output_format) as run:
+                serializable_results, cache_info = execute_report(
+                    report_name, sql_query, params, table_name, refresh=refresh, run=run,
+                    columnar=columnar
+                )
                 
-            # Sorgu başarılı, sonuçları dön
-            return jsonify({
-                'status': 'success',
-                'message': 'Rapor başarıyla çalıştırıldı',
-                'results': serializable_results,
-                'rowCount': len(serializable_results)
-            })
+                # Sorgu başarılı, sonuçları dön
+                response = jsonify({
+                    'status': 'success',
+                    'message': 'Rapor başarıyla çalıştırıldı',
+                    **results_payload(serializable_results, 'results'),
+                    'rowCount': count_rows(serializable_results),
+                    'cache': cache_info
+                })
+                run['bytes'] = response.calculate_content_length()
+            return set_cache_headers(response, etag, cache_control)
             
         except Exception as e:
             logging.error(f"SQL sorgusu çalıştırma hatası: {e}")
-            logging.error(f"Sorgu: {sql_with_params}")
+            logging.error(f"Rapor: {report_name}")
             
             # Özel hata mesajlarını yakalamaya çalış
             error_message = str(e)
@@ -407,33 +445,14 @@ def toggle_favorite_by_name(report_name):
         if not report_result:
             # Rapor kayıtlı değilse, önce kaydet
             try:
-                # SQL sorgusunu oku
-                sql_query = read_sql_file(report_name)
+                # Rapor şablonunu bul
+                report = report_registry.get(report_name)
+                if report is None:
+                    raise FileNotFoundError(f"SQL dosyası bulunamadı: {report_name}")
                 
-                # Parametreleri çıkar
-                params = extract_parameters(sql_query)
-                parameters = {}
-                for param in params:
-                    parameters[param] = get_default_parameter_value(param)
-                
-                # Raporun markdown dosyasından başlık ve açıklamasını oku
-                display_name = report_name
-                description = ""
-                
-                md_file_path = os.path.join(SQL_SCRIPTS_FOLDER, f"{report_name}.md")
-                if os.path.exists(md_file_path):
-                    with open(md_file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    # Başlık (ilk satır)
-                    title_match = re.search(r'^# (.*?)$', content, re.MULTILINE)
-                    if title_match:
-                        display_name = title_match.group(1)
-                    
-                    # Açıklama (ikinci satır)
-                    desc_match = re.search(r'^# .*?\n(.*?)(?=\n```|\n#|$)', content, re.DOTALL)
-                    if desc_match:
-                        description = desc_match.group(1).strip()
+                parameters = dict(report['default_parameters'])
+                display_name = report['display_name']
+                description = report['description']
                 
                 # Raporu veritabanına kaydet
                 register_query = f"""
@@ -459,18 +478,8 @@ def toggle_favorite_by_name(report_name):
         
         report_id = report_result['id']
         
-        # Favoriler tablosunun varlığını kontrol et
-        check_query = f"""
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables 
-            WHERE table_name = '{SYSTEM_TABLE_PREFIX}favorites'
-        ) as table_exists
-        """
-        
-        result = execute_query(check_query, fetch_all=False)
-        
-        # Tablo yoksa oluştur
-        if not result['table_exists']:
+        # Favoriler tablosu yoksa oluştur (varlık kontrolü şema önbelleğinden yapılır)
+        if not check_table_exists(f"{SYSTEM_TABLE_PREFIX}favorites"):
             create_table_query = f"""
             CREATE TABLE IF NOT EXISTS {SYSTEM_TABLE_PREFIX}favorites (
                 id SERIAL PRIMARY KEY,
@@ -537,35 +546,19 @@ def get_report(report_name):
         return '', 204
     
     try:
-        # Rapor dosyasını bul
-        try:
-            sql_file = get_sql_file_path(report_name)
-        except FileNotFoundError:
+        # Rapor şablonunu bul
+        report = report_registry.get(report_name)
+        if report is None:
             return jsonify({
                 'status': 'error',
                 'message': f"'{report_name}' rapor dosyası bulunamadı"
             }), 404
         
-        # SQL sorgusunu oku
-        sql_query = read_sql_file(report_name)
-        
-        # Parametreleri çıkar
-        params = extract_parameters(sql_query)
-        parameters = []
-        for param in params:
-            param_type = "string"
-            if "DATE" in param:
-                param_type = "date"
-            elif "COUNT" in param or "LIMIT" in param:
-                param_type = "number"
-            
-            parameters.append({
-                "name": param,
-                "type": param_type,
-                "label": param.replace("_", " ").title(),
-                "required": param != "TABLE_NAME",
-                "default_value": get_default_parameter_value(param)
-            })
+        # Derlenmiş SQL sorgusu
+        sql_query = report['sql']
+        
+        # Parametre tanımları
+        parameters = report['parameters']
         
         # Raporun veritabanındaki kaydını kontrol et
         query = f"""
@@ -576,27 +569,9 @@ def get_report(report_name):
         
         db_report = execute_query(query, (report_name,), fetch_all=False)
         
-        # Raporun markdown dosyasından başlık ve açıklamasını oku
-        display_name = report_name
-        description = ""
-        
-        try:
-            md_file_path = os.path.join(SQL_SCRIPTS_FOLDER, f"{report_name}.md")
-            if os.path.exists(md_file_path):
-                with open(md_file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Başlık (ilk satır)
-                title_match = re.search(r'^# (.*?)$', content, re.MULTILINE)
-                if title_match:
-                    display_name = title_match.group(1)
-                
-                # Açıklama (ikinci satır)
-                desc_match = re.search(r'^# .*?\n(.*?)(?=\n```|\n#|$)', content, re.DOTALL)
-                if desc_match:
-                    description = desc_match.group(1).strip()
-        except Exception as e:
-            logging.error(f"Markdown dosyası okuma hatası: {e}")
+        # Şablondan okunan başlık ve açıklama
+        display_name = report['display_name']
+        description = report['description']
         
         # Veritabanındaki bilgileri ve dosyadan okunanları birleştir
         if db_report:
@@ -621,6 +596,7 @@ def get_report(report_name):
                 'report_name': report_name,
                 'display_name': display_name,
                 'description': description,
+                'category': report['category'],
                 'parameters': parameters,
                 'sql': sql_query,
                 'is_registered': db_report is not None,
@@ -662,20 +638,28 @@ def run_report_by_name(report_name):
         elif request.method == 'GET':
             params = request.args.to_dict()
         
-        # Rapor dosyasını bul
-        try:
-            sql_file = get_sql_file_path(report_name)
-        except FileNotFoundError:
+        # Rapor şablonunu bul
+        report = report_registry.get(report_name)
+        if report is None:
             return jsonify({
                 'status': 'error',
                 'message': f"'{report_name}' rapor dosyası bulunamadı"
             }), 404
         
-        # SQL sorgusunu oku
-        sql_query = read_sql_file(report_name)
+        # Derlenmiş SQL sorgusu
+        sql_query = report['sql']
         
-        # Tablo adını al - parametrelerden veya varsayılan
-        table_name = params.get('table_name') or os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
+        # Admin tarafından tanımlanan SQL ifadeleri istekle gönderilemez
+        try:
+            check_request_parameters(params)
+        except ReportParameterError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        # Tablo adını al - parametrelerden veya varsayılan (sorguda TABLE_NAME önceliklidir)
+        table_name = params.get('TABLE_NAME') or params.get('table_name') or os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
         
         # Tablo varlığını kontrol et
         if not check_table_exists(table_name):
@@ -685,39 +669,83 @@ def run_report_by_name(report_name):
                 'message': f"'{table_name}' tablosu bulunamadı"
             }), 404
         
-        # Parametreleri yerleştir
-        sql_with_params = replace_placeholders(sql_query, params, table_name)
+        # Önbelleği atlayıp sorguyu yeniden çalıştırma isteği
+        refresh = parse_bool_param(params, 'refresh')
+        
+        # Çıktı formatı: json (varsayılan), columnar, ndjson veya json-stream
+        output_format = parse_format_param(params)
+        columnar = output_format == COLUMNAR_FORMAT
+        if output_format not in ('json', COLUMNAR_FORMAT) and output_format not in STREAM_FORMATS:
+            return jsonify({
+                'status': 'error',
+                'message': f"Desteklenmeyen format: '{output_format}'"
+            }), 400
+        
+        # Keyset sayfalama parametreleri (sayfa boyutu ve önceki yanıttaki nextCursor)
+        page_size = params.pop('page_size', None)
+        cursor = params.pop('cursor', None)
+        
+        # Tablodaki veri değişmediyse istemcideki sonuç geçerli; sorgu çalıştırılmaz
+        page = (page_size, cursor) if page_size is not None or cursor else None
+        etag, ttl = get_report_etag(report_name, sql_query, params, table_name, output_format, page=page)
+        cache_control = report_cache_control(ttl)
+        if not refresh:
+            cached_response = not_modified(etag, cache_control)
+            if cached_response is not None:
+                return cached_response
         
         try:
-            # Sorguyu çalıştır
-            logging.debug(f"Sorgu çalıştırılıyor: {sql_with_params}")
-            param_values = []
-            logging.debug(f"Parametreler: {param_values if param_values else 'Yok'}")
-            results = execute_query(sql_with_params, param_values)
+            # Büyük sonuçlar için satırları bellekte toplamadan akış halinde gönder
+            if output_format in STREAM_FORMATS:
+                return set_cache_headers(
+                    stream_response(report_name, sql_query, params, table_name, output_format, 'data'),
+                    etag, cache_control
+                )
+            
+            # Sayfalı çalıştırma: yalnızca istenen sayfa veritabanında hesaplanır
+            if page is not None:
+                with track_report_run(report_name, table_name, 'page') as run:
+                    page_rows, cache_info, pagination = execute_report_page(
+                        report, params, table_name, page_size, cursor=cursor, refresh=refresh, run=run,
+                        columnar=columnar
+                    )
+                    response = jsonify({
+                        'status': 'success',
+                        'message': 'Rapor başarıyla çalıştırıldı',
+                        **results_payload(page_rows, 'data'),
+                        'rowCount': count_rows(page_rows),
+                        'pagination': pagination,
+                        'cache': cache_info
+                    })
+                    run['bytes'] = response.calculate_content_length()
+                return set_cache_headers(response, etag, cache_control)
             
-            # Sonuçları serializable hale getir
-            serializable_results = []
-            for row in results:
-                serializable_row = {}
-                for key, value in row.items():
-                    # datetime, float, int, bool, None ve string dışındaki değerler için özel işlem
-                    if value is not None and not isinstance(value, (str, int, float, bool)):
-                        serializable_row[key] = str(value)
-                    else:
-                        serializable_row[key] = value
-                serializable_results.append(serializable_row)
+            # Sorguyu çalıştır (geçerli sonuç varsa önbellekten döner)
+            with track_report_run(report_name, table_name, output_format) as run:
+                serializable_results, cache_info = execute_report(
+                    report_name, sql_query, params, table_name, refresh=refresh, run=run,
+                    columnar=columnar
+                )
                 
-            # Sorgu başarılı, sonuçları dön
-            return jsonify({
-                'status': 'success',
-                'message': 'Rapor başarıyla çalıştırıldı',
-                'data': serializable_results,
-                'rowCount': len(serializable_results)
-            })
+                # Sorgu başarılı, sonuçları dön
+                response = jsonify({
+                    'status': 'success',
+                    'message': 'Rapor başarıyla çalıştırıldı',
+                    **results_payload(serializable_results, 'data'),
+                    'rowCount': count_rows(serializable_results),
+                    'cache': cache_info
+                })
+                run['bytes'] = response.calculate_content_length()
+            return set_cache_headers(response, etag, cache_control)
             
+        except PaginationError as e:
+            return jsonify({
+                'status': 'error',
+                'message': f'Sayfalama hatası: {str(e)}'
+            }), 400
         except Exception as e:
             logging.error(f"SQL sorgusu çalıştırma hatası: {e}")
-            logging.error(f"Sorgu: {sql_with_params}")
+            logging.error(f"Rapor: {report_name}")
             
             # Özel hata mesajlarını yakalamaya çalış
             error_message = str(e)
@@ -750,11 +778,280 @@ def run_report_by_name(report_name):
             'message': f'Rapor çalıştırma hatası: {str(e)}'
         }), 500
 
+@report_bp.route('/<report_name>/export', methods=['GET', 'POST', 'OPTIONS'])
+def export_report_by_name(report_name):
+    """
+    Rapor sonucunun tamamını dosya olarak indirir (?format=csv, tsv veya xlsx).
+    Şablondaki sabit LIMIT uygulanmaz; dosya veritabanından okundukça gönderilir.
+    """
+    # OPTIONS istekleri için yanıt
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    try:
+        # Parametreleri belirle
+        params = {}
+        if request.method == 'POST' and request.is_json:
+            data = request.get_json()
+            params = data.get('params', {})
+        elif request.method == 'GET':
+            params = request.args.to_dict()
+        
+        # Rapor şablonunu bul
+        report = report_registry.get(report_name)
+        if report is None:
+            return jsonify({
+                'status': 'error',
+                'message': f"'{report_name}' rapor dosyası bulunamadı"
+            }), 404
+        
+        export_format = parse_format_param(params, default='csv')
+        if export_format not in EXPORT_MIMETYPES:
+            return jsonify({
+                'status': 'error',
+                'message': f"Desteklenmeyen dışa aktarma formatı: '{export_format}' (csv, tsv veya xlsx olmalı)"
+            }), 400
+        
+        # Admin tarafından tanımlanan SQL ifadeleri istekle gönderilemez
+        try:
+            check_request_parameters(params)
+        except ReportParameterError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        # Tablo adını al - parametrelerden veya varsayılan (sorguda TABLE_NAME önceliklidir)
+        table_name = params.get('TABLE_NAME') or params.get('table_name') or os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
+        if not check_table_exists(table_name):
+            logging.warning(f"'{table_name}' tablosu bulunamadı")
+            return jsonify({
+                'status': 'error',
+                'message': f"'{table_name}' tablosu bulunamadı"
+            }), 404
+        
+        run = report_metrics.start(report_name, table_name, export_format)
+        try:
+            chunks = export_report(report_name, report['sql'], params, table_name, export_format, run=run)
+        except Exception as e:
+            report_metrics.finish(run, error=e)
+            logging.error(f"Rapor dışa aktarma hatası: {e} (Rapor: {report_name})")
+            return jsonify({
+                'status': 'error',
+                'message': f'Sorgu çalıştırma hatası: {str(e)}'
+            }), 500
+        
+        def generate():
+            run['bytes'] = 0
+            try:
+                for chunk in chunks:
+                    run['bytes'] += len(chunk)
+                    yield chunk
+            finally:
+                chunks.close()
+                report_metrics.finish(run)
+        
+        filename = f"{secure_filename(report_name) or 'rapor'}.{export_format}"
+        return Response(generate(), mimetype=EXPORT_MIMETYPES[export_format], headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no'
+        })
+        
+    except Exception as e:
+        logging.error(f"Rapor dışa aktarma hatası: {e}")
+        logging.error(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': f'Rapor dışa aktarma hatası: {str(e)}'
+        }), 500
+
+@report_bp.route('/<report_name>/jobs', methods=['POST', 'OPTIONS'])
+def submit_report_job(report_name):
+    """
+    Raporu arka planda çalıştırılacak bir iş olarak kuyruğa alır ve iş kimliğini döndürür.
+    Durum ve sonuç GET /<rapor>/jobs/<iş>, iptal DELETE /<rapor>/jobs/<iş> ile alınır.
+    """
+    # OPTIONS istekleri için yanıt
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    try:
+        params = {}
+        if request.is_json:
+            params = (request.get_json() or {}).get('params', {})
+        params = {**request.args.to_dict(), **params}
+        
+        # Rapor şablonunu bul
+        report = report_registry.get(report_name)
+        if report is None:
+            return jsonify({
+                'status': 'error',
+                'message': f"'{report_name}' rapor dosyası bulunamadı"
+            }), 404
+        
+        output_format = parse_format_param(params)
+        if output_format not in ('json', COLUMNAR_FORMAT):
+            return jsonify({
+                'status': 'error',
+                'message': 'Rapor işlerinde yalnızca json ve columnar formatları desteklenir'
+            }), 400
+        refresh = parse_bool_param(params, 'refresh')
+        
+        # Admin tarafından tanımlanan SQL ifadeleri istekle gönderilemez
+        try:
+            check_request_parameters(params)
+        except ReportParameterError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        # Tablo adını al - parametrelerden veya varsayılan (sorguda TABLE_NAME önceliklidir)
+        table_name = params.get('TABLE_NAME') or params.get('table_name') or os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
+        if not check_table_exists(table_name):
+            logging.warning(f"'{table_name}' tablosu bulunamadı")
+            return jsonify({
+                'status': 'error',
+                'message': f"'{table_name}' tablosu bulunamadı"
+            }), 404
+        
+        job = submit_job(report_name, report['sql'], params, table_name, output_format, refresh=refresh)
+        response = jsonify({
+            'status': 'success',
+            'message': 'Rapor işi kuyruğa alındı',
+            'job': job
+        })
+        response.status_code = 202
+        response.headers['Location'] = f"{request.script_root}{request.path}/{job['id']}"
+        return response
+        
+    except Exception as e:
+        logging.error(f"Rapor işi oluşturma hatası: {e}")
+        logging.error(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': f'Rapor işi oluşturma hatası: {str(e)}'
+        }), 500
+
+@report_bp.route('/<report_name>/jobs/<job_id>', methods=['GET', 'DELETE', 'OPTIONS'])
+def report_job(report_name, job_id):
+    """
+    GET: İşin durumunu, ilerlemesini ve tamamlandıysa sonucunu döndürür.
+    DELETE: İşi iptal eder; çalışan sorgu veritabanında pg_cancel_backend ile durdurulur.
+    """
+    # OPTIONS istekleri için yanıt
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    try:
+        if request.method == 'DELETE':
+            job, signalled = cancel_job(job_id)
+        else:
+            job, results = get_job(job_id)
+        
+        if job is None or job['report_name'] != report_name:
+            return jsonify({
+                'status': 'error',
+                'message': f"'{job_id}' rapor işi bulunamadı"
+            }), 404
+        
+        if request.method == 'DELETE':
+            if job['status'] == JOB_CANCELLING:
+                message = 'İptal isteği gönderildi' if signalled else 'İptal isteği alındı'
+            elif job['status'] == JOB_CANCELLED:
+                message = 'Rapor işi iptal edildi'
+            else:
+                message = 'Rapor işi zaten tamamlanmış'
+            return jsonify({'status': 'success', 'message': message, 'job': job})
+        
+        payload = {'status': 'success', 'job': job}
+        if job['status'] == JOB_SUCCEEDED and results is not None:
+            payload.update(results_payload(results, 'data'))
+            payload['rowCount'] = job['rowCount']
+        return jsonify(payload)
+        
+    except Exception as e:
+        logging.error(f"Rapor işi hatası: {e}")
+        logging.error(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': f'Rapor işi hatası: {str(e)}'
+        }), 500
+
+@report_bp.route('/batch', methods=['POST', 'OPTIONS'])
+def run_report_batch_endpoint():
+    """
+    Birden fazla raporu tek istekte, ortak worker havuzunda eşzamanlı çalıştırır
+    
+    Body: {"reports": [{"report_name": "14_Saatlik_Aktivite_Analizi", "params": {...}}, ...],
+           "table_name": "customer_..."}
+    
+    Her rapor için ayrı durum, süre ve sonuç döner; hata veren raporlar diğerlerinin
+    sonuçlarını etkilemez.
+    """
+    # OPTIONS istekleri için yanıt
+    if request.method == 'OPTIONS':
+        return '', 204
+    
+    payload = get_token_payload(request)
+    if not payload:
+        return jsonify({'status': 'error', 'message': 'Yetkisiz erişim'}), 401
+    
+    try:
+        start = time.monotonic()
+        data = request.get_json(silent=True) or {}
+        
+        try:
+            items = parse_batch_items(data)
+        except BatchRequestError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        # Veritabanı bağlantısını tüm raporlar için bir kez test et
+        connection_test = test_connection()
+        if connection_test['status'] != 'success':
+            return jsonify({
+                'status': 'error',
+                'message': f'Veritabanı bağlantı hatası: {connection_test["message"]}'
+            }), 500
+        
+        table_name = data.get('table_name') or os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
+        results = run_report_batch(items, table_name)
+        
+        failed = sum(1 for result in results if result['status'] != 'success')
+        if failed == 0:
+            status = 'success'
+        elif failed == len(results):
+            status = 'error'
+        else:
+            status = 'partial'
+        
+        return jsonify({
+            'status': status,
+            'message': f"{len(results) - failed}/{len(results)} rapor başarıyla çalıştırıldı",
+            'results': results,
+            'timing': {'wall_ms': round((time.monotonic() - start) * 1000, 2)}
+        })
+    except Exception as e:
+        logging.error(f"Toplu rapor çalıştırma hatası: {e}")
+        logging.error(traceback.format_exc())
+        return jsonify({
+            'status': 'error',
+            'message': f'Toplu rapor çalıştırma hatası: {str(e)}'
+        }), 500
+
 @report_bp.route('/summary', methods=['GET'])
 @auth_required
 def get_system_summary(payload):
     """
     Sistemin genel istatistiklerini döndürür
+    
+    Query parametreleri:
+        since (str, optional): Önceki yanıttaki watermark değeri. O andan sonra yeni mesaj
+            yoksa yalnızca {'changed': false} döner; varsa özet ve delta bilgisi döner.
     """
     try:
         # Tablo adını al
@@ -768,76 +1065,51 @@ def get_system_summary(payload):
                 'message': f"'{table_name}' tablosu bulunamadı"
             }), 404
             
-        # Toplam oturum sayısı
-        query_sessions = f"""
-        SELECT COUNT(DISTINCT session_id) as total_sessions
-        FROM {table_name}
-        """
-        
-        # Toplam mesaj sayısı
-        query_messages = f"""
-        SELECT COUNT(*) as total_messages
-        FROM {table_name}
-        """
-        
-        # Context kullanım oranı
-        query_context = f"""
-        SELECT
-            COUNT(CASE WHEN has_context = TRUE THEN 1 END) as context_used,
-            COUNT(CASE WHEN has_context = FALSE THEN 1 END) as context_not_used,
-            ROUND(COUNT(CASE WHEN has_context = TRUE THEN 1 END) * 100.0 / COUNT(*), 2) as context_usage_percentage
-        FROM {table_name}
-        WHERE role = 'apiMessage'
-        """
-        
-        # Son 24 saatteki aktif oturumlar
-        query_active = f"""
-        SELECT COUNT(DISTINCT session_id) as active_sessions
-        FROM {table_name}
-        WHERE created_date >= CURRENT_TIMESTAMP - INTERVAL '24 hours'
-        """
+        # ?since=<watermark>: gösterge paneli yalnızca değişiklik varsa tüm özeti ister
+        since = None
+        since_param = request.args.get('since')
+        if since_param:
+            try:
+                since = datetime.fromisoformat(since_param.replace('Z', '+00:00'))
+                if since.tzinfo is None:
+                    since = since.replace(tzinfo=timezone.utc)
+            except ValueError:
+                return jsonify({
+                    'status': 'error',
+                    'message': f"Geçersiz since değeri: {since_param}"
+                }), 400
         
-        # Haftalık aktivite - günlere göre oturum sayısı
-        query_weekly = f"""
-        SELECT 
-            EXTRACT(DOW FROM created_date) as day_of_week,
-            COUNT(DISTINCT session_id) as session_count
-        FROM {table_name}
-        WHERE created_date >= CURRENT_DATE - INTERVAL '7 days'
-        GROUP BY day_of_week
-        ORDER BY day_of_week
-        """
+        watermark = get_table_watermark(table_name)
+        if since is not None and watermark is not None:
+            latest = None if watermark == 'empty' else datetime.fromisoformat(watermark)
+            if latest is None or latest <= since:
+                return jsonify({
+                    'status': 'success',
+                    'changed': False,
+                    'watermark': watermark
+                })
         
         try:
-            result_sessions = execute_query(query_sessions, fetch_all=False)
-            result_messages = execute_query(query_messages, fetch_all=False)
-            result_context = execute_query(query_context, fetch_all=False)
-            result_active = execute_query(query_active, fetch_all=False)
-            result_weekly = execute_query(query_weekly)
-            
-            # Haftalık aktiviteyi formatlama
-            weekly_activity = [0] * 7  # 0=Pazar, 1=Pazartesi, ... 6=Cumartesi
-            for row in result_weekly:
-                day = int(row['day_of_week'])
-                weekly_activity[day] = row['session_count']
+            # since yoksa özet önbellekten (zamanlayıcının ısıttığı sonuç dahil) döner
+            if since is None:
+                summary, cache_status = get_cached_system_summary(table_name, watermark)
+                delta = None
+            else:
+                summary, delta = query_system_summary(table_name, since)
+                cache_status = 'bypass'
             
-            # Sonuçları birleştir
-            summary = {
-                'total_sessions': result_sessions['total_sessions'] if result_sessions else 0,
-                'total_messages': result_messages['total_messages'] if result_messages else 0,
-                'context_usage': {
-                    'used': result_context['context_used'] if result_context else 0,
-                    'not_used': result_context['context_not_used'] if result_context else 0,
-                    'percentage': float(result_context['context_usage_percentage']) if result_context else 0
-                },
-                'active_sessions': result_active['active_sessions'] if result_active else 0,
-                'weekly_activity': weekly_activity
+            response = {
+                'status': 'success',
+                'summary': summary,
+                'watermark': watermark
             }
+            if delta is not None:
+                response['changed'] = True
+                response['delta'] = delta
             
-            return jsonify({
-                'status': 'success',
-                'summary': summary
-            })
+            response = jsonify(response)
+            response.headers['X-Report-Cache'] = cache_status
+            return response
             
         except Exception as e:
             logging.error(f"Özet istatistikler sorgulanırken hata: {e}")
@@ -924,18 +1196,8 @@ def toggle_favorite(payload, report_id):
     try:
         user_id = payload['sub']
         
-        # Favoriler tablosunun varlığını kontrol et
-        check_query = f"""
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables 
-            WHERE table_name = '{SYSTEM_TABLE_PREFIX}favorites'
-        ) as table_exists
-        """
-        
-        result = execute_query(check_query, fetch_all=False)
-        
-        # Tablo yoksa oluştur
-        if not result['table_exists']:
+        # Favoriler tablosu yoksa oluştur (varlık kontrolü şema önbelleğinden yapılır)
+        if not check_table_exists(f"{SYSTEM_TABLE_PREFIX}favorites"):
             create_table_query = f"""
             CREATE TABLE IF NOT EXISTS {SYSTEM_TABLE_PREFIX}favorites (
                 id SERIAL PRIMARY KEY,
@@ -7,6 +7,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.db import execute_query, is_setup_done
+from utils.audit_log import audit_log
 from config import JWT_SECRET, JWT_EXPIRATION, SYSTEM_TABLE_PREFIX
 
 user_bp = Blueprint('user', __name__)
@@ -118,14 +119,7 @@ def login():
         """, (user['id'],), commit=True)
         
         # Logla
-        execute_query(f"""
-        INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-        VALUES (%s, 'user_login', %s, %s)
-        """, (
-            user['id'], 
-            '{"status": "success"}',
-            request.remote_addr
-        ), commit=True)
+        audit_log.log(user['id'], 'user_login', {'status': 'success'}, request.remote_addr)
         
         # JWT token oluştur
         token = jwt.encode({
@@ -280,14 +274,7 @@ def change_password(payload):
         """, (hashed_password, payload['sub']), commit=True)
         
         # Logla
-        execute_query(f"""
-        INSERT INTO {SYSTEM_TABLE_PREFIX}logs (user_id, action, details, ip_address)
-        VALUES (%s, 'change_password', %s, %s)
-        """, (
-            payload['sub'], 
-            '{"status": "success"}',
-            request.remote_addr
-        ), commit=True)
+        audit_log.log(payload['sub'], 'change_password', {'status': 'success'}, request.remote_addr)
         
         return jsonify({
             'status': 'success',
@@ -0,0 +1,63 @@
+# Üretim sunucusu yapılandırması
+# Kullanım: gunicorn -c gunicorn.conf.py app:app
+import os
+import sys
+import subprocess
+import multiprocessing
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from config import (
+    GUNICORN_BIND, GUNICORN_WORKER_CLASS, GUNICORN_WORKERS, GUNICORN_WORKER_CONNECTIONS,
+    GUNICORN_THREADS, GUNICORN_TIMEOUT, GUNICORN_MAX_REQUESTS
+)
+
+bind = GUNICORN_BIND
+worker_class = GUNICORN_WORKER_CLASS
+workers = GUNICORN_WORKERS or multiprocessing.cpu_count()
+worker_connections = GUNICORN_WORKER_CONNECTIONS
+threads = GUNICORN_THREADS
+timeout = GUNICORN_TIMEOUT
+graceful_timeout = 30
+keepalive = 5
+max_requests = GUNICORN_MAX_REQUESTS
+max_requests_jitter = GUNICORN_MAX_REQUESTS // 10
+
+# Uygulama her worker'da fork'tan sonra yüklenir; bağlantı havuzu, kilitler ve arka
+# plan thread'leri worker'lar arasında paylaşılmaz ve monkey patch'ten sonra oluşur.
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+def on_starting(server):
+    """
+    Master süreç başlarken açılış işlerini (MD -> SQL dönüşümü, migration'lar) bir kez
+    çalıştırır. İşler ayrı bir süreçte çalışır; böylece master, worker'lara veritabanı
+    bağlantısı veya monkey patch öncesi oluşturulmuş kilitler devretmez.
+    """
+    script = os.path.join(BASE_DIR, 'utils', 'startup.py')
+    result = subprocess.run([sys.executable, script], cwd=BASE_DIR)
+    if result.returncode != 0:
+        server.log.error("Açılış işleri hatayla tamamlandı, ayrıntılar için logs/app.log dosyasına bakın")
+
+def post_worker_init(worker):
+    """
+    gevent/eventlet worker'larında veritabanı beklemelerini diğer greenlet'lere açar ve
+    arka plan thread'lerini (şablon izleyicisi, zamanlayıcı) bu worker'da başlatır.
+    """
+    for library in ('gevent', 'eventlet'):
+        if library in worker_class:
+            from utils.db import enable_green_io
+            enable_green_io(library)
+            break
+
+    from app import start_background_services
+    start_background_services()
+
+def worker_exit(server, worker):
+    """Worker kapanırken kuyrukta bekleyen denetim kayıtlarını yazar."""
+    from utils.audit_log import audit_log
+    audit_log.close()
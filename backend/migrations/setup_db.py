@@ -4,6 +4,9 @@ import logging
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.db import execute_query, check_table_exists
+from utils.rollups import create_rollup_tables
+from utils.report_metrics import create_report_runs_table
+from utils.audit_log import create_audit_log_table
 from config import SYSTEM_TABLE_PREFIX
 
 def create_system_tables():
@@ -52,17 +55,7 @@ def create_system_tables():
         """, commit=True)
         
         # 4. Loglar tablosu
-        execute_query(f"""
-        CREATE TABLE IF NOT EXISTS {SYSTEM_TABLE_PREFIX}logs (
-            id SERIAL PRIMARY KEY,
-            user_id INTEGER,
-            action VARCHAR(100) NOT NULL,
-            details JSONB,
-            ip_address VARCHAR(50),
-            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES {SYSTEM_TABLE_PREFIX}users(id) ON DELETE SET NULL
-        )
-        """, commit=True)
+        create_audit_log_table()
         
         # 5. Favoriler tablosu
         execute_query(f"""
@@ -77,6 +70,12 @@ def create_system_tables():
         )
         """, commit=True)
         
+        # 6. Özet (rollup) tabloları
+        create_rollup_tables()
+        
+        # 7. Rapor çalıştırma metrikleri
+        create_report_runs_table()
+        
         logging.info("Sistem tabloları başarıyla oluşturuldu")
         return True
         
@@ -134,18 +133,9 @@ def run_migrations():
         """, commit=True)
         
         # 4. Loglar tablosu - Bu tablo ilişkilidir, users tablosuna foreign key içerir
-        # Tablolar oluşturulduktan sonra ekliyoruz
-        execute_query(f"""
-        CREATE TABLE IF NOT EXISTS {SYSTEM_TABLE_PREFIX}logs (
-            id SERIAL PRIMARY KEY,
-            user_id INTEGER,
-            action VARCHAR(100) NOT NULL,
-            details JSONB,
-            ip_address VARCHAR(50),
-            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES {SYSTEM_TABLE_PREFIX}users(id) ON DELETE SET NULL
-        )
-        """, commit=True)
+        # Tablolar oluşturulduktan sonra ekliyoruz. Aylık bölümlenmiştir; eski (bölümlenmemiş)
+        # tablo varsa kayıtlarıyla birlikte çevrilir
+        create_audit_log_table()
         
         # 5. Favoriler tablosu - Bu tablo ilişkilidir, users ve reports tablolarına foreign key içerir
         try:
@@ -176,6 +166,12 @@ def run_migrations():
             )
             """, commit=True)
         
+        # 6. Özet (rollup) tabloları - raporlar ilk çalıştığında da oluşturulur
+        create_rollup_tables()
+        
+        # 7. Rapor çalıştırma metrikleri - ilk kayıtta da oluşturulur
+        create_report_runs_table()
+        
         logging.info("Sistem tabloları başarıyla oluşturuldu")
         return True
     except Exception as e:
@@ -4,32 +4,33 @@
 
 SELECT 
     message_count_range,
+    MIN(CASE 
+        WHEN message_count_range = '1-2 messages' THEN 1
+        WHEN message_count_range = '3-5 messages' THEN 2
+        WHEN message_count_range = '6-10 messages' THEN 3
+        ELSE 4
+    END) AS range_order,
     COUNT(*) AS conversation_count,
     ROUND(AVG(duration_minutes), 2) AS avg_duration_minutes,
     ROUND(AVG(avg_response_length), 2) AS avg_response_length
 FROM (
     SELECT 
         session_id,
-        COUNT(*) AS message_count,
+        message_count,
         CASE 
-            WHEN COUNT(*) BETWEEN 1 AND 2 THEN '1-2 messages'
-            WHEN COUNT(*) BETWEEN 3 AND 5 THEN '3-5 messages'
-            WHEN COUNT(*) BETWEEN 6 AND 10 THEN '6-10 messages'
+            WHEN message_count BETWEEN 1 AND 2 THEN '1-2 messages'
+            WHEN message_count BETWEEN 3 AND 5 THEN '3-5 messages'
+            WHEN message_count BETWEEN 6 AND 10 THEN '6-10 messages'
             ELSE '10+ messages'
         END AS message_count_range,
-        EXTRACT(EPOCH FROM (MAX(created_date) - MIN(created_date)))/60 AS duration_minutes,
-        AVG(CASE WHEN role = 'apiMessage' THEN message_length ELSE NULL END) AS avg_response_length
+        duration_seconds / 60 AS duration_minutes,
+        avg_response_length
     FROM 
-        {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
-    GROUP BY 
-        session_id
+        {SESSIONS_TABLE} -- oturum özet tablosu
+    WHERE 
+        source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
 ) subquery
 GROUP BY 
     message_count_range
 ORDER BY 
-    MIN(CASE 
-        WHEN message_count_range = '1-2 messages' THEN 1
-        WHEN message_count_range = '3-5 messages' THEN 2
-        WHEN message_count_range = '6-10 messages' THEN 3
-        ELSE 4
-    END);
\ No newline at end of file
+    range_order;
\ No newline at end of file
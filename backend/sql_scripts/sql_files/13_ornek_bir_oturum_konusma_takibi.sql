@@ -4,10 +4,11 @@
 
 SELECT 
   session_id, 
+  message_id, 
   role, 
   content, 
   context_summary,
   created_date 
 FROM {TABLE_NAME} 
 WHERE session_id = '47137f82-ad48-4df1-baca-1dee92ae1397' 
-ORDER BY created_date;
+ORDER BY created_date, message_id;
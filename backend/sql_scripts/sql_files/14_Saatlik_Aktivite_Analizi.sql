@@ -3,14 +3,16 @@
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
 
 SELECT 
-    EXTRACT(HOUR FROM created_date) AS hour_of_day,
-    COUNT(DISTINCT session_id) AS conversation_count,
-    COUNT(*) AS message_count,
-    ROUND(AVG(message_length)) AS avg_message_length,
-    COUNT(CASE WHEN has_context = TRUE THEN 1 END) AS context_used_count
+    EXTRACT(HOUR FROM bucket) AS hour_of_day,
+    SUM(active_sessions) AS conversation_count,
+    SUM(message_count) AS message_count,
+    ROUND(SUM(message_length_sum)::numeric / NULLIF(SUM(message_length_count), 0)) AS avg_message_length,
+    SUM(context_messages) AS context_used_count
 FROM 
-    {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
+    {ROLLUP_HOURLY_TABLE} -- saatlik özet tablosu
+WHERE 
+    source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
 GROUP BY 
     hour_of_day
 ORDER BY 
-    hour_of_day;
+    hour_of_day;
\ No newline at end of file
@@ -4,18 +4,16 @@
 
 SELECT 
     session_id,
-    MIN(created_date) AS start_time,
-    MAX(created_date) AS end_time,
-    COUNT(*) AS message_count,
-    COUNT(CASE WHEN has_context = TRUE THEN 1 END) AS context_used_count,
-    EXTRACT(EPOCH FROM (MAX(created_date) - MIN(created_date)))/60 AS duration_minutes
+    started_at AS start_time,
+    ended_at AS end_time,
+    message_count,
+    context_messages AS context_used_count,
+    duration_seconds / 60 AS duration_minutes
 FROM 
-    {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
+    {SESSIONS_TABLE} -- oturum özet tablosu
 WHERE 
-    created_date >= CURRENT_TIMESTAMP - INTERVAL '24 hours'
-GROUP BY 
-    session_id
-HAVING 
-    COUNT(*) > 2  -- En az 3 mesaj içeren oturumlar
+    source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
+    AND ended_at >= CURRENT_TIMESTAMP - INTERVAL '24 hours'
+    AND message_count > 2  -- En az 3 mesaj içeren oturumlar
 ORDER BY 
     end_time DESC;
@@ -4,14 +4,13 @@
 
 SELECT 
     session_id,
-    MIN(created_date) AS start_time,
-    COUNT(*) AS message_count,
-    EXTRACT(EPOCH FROM (NOW() - MIN(created_date)))/60 AS minutes_ago
+    started_at AS start_time,
+    message_count,
+    EXTRACT(EPOCH FROM (NOW() - started_at))/60 AS minutes_ago
 FROM 
-    {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
+    {SESSIONS_TABLE} -- oturum özet tablosu
 WHERE 
-    created_date >= CURRENT_TIMESTAMP - INTERVAL '1 hour'
-GROUP BY 
-    session_id
+    source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
+    AND started_at >= CURRENT_TIMESTAMP - INTERVAL '1 hour'  -- Son bir saatte başlayan oturumlar
 ORDER BY 
     start_time DESC;
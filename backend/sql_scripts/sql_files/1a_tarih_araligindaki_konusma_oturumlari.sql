@@ -6,15 +6,15 @@
 
 SELECT 
     session_id,
-    MIN(created_date) AS conversation_start,
-    MAX(created_date) AS conversation_end,
-    COUNT(*) AS message_count,
-    COUNT(CASE WHEN has_context = TRUE THEN 1 END) AS messages_with_context
+    started_at AS conversation_start,
+    ended_at AS conversation_end,
+    message_count,
+    context_messages AS messages_with_context
 FROM 
-    {TABLE_NAME}
+    {SESSIONS_TABLE} -- oturum özet tablosu
 WHERE 
-    created_date BETWEEN '{START_DATE}' AND '{END_DATE}'
-GROUP BY 
-    session_id
+    source_table = '{TABLE_NAME}'
+    AND started_at <= '{END_DATE}'  -- Aralıkla kesişen oturumlar
+    AND ended_at >= '{START_DATE}'
 ORDER BY 
     conversation_start DESC; 
\ No newline at end of file
@@ -2,33 +2,24 @@
 -- Parametreler:
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
 
-WITH ordered_messages AS (
-    SELECT 
-        session_id,
-        message_id,
-        role,
-        content,
-        created_date,
-        message_length,
-        has_context,
-        ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY created_date) AS msg_order
-    FROM 
-        {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
-)
 SELECT 
-    q.session_id,
+    p.session_id,
+    p.question_id,
+    p.question_time,
     q.content AS question,
     a.content AS answer,
-    q.message_length AS question_length,
-    a.message_length AS answer_length,
-    a.has_context AS answer_used_context,
-    EXTRACT(EPOCH FROM (a.created_date - q.created_date)) AS response_time_seconds
+    p.question_length,
+    p.answer_length,
+    p.has_context AS answer_used_context,
+    p.response_seconds AS response_time_seconds
 FROM 
-    ordered_messages q
+    {QA_PAIRS_TABLE} p -- soru-cevap çiftleri tablosu
 JOIN 
-    ordered_messages a ON q.session_id = a.session_id AND q.msg_order + 1 = a.msg_order
+    {TABLE_NAME} q ON q.id = p.question_row_id
+JOIN 
+    {TABLE_NAME} a ON a.id = p.answer_row_id
 WHERE 
-    q.role = 'userMessage' AND a.role = 'apiMessage'
+    p.source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
 ORDER BY 
-    q.created_date DESC
+    p.question_time DESC
 LIMIT 1000;
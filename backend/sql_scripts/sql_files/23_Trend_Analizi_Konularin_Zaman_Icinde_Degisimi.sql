@@ -2,24 +2,17 @@
 -- Parametreler:
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
 
--- Buradaki değişkenler admin panelinde sorulmalı ardından sorgulama kayıt edilmeli ve kullanıcı ekranında analiz görünmeli. Admin ekranında "aranacak kelime" "başlık" şeklinde doldurulmalı ve uygun sorgulama yazılmalı ve kayıt edilmeli. Uygun sayfa ve kodlama tasarımını yapmalısın.
+-- Konular admin panelinde tanımlanan konu sözlüğünden (aranacak kelime -> başlık) hesaplanır. Kullanıcı mesajları message_topics tablosunda önceden etiketlenir; sözlük değiştiğinde etiketler arka planda yenilenir.
 
 
 SELECT 
     DATE_TRUNC('week', created_date) AS week,
-    CASE 
-        WHEN LOWER(content) LIKE '%saat%' OR LOWER(content) LIKE '%çalışma saatleri%' THEN 'Müze Çalışma Saatleri'
-        WHEN LOWER(content) LIKE '%osmanlı%' THEN 'Osmanlı Dönemi'
-        WHEN LOWER(content) LIKE '%atatürk%' THEN 'Atatürk İle İlgili'
-        WHEN LOWER(content) LIKE '%gemi%' OR LOWER(content) LIKE '%tekne%' THEN 'Gemiler'
-        WHEN LOWER(content) LIKE '%sancak%' THEN 'Sancak'
-        ELSE 'Diğer'
-    END AS topic,
+    topic,
     COUNT(*) AS question_count
 FROM 
-    {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
+    {MESSAGE_TOPICS_TABLE} -- konu etiketleri tablosu
 WHERE 
-    role = 'userMessage'
+    source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
     AND created_date >= CURRENT_DATE - INTERVAL '3 months'
 GROUP BY 
     week, topic
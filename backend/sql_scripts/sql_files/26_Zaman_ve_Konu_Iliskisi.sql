@@ -2,23 +2,17 @@
 -- Parametreler:
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
 
--- Buradaki değişkenler admin panelinde sorulmalı ardından sorgulama kayıt edilmeli ve kullanıcı ekranında analiz görünmeli. Admin ekranında "aranacak kelime" "başlık" şeklinde doldurulmalı ve uygun sorgulama yazılmalı ve kayıt edilmeli.
+-- Konular admin panelinde tanımlanan konu sözlüğünden (aranacak kelime -> başlık) hesaplanır. Kullanıcı mesajları message_topics tablosunda önceden etiketlenir; sözlük değiştiğinde etiketler arka planda yenilenir.
+-- Anahtar kelimeler Türkçe büyük/küçük harf kurallarıyla eşleşir (I -> ı, İ -> i). Eski LOWER(content) sürümünde eşleşmeyen "AÇIK", "OSMANLI" gibi büyük harfli yazımlar artık ilgili konuya sayılır.
 
 SELECT 
     EXTRACT(HOUR FROM created_date) AS hour_of_day,
-    CASE 
-        WHEN LOWER(content) LIKE '%saat%' OR LOWER(content) LIKE '%açık%' THEN 'Çalışma Saatleri'
-        WHEN LOWER(content) LIKE '%fiyat%' OR LOWER(content) LIKE '%ücret%' THEN 'Bilet Fiyatları'
-        WHEN LOWER(content) LIKE '%osmanlı%' THEN 'Osmanlı Dönemi'
-        WHEN LOWER(content) LIKE '%atatürk%' THEN 'Atatürk'
-        WHEN LOWER(content) LIKE '%gemi%' OR LOWER(content) LIKE '%tekne%' THEN 'Deniz Araçları'
-        ELSE 'Diğer'
-    END AS query_topic,
+    topic AS query_topic,
     COUNT(*) AS query_count
 FROM 
-    {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
+    {MESSAGE_TOPICS_TABLE} -- konu etiketleri tablosu
 WHERE 
-    role = 'userMessage'
+    source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
 GROUP BY 
     hour_of_day, query_topic
 ORDER BY 
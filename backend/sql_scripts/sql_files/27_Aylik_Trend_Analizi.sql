@@ -3,25 +3,26 @@
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
 
 SELECT 
-    DATE_TRUNC('month', created_date) AS month,
-    COUNT(DISTINCT session_id) AS total_conversations,
-    COUNT(*) AS total_messages,
-    COUNT(DISTINCT session_id)::float / EXTRACT(DAY FROM DATE_TRUNC('month', NOW()) + INTERVAL '1 month - 1 day') AS avg_daily_conversations,
-    COUNT(CASE WHEN has_context = TRUE THEN 1 END) AS context_used_count,
-    ROUND(COUNT(CASE WHEN has_context = TRUE THEN 1 END)::float * 100 / COUNT(*), 2) AS context_usage_percentage
+    DATE_TRUNC('month', bucket) AS month,
+    SUM(new_sessions) AS total_conversations,
+    SUM(message_count) AS total_messages,
+    ROUND(SUM(new_sessions)::numeric / EXTRACT(DAY FROM DATE_TRUNC('month', bucket) + INTERVAL '1 month - 1 day'), 2) AS avg_daily_conversations,
+    SUM(context_messages) AS context_used_count,
+    ROUND(SUM(context_messages)::numeric * 100 / NULLIF(SUM(message_count), 0), 2) AS context_usage_percentage
 FROM 
-    {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
+    {ROLLUP_HOURLY_TABLE} -- saatlik özet tablosu
 WHERE 
-    created_date >= CURRENT_DATE - INTERVAL '6' months
+    source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
+    AND bucket >= DATE_TRUNC('month', CURRENT_DATE) - INTERVAL '6 months'
 GROUP BY 
     month
 ORDER BY 
     month;
 
--- Bu sorgu, aylık bazda aşağıdaki istatistikleri hesaplar:
--- 1. Toplam konuşma (oturum) sayısı
+-- Bu sorgu, aylık bazda aşağıdaki istatistikleri saatlik özet tablosundan hesaplar:
+-- 1. Toplam konuşma (o ay başlayan oturum) sayısı
 -- 2. Toplam mesaj sayısı
--- 3. Günlük ortalama konuşma sayısı
+-- 3. Günlük ortalama konuşma sayısı (ayın gün sayısına göre)
 -- 4. Context kullanım sayısı
 -- 5. Context kullanım yüzdesi
 -- 
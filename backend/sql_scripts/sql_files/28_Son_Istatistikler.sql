@@ -1,20 +1,23 @@
 -- 28_Son_Istatistikler
 -- Parametreler:
+-- {HOURS_INTERVAL} - Hours Interval (örn. 24)
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
 
 SELECT 
-    COUNT(DISTINCT session_id) as total_sessions,
-    COUNT(*) as total_messages,
-    ROUND(AVG(CASE WHEN has_context = TRUE THEN 1 ELSE 0 END) * 100, 2) as context_usage_percentage
+    COALESCE(SUM(new_sessions), 0) as total_sessions,
+    COALESCE(SUM(message_count), 0) as total_messages,
+    ROUND(SUM(context_messages)::numeric * 100 / NULLIF(SUM(message_count), 0), 2) as context_usage_percentage
 FROM 
-    {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
+    {ROLLUP_HOURLY_TABLE} -- saatlik özet tablosu
 WHERE 
-    created_date >= NOW() - INTERVAL '24' HOURS;
+    source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
+    AND bucket >= DATE_TRUNC('hour', NOW()) - make_interval(hours => {HOURS_INTERVAL});
 
--- Bu sorgu, belirli bir saat aralığındaki (varsayılan olarak son 24 saat) aşağıdaki istatistikleri hesaplar:
--- 1. Toplam oturum sayısı
+-- Bu sorgu, belirli bir saat aralığındaki (varsayılan olarak son 24 saat) aşağıdaki istatistikleri
+-- saatlik özet tablosundan hesaplar (aralık tam saat başından itibaren alınır):
+-- 1. Toplam oturum sayısı (bu aralıkta başlayan oturumlar)
 -- 2. Toplam mesaj sayısı
 -- 3. Context kullanım yüzdesi
 --
 -- Bu sorgu, dashboard'da hızlı bir genel bakış sağlamak için kullanılabilir.
--- Saat aralığı admin panelinden değiştirilebilir (örneğin son 12 saat, son 48 saat vb.). 
\ No newline at end of file
+-- Saat aralığı admin panelinden değiştirilebilir (örneğin son 12 saat, son 48 saat vb.).
\ No newline at end of file
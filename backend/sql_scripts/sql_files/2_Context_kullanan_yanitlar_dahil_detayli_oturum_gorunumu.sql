@@ -1,5 +1,6 @@
 -- 2_Context_kullanan_yanitlar_dahil_detayli_oturum_gorunumu
 -- Parametreler:
+-- {SESSION_ID} - Session Id
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
 
 SELECT 
@@ -14,6 +15,6 @@ SELECT
 FROM 
     {TABLE_NAME} m
 WHERE 
-    m.session_id = '47137f82-ad48-4df1-baca-1dee92ae1397' --örnek sesssion kodudur. değişken olmalıdır.
+    m.session_id = NULLIF({SESSION_ID}, '')::uuid  -- Seçilen oturum ID'si (boşsa satır dönmez)
 ORDER BY 
     m.created_date ASC;
\ No newline at end of file
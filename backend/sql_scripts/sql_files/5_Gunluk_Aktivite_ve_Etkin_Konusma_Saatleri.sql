@@ -3,17 +3,18 @@
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
 
 SELECT 
-    DATE(created_date) AS day,
-    EXTRACT(HOUR FROM created_date) AS hour,
-    COUNT(DISTINCT session_id) AS active_sessions,
-    COUNT(*) AS message_count,
-    COUNT(CASE WHEN role = 'userMessage' THEN 1 END) AS user_messages,
-    COUNT(CASE WHEN role = 'apiMessage' THEN 1 END) AS ai_responses,
-    ROUND(AVG(message_length)) AS avg_message_length
+    DATE(bucket) AS day,
+    EXTRACT(HOUR FROM bucket) AS hour,
+    SUM(active_sessions) AS active_sessions,
+    SUM(message_count) AS message_count,
+    SUM(user_messages) AS user_messages,
+    SUM(ai_messages) AS ai_responses,
+    ROUND(SUM(message_length_sum)::numeric / NULLIF(SUM(message_length_count), 0)) AS avg_message_length
 FROM 
-    {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
+    {ROLLUP_HOURLY_TABLE} -- saatlik özet tablosu
 WHERE 
-    created_date >= CURRENT_DATE - INTERVAL '14 days'
+    source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
+    AND bucket >= CURRENT_DATE - INTERVAL '14 days'
 GROUP BY 
     day, hour
 ORDER BY 
@@ -3,18 +3,20 @@
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
 
 SELECT 
-    DATE(created_date) AS date,
-    COUNT(DISTINCT session_id) AS total_conversations,
-    COUNT(*) AS total_messages,
-    COUNT(CASE WHEN role = 'userMessage' THEN 1 END) AS user_messages,
-    COUNT(CASE WHEN role = 'apiMessage' THEN 1 END) AS ai_messages,
-    COUNT(CASE WHEN has_context = TRUE THEN 1 END) AS messages_with_context,
-    ROUND(AVG(message_length)) AS avg_message_length
+    DATE(bucket) AS date,
+    SUM(new_sessions) AS total_conversations,
+    SUM(message_count) AS total_messages,
+    SUM(user_messages) AS user_messages,
+    SUM(ai_messages) AS ai_messages,
+    SUM(context_messages) AS messages_with_context,
+    ROUND(SUM(message_length_sum)::numeric / NULLIF(SUM(message_length_count), 0)) AS avg_message_length
 FROM 
-    {TABLE_NAME}
+    {ROLLUP_HOURLY_TABLE}
 WHERE 
-    created_date BETWEEN CURRENT_DATE - INTERVAL '30 days' AND CURRENT_DATE
+    source_table = '{TABLE_NAME}'
+    AND bucket >= CURRENT_DATE - INTERVAL '30 days'
+    AND bucket < CURRENT_DATE
 GROUP BY 
-    DATE(created_date)
+    DATE(bucket)
 ORDER BY 
     date DESC;
\ No newline at end of file
@@ -3,33 +3,17 @@
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
 
 SELECT 
-    TO_CHAR(created_date, 'Day') AS day_of_week,
-    EXTRACT(DOW FROM created_date) AS day_number,
-    COUNT(DISTINCT session_id) AS conversation_count,
-    COUNT(*) AS message_count,
-    COUNT(CASE WHEN has_context = TRUE THEN 1 END) AS context_used_count,
-    ROUND(AVG(message_length)) AS avg_message_length
+    TO_CHAR(bucket, 'Day') AS day_of_week,
+    EXTRACT(DOW FROM bucket) AS day_number,
+    SUM(new_sessions) AS conversation_count,
+    SUM(message_count) AS message_count,
+    SUM(context_messages) AS context_used_count,
+    ROUND(SUM(message_length_sum)::numeric / NULLIF(SUM(message_length_count), 0)) AS avg_message_length
 FROM 
-    {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
-GROUP BY 
-    day_of_week, day_number
-ORDER BY 
-    day_number;
-	
-
-Ay Bazında Trend Analizi:
-SELECT 
-    DATE_TRUNC('month', created_date) AS month,
-    COUNT(DISTINCT session_id) AS total_conversations,
-    COUNT(*) AS total_messages,
-    COUNT(DISTINCT session_id)::float / EXTRACT(DAY FROM DATE_TRUNC('month', NOW()) + INTERVAL '1 month - 1 day') AS avg_daily_conversations,
-    COUNT(CASE WHEN has_context = TRUE THEN 1 END) AS context_used_count,
-    ROUND(COUNT(CASE WHEN has_context = TRUE THEN 1 END)::float * 100 / COUNT(*), 2) AS context_usage_percentage
-FROM 
-    {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
+    {ROLLUP_HOURLY_TABLE} -- saatlik özet tablosu
 WHERE 
-    created_date >= CURRENT_DATE - INTERVAL '6 months'
+    source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
 GROUP BY 
-    month
+    day_of_week, day_number
 ORDER BY 
-    month;
\ No newline at end of file
+    day_number;
\ No newline at end of file
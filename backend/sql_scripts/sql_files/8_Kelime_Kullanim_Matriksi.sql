@@ -1,47 +1,35 @@
 -- 8_Kelime_Kullanim_Matriksi
 -- Parametreler:
+-- {END_DATE} - End Date (örn. 2026-10-18)
+-- {EXCLUDED_WORDS} - Excluded Words (örn. ve, veya, için, bir, ile, bu, de, da)
+-- {MIN_WORD_COUNT} - Min Word Count (örn. 5)
+-- {MIN_WORD_LENGTH} - Min Word Length (örn. 3)
+-- {START_DATE} - Start Date (örn. 2026-10-11)
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
+-- {WORD_LIMIT} - Word Limit (örn. 100)
 
---Kelime bulutu oluşturma işlemi admin ekranında sorulacak. Admin'in yazdığı kelimeler buradaki bölüme eklenecek ve sorgulama türü kayıt edilecek. 
+--Kelime bulutu oluşturma işlemi admin ekranında sorulacak. Admin'in yazdığı kelimeler hariç tutulacak kelimeler listesine eklenecek.
+--Kelimeler gün ve rol bazında önceden sayılır; sorgu yalnızca seçilen tarih aralığındaki sayıları toplar.
 
-WITH word_extraction AS (
-    SELECT 
-        role,
-        regexp_split_to_table(
-            regexp_replace(
-                regexp_replace(
-                    LOWER(content), 
-                    '[^\w\s]', ' ', 'g'
-                ),
-                '\s+', ' ', 'g'
-            ),
-            ' '
-        ) AS word
-    FROM 
-        {TABLE_NAME} --bu değişken adminin yazacağı tabloya göre değişmeli
-    WHERE 
-        LENGTH(content) > 0
-),
-filtered_words AS (
-    SELECT 
-        role,
-        word
-    FROM 
-        word_extraction
-    WHERE 
-        LENGTH(word) > 3
-        AND word NOT IN ('merhaba', 'selam') --Burada ki değişkenler admine sorulacak.
-)
 SELECT 
     role,
     word,
-    COUNT(*) AS word_count
+    SUM(word_count) AS word_count
 FROM 
-    filtered_words
+    {WORD_COUNTS_TABLE} -- gün ve rol bazında kelime sayıları tablosu
+WHERE 
+    source_table = '{TABLE_NAME}' --bu değişken adminin yazacağı tabloya göre değişmeli
+    AND day >= COALESCE(NULLIF('{START_DATE}', '')::date, '-infinity')  -- Tarih aralığı boşsa tüm günler
+    AND day <= COALESCE(NULLIF('{END_DATE}', '')::date, 'infinity')
+    AND LENGTH(word) > {MIN_WORD_LENGTH}
+    AND word <> ALL (
+        SELECT LOWER(TRANSLATE(excluded, 'İIÇĞÖŞÜÂÎÛ', 'iıçğöşüâîû'))
+        FROM unnest({EXCLUDED_WORDS}::text[]) AS excluded
+    ) --Burada ki değişkenler admine sorulacak.
 GROUP BY 
     role, word
 HAVING 
-    COUNT(*) > 5
+    SUM(word_count) > {MIN_WORD_COUNT}
 ORDER BY 
-    role, word_count DESC
-LIMIT 1000;
\ No newline at end of file
+    role, word_count DESC, word
+LIMIT {WORD_LIMIT};
\ No newline at end of file
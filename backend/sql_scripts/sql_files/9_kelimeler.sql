@@ -1,21 +1,27 @@
 -- 9_kelimeler
 -- Parametreler:
+-- {END_DATE} - End Date (örn. 2026-10-18)
+-- {EXCLUDED_WORDS} - Excluded Words (örn. ve, veya, için, bir, ile, bu, de, da)
+-- {START_DATE} - Start Date (örn. 2026-10-11)
 -- {TABLE_NAME} - Table Name (örn. customer_denizmuzesi)
 
 SELECT 
     word,
-    COUNT(*) AS occurrence_count
-FROM (
-    SELECT 
-        regexp_split_to_table(LOWER(content), '\s+') AS word
-    FROM 
-        {TABLE_NAME}
-    WHERE 
-        role = 'userMessage'
-        AND LENGTH(word) > 3  -- 3 karakterden uzun kelimeleri filtrele
-) words
+    SUM(word_count) AS occurrence_count
+FROM 
+    {WORD_COUNTS_TABLE} -- gün ve rol bazında kelime sayıları tablosu
+WHERE 
+    source_table = '{TABLE_NAME}'
+    AND role = 'userMessage'
+    AND day >= COALESCE(NULLIF('{START_DATE}', '')::date, '-infinity')  -- Tarih aralığı boşsa tüm günler
+    AND day <= COALESCE(NULLIF('{END_DATE}', '')::date, 'infinity')
+    AND LENGTH(word) > 3  -- 3 karakterden uzun kelimeleri filtrele
+    AND word <> ALL (
+        SELECT LOWER(TRANSLATE(excluded, 'İIÇĞÖŞÜÂÎÛ', 'iıçğöşüâîû'))
+        FROM unnest({EXCLUDED_WORDS}::text[]) AS excluded
+    ) --Burada ki değişkenler admine sorulacak.
 GROUP BY 
     word
 ORDER BY 
-    occurrence_count DESC
+    occurrence_count DESC, word
 LIMIT 200;
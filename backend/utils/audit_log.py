@@ -0,0 +1,494 @@
+import os
+import re
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import traceback
+from datetime import date, datetime, timedelta, timezone
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+from utils.db import get_db_connection, execute_query
+from utils.pagination import encode_cursor, decode_cursor
+from config import (
+    SYSTEM_TABLE_PREFIX, AUDIT_LOG_QUEUE_SIZE, AUDIT_LOG_BATCH_SIZE, AUDIT_LOG_FLUSH_INTERVAL,
+    AUDIT_LOG_RETENTION_DAYS, AUDIT_LOG_PARTITIONS_AHEAD, AUDIT_LOG_EXACT_COUNT_BELOW
+)
+
+AUDIT_LOGS_TABLE = f"{SYSTEM_TABLE_PREFIX}logs"
+AUDIT_LOGS_DEFAULT_PARTITION = f"{AUDIT_LOGS_TABLE}_default"
+USERS_TABLE = f"{SYSTEM_TABLE_PREFIX}users"
+
+# Aylık bölümler: <logs>_pYYYYMM
+_PARTITION_PATTERN = re.compile(rf"^{re.escape(AUDIT_LOGS_TABLE)}_p(\d{{4}})(\d{{2}})$")
+
+# Listeleme sırası ve cursor anahtarı (en yeni kayıt önce)
+AUDIT_LOG_ORDER_KEY = [('created_at', 'DESC'), ('id', 'DESC')]
+
+_INSERT_SQL = f"""
+INSERT INTO {AUDIT_LOGS_TABLE} (user_id, action, details, ip_address, created_at)
+VALUES %s
+"""
+
+# Yazıcı thread'ine kapanışta gönderilen işaret
+_STOP = object()
+
+class AuditLogWriter:
+    """
+    Denetim kayıtlarını (logs tablosu) istek dışında, topluca yazan yazıcı.
+
+    - log() kaydı yalnızca sınırlı bir kuyruğa ekler; istek süresine veritabanı yazması eklenmez
+    - Arka plandaki thread kayıtları batch_size adede ulaşınca ya da flush_interval saniye
+      dolunca tek bir çok satırlı INSERT ile yazar
+    - Kuyruk doluysa kayıt atılmaz, istek içinde doğrudan yazılır
+    - Toplu yazma başarısız olursa kayıtlar tek tek yeniden denenir; yalnızca hatalı kayıt kaybolur
+    - close() kuyrukta kalan kayıtları yazıp thread'i durdurur (süreç kapanırken çağrılır)
+    """
+
+    def __init__(self, queue_size, batch_size=200, flush_interval=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._writer = None
+        self._closed = False
+        self._stats = {
+            'queued': 0,
+            'written': 0,
+            'batches': 0,
+            'direct': 0,
+            'failed': 0
+        }
+
+    def log(self, user_id, action, details=None, ip_address=None):
+        """
+        Denetim kaydını yazılmak üzere kuyruğa ekler.
+
+        Args:
+            user_id: İşlemi yapan kullanıcının ID'si
+            action (str): İşlem adı (ör. 'create_user', 'admin_login')
+            details (dict, str): İşlem ayrıntıları; sözlükler JSON'a çevrilir
+            ip_address (str): İstemci IP adresi
+        """
+        record = (
+            user_id,
+            action,
+            details if details is None or isinstance(details, str) else json.dumps(details, default=str),
+            ip_address,
+            datetime.now(timezone.utc)
+        )
+
+        if self._closed:
+            self._write_direct(record)
+            return
+
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            logging.warning("Denetim kaydı kuyruğu dolu, kayıt doğrudan yazılıyor")
+            self._write_direct(record)
+            return
+
+        with self._lock:
+            self._stats['queued'] += 1
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name='audit-log-writer', daemon=True)
+                self._writer.start()
+
+    def _write_direct(self, record):
+        self._persist([record])
+        with self._lock:
+            self._stats['direct'] += 1
+
+    def _write_loop(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=60)
+            except queue.Empty:
+                continue
+            if first is _STOP:
+                return
+
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    record = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stop = True
+                    break
+                batch.append(record)
+
+            self._persist(batch)
+            if stop:
+                return
+
+    def _persist(self, records):
+        try:
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    execute_values(cursor, _INSERT_SQL, records, page_size=self.batch_size)
+                conn.commit()
+            with self._lock:
+                self._stats['written'] += len(records)
+                self._stats['batches'] += 1
+            return
+        except Exception as e:
+            if len(records) == 1:
+                logging.error(f"Denetim kaydı yazılamadı ({records[0][1]}): {e}")
+                logging.debug(traceback.format_exc())
+                with self._lock:
+                    self._stats['failed'] += 1
+                return
+            logging.warning(f"Denetim kayıtları toplu yazılamadı, tek tek deneniyor: {e}")
+
+        # Tek bir hatalı kayıt (ör. silinmiş kullanıcı) tüm partiyi kaybettirmesin
+        for record in records:
+            self._persist([record])
+
+    def close(self, timeout=5.0):
+        """
+        Kuyrukta bekleyen kayıtları yazar ve yazıcı thread'ini durdurur. Sonraki log()
+        çağrıları doğrudan yazılır.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            writer = self._writer
+
+        if writer is not None and writer.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=timeout)
+                writer.join(timeout)
+            except queue.Full:
+                pass
+
+        # Thread çalışmıyorsa (veya zamanında bitmediyse) kalanlar burada yazılır
+        remaining = []
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is not _STOP:
+                remaining.append(record)
+        if remaining:
+            self._persist(remaining)
+
+    def stats(self):
+        """Yazıcının metriklerini döndürür."""
+        with self._lock:
+            return {
+                'pending': self._queue.qsize(),
+                'queue_size': self._queue.maxsize,
+                'batch_size': self.batch_size,
+                'flush_interval': self.flush_interval,
+                **self._stats
+            }
+
+def _month_start(day):
+    return date(day.year, day.month, 1)
+
+def _next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+def _partition_name(month):
+    return f"{AUDIT_LOGS_TABLE}_p{month.year:04d}{month.month:02d}"
+
+def _table_kind(cursor, table_name):
+    """Tablonun pg_class.relkind değerini döndürür ('r': normal, 'p': bölümlenmiş, None: yok)."""
+    cursor.execute(
+        "SELECT c.relkind FROM pg_class c WHERE c.oid = to_regclass(%s)", (table_name,)
+    )
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def _create_partitioned_table(cursor):
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {AUDIT_LOGS_TABLE} (
+        id BIGSERIAL,
+        user_id INTEGER,
+        action VARCHAR(100) NOT NULL,
+        details JSONB,
+        ip_address VARCHAR(50),
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, created_at),
+        FOREIGN KEY (user_id) REFERENCES {USERS_TABLE}(id) ON DELETE SET NULL
+    ) PARTITION BY RANGE (created_at)
+    """)
+    # Bölümü henüz oluşturulmamış bir aya düşen kayıtlar kaybolmasın
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {AUDIT_LOGS_DEFAULT_PARTITION} PARTITION OF {AUDIT_LOGS_TABLE} DEFAULT"
+    )
+    # Listeleme (created_at, id) keyset sırasıyla; işlem ve kullanıcı filtreleri aynı sırayı korur
+    cursor.execute(f"""
+    CREATE INDEX IF NOT EXISTS idx_{AUDIT_LOGS_TABLE}_created
+    ON {AUDIT_LOGS_TABLE} (created_at DESC, id DESC)
+    """)
+    cursor.execute(f"""
+    CREATE INDEX IF NOT EXISTS idx_{AUDIT_LOGS_TABLE}_action_created
+    ON {AUDIT_LOGS_TABLE} (action, created_at DESC, id DESC)
+    """)
+    cursor.execute(f"""
+    CREATE INDEX IF NOT EXISTS idx_{AUDIT_LOGS_TABLE}_user_created
+    ON {AUDIT_LOGS_TABLE} (user_id, created_at DESC, id DESC)
+    """)
+
+def _create_partition(cursor, month):
+    """
+    Verilen ayın bölümünü oluşturur. Varsayılan bölümde o aya ait kayıtlar varsa
+    önce oradan alınıp yeni bölüme taşınır (aksi halde bölüm oluşturulamaz).
+    """
+    lower, upper = month, _next_month(month)
+    cursor.execute(f"CREATE TEMP TABLE _audit_log_moved (LIKE {AUDIT_LOGS_TABLE}) ON COMMIT DROP")
+    cursor.execute(f"""
+    WITH moved AS (
+        DELETE FROM {AUDIT_LOGS_DEFAULT_PARTITION}
+        WHERE created_at >= %(lower)s AND created_at < %(upper)s
+        RETURNING *
+    )
+    INSERT INTO _audit_log_moved SELECT * FROM moved
+    """, {'lower': lower, 'upper': upper})
+    moved = cursor.rowcount
+    cursor.execute(sql.SQL("CREATE TABLE {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)").format(
+        sql.Identifier(_partition_name(month)), sql.Identifier(AUDIT_LOGS_TABLE)
+    ), (lower, upper))
+    if moved:
+        cursor.execute(f"INSERT INTO {AUDIT_LOGS_TABLE} SELECT * FROM _audit_log_moved")
+        logging.info(f"{moved} denetim kaydı varsayılan bölümden {_partition_name(month)} bölümüne taşındı")
+    cursor.execute("DROP TABLE _audit_log_moved")
+
+def _convert_to_partitioned(cursor):
+    """
+    Bölümlenmemiş (eski) logs tablosunu bölümlenmiş tabloya çevirir. Eski tablo yeniden
+    adlandırılır, kayıtlar aylık bölümlere kopyalanır ve eski tablo silinir.
+    """
+    legacy = f"{AUDIT_LOGS_TABLE}_legacy"
+    cursor.execute(f"LOCK TABLE {AUDIT_LOGS_TABLE} IN ACCESS EXCLUSIVE MODE")
+    cursor.execute(f"ALTER TABLE {AUDIT_LOGS_TABLE} RENAME TO {legacy}")
+    # Birincil anahtar indeksi ve sequence adları yeni tabloyla çakışmasın
+    cursor.execute(f"ALTER INDEX IF EXISTS {AUDIT_LOGS_TABLE}_pkey RENAME TO {legacy}_pkey")
+    cursor.execute(f"ALTER SEQUENCE IF EXISTS {AUDIT_LOGS_TABLE}_id_seq RENAME TO {legacy}_id_seq")
+
+    _create_partitioned_table(cursor)
+    cursor.execute(f"SELECT MIN(created_at) AS first_log FROM {legacy}")
+    first_log = cursor.fetchone()[0]
+    if first_log is not None:
+        month = _month_start(first_log)
+        current = _month_start(datetime.now())
+        while month <= current:
+            _create_partition(cursor, month)
+            month = _next_month(month)
+
+    # Silinmiş kullanıcılara ait kayıtlar foreign key'in ON DELETE SET NULL davranışıyla taşınır
+    cursor.execute(f"""
+    INSERT INTO {AUDIT_LOGS_TABLE} (id, user_id, action, details, ip_address, created_at)
+    SELECT l.id, u.id, l.action, l.details::jsonb, l.ip_address, COALESCE(l.created_at, CURRENT_TIMESTAMP)
+    FROM {legacy} l
+    LEFT JOIN {USERS_TABLE} u ON u.id = l.user_id
+    """)
+    copied = cursor.rowcount
+    cursor.execute(f"""
+    SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 0) + 1, false)
+    FROM {AUDIT_LOGS_TABLE}
+    """, (AUDIT_LOGS_TABLE,))
+    cursor.execute(f"DROP TABLE {legacy}")
+    logging.info(f"{AUDIT_LOGS_TABLE} tablosu aylık bölümlenmiş tabloya çevrildi ({copied} kayıt)")
+
+def create_audit_log_table():
+    """
+    Denetim kayıtları (logs) tablosunu created_at'e göre aylık bölümlenmiş (range
+    partitioned) olarak oluşturur. Tablo eski (bölümlenmemiş) haliyle varsa kayıtlarıyla
+    birlikte bölümlenmiş tabloya çevrilir. Ardından bölüm bakımı yapılır
+    (bkz. maintain_audit_log_partitions).
+
+    users tablosuna foreign key içerdiği için users tablosundan sonra çağrılmalıdır.
+    """
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                kind = _table_kind(cursor, AUDIT_LOGS_TABLE)
+                if kind == 'r':
+                    _convert_to_partitioned(cursor)
+                elif kind is None:
+                    _create_partitioned_table(cursor)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    maintain_audit_log_partitions()
+
+def maintain_audit_log_partitions():
+    """
+    Bu ay ve sonraki AUDIT_LOG_PARTITIONS_AHEAD ay için bölümleri oluşturur; tüm kayıtları
+    AUDIT_LOG_RETENTION_DAYS günden eski olan bölümleri siler (0 ise kayıtlar silinmez).
+    Bölüm silmek DELETE'in aksine tabloyu şişirmez ve VACUUM gerektirmez.
+
+    Returns:
+        dict: Oluşturulan ve silinen bölüm adları
+    """
+    created = []
+    dropped = []
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                if _table_kind(cursor, AUDIT_LOGS_TABLE) != 'p':
+                    conn.rollback()
+                    return {'created': created, 'dropped': dropped}
+
+                cursor.execute("""
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = to_regclass(%s)
+                """, (AUDIT_LOGS_TABLE,))
+                existing = {row[0] for row in cursor.fetchall()}
+
+                month = _month_start(datetime.now())
+                for _ in range(AUDIT_LOG_PARTITIONS_AHEAD + 1):
+                    name = _partition_name(month)
+                    if name not in existing:
+                        _create_partition(cursor, month)
+                        created.append(name)
+                    month = _next_month(month)
+
+                if AUDIT_LOG_RETENTION_DAYS > 0:
+                    cutoff = datetime.now() - timedelta(days=AUDIT_LOG_RETENTION_DAYS)
+                    for name in sorted(existing):
+                        match = _PARTITION_PATTERN.match(name)
+                        if not match:
+                            continue
+                        upper = _next_month(date(int(match.group(1)), int(match.group(2)), 1))
+                        if datetime.combine(upper, datetime.min.time()) <= cutoff:
+                            cursor.execute(sql.SQL("DROP TABLE {}").format(sql.Identifier(name)))
+                            dropped.append(name)
+
+                    # Bölümü olmayan eski kayıtlar varsayılan bölümde kalmış olabilir
+                    cursor.execute(
+                        f"DELETE FROM {AUDIT_LOGS_DEFAULT_PARTITION} WHERE created_at < %s", (cutoff,)
+                    )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    if created or dropped:
+        logging.info(f"Denetim kaydı bölümleri güncellendi: oluşturulan {created}, silinen {dropped}")
+    return {'created': created, 'dropped': dropped}
+
+def _log_filters(action=None, user_id=None):
+    conditions = []
+    values = {}
+    if action:
+        conditions.append("l.action = %(action)s")
+        values['action'] = action
+    if user_id is not None:
+        conditions.append("l.user_id = %(user_id)s")
+        values['user_id'] = user_id
+    return conditions, values
+
+def list_audit_logs(page_size, cursor=None, offset=0, action=None, user_id=None):
+    """
+    Denetim kayıtlarını en yeniden eskiye listeler.
+
+    cursor verilirse sayfa (created_at, id) anahtarıyla keyset olarak okunur; indeks
+    doğrudan son görülen kayıttan başlar, önceki sayfalar taranmaz. cursor yoksa eski
+    istemciler için offset kullanılır.
+
+    Args:
+        page_size (int): Sayfa boyutu
+        cursor (str): Önceki sayfanın next_cursor değeri
+        offset (int): cursor verilmediğinde atlanacak kayıt sayısı
+        action (str): Yalnızca bu işlemin kayıtları
+        user_id (int): Yalnızca bu kullanıcının kayıtları
+
+    Returns:
+        tuple: (kayıtlar, sonraki sayfanın cursor'ı veya None)
+
+    Raises:
+        PaginationError: Cursor geçersizse veya başka filtrelerle üretilmişse
+    """
+    filters = {'action': action, 'user_id': user_id}
+    conditions, values = _log_filters(action, user_id)
+
+    if cursor:
+        after = decode_cursor(cursor, AUDIT_LOGS_TABLE, AUDIT_LOG_ORDER_KEY, filters)
+        conditions.append("(l.created_at, l.id) < (%(after_created_at)s::timestamp, %(after_id)s)")
+        values.update({'after_created_at': after[0], 'after_id': after[1]})
+        offset = 0
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    values.update({'limit': page_size + 1, 'offset': offset})
+    rows = execute_query(f"""
+    SELECT l.id, l.action, l.details, l.ip_address, l.created_at,
+           u.username as user_username
+    FROM {AUDIT_LOGS_TABLE} l
+    LEFT JOIN {USERS_TABLE} u ON l.user_id = u.id
+    {where}
+    ORDER BY l.created_at DESC, l.id DESC
+    LIMIT %(limit)s OFFSET %(offset)s
+    """, values)
+
+    # Sonraki sayfa olup olmadığını anlamak için bir kayıt fazla istenir
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(AUDIT_LOGS_TABLE, AUDIT_LOG_ORDER_KEY, filters, rows[-1])
+    return rows, next_cursor
+
+def count_audit_logs(action=None, user_id=None, exact=False):
+    """
+    Denetim kaydı sayısını döndürür.
+
+    Varsayılan olarak sayı tahmin edilir: filtre yoksa bölümlerin pg_class.reltuples
+    değerleri toplanır, filtre varsa planlayıcının satır tahmini (EXPLAIN) kullanılır.
+    Tahmin AUDIT_LOG_EXACT_COUNT_BELOW'dan küçükse ya da istatistik yoksa COUNT(*) yapılır.
+
+    Returns:
+        tuple: (kayıt sayısı, tahmin mi?)
+    """
+    conditions, values = _log_filters(action, user_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    if not exact:
+        if conditions:
+            plan = execute_query(
+                f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {AUDIT_LOGS_TABLE} l {where}", values, fetch_all=False
+            )
+            estimate = plan['QUERY PLAN'][0]['Plan']['Plan Rows'] if plan else None
+        else:
+            # reltuples -1: tablo henüz analiz edilmemiş
+            result = execute_query("""
+            SELECT SUM(GREATEST(c.reltuples, 0)) AS estimate, MAX(c.reltuples) AS analyzed
+            FROM pg_class c
+            WHERE c.oid = to_regclass(%(table)s)
+               OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%(table)s))
+            """, {'table': AUDIT_LOGS_TABLE}, fetch_all=False)
+            estimate = int(result['estimate']) if result and result['analyzed'] is not None and result['analyzed'] >= 0 else None
+
+        if estimate is not None and estimate >= AUDIT_LOG_EXACT_COUNT_BELOW:
+            return int(estimate), True
+
+    result = execute_query(f"SELECT COUNT(*) AS total FROM {AUDIT_LOGS_TABLE} l {where}", values, fetch_all=False)
+    return result['total'], False
+
+# Süreç genelindeki denetim kaydı yazıcısı
+audit_log = AuditLogWriter(
+    AUDIT_LOG_QUEUE_SIZE,
+    batch_size=AUDIT_LOG_BATCH_SIZE,
+    flush_interval=AUDIT_LOG_FLUSH_INTERVAL
+)
+atexit.register(audit_log.close)
@@ -1,18 +1,35 @@
 import psycopg2
 import logging
 from psycopg2.extras import RealDictCursor
+from psycopg2 import extensions, sql
+from contextlib import contextmanager, nullcontext
+from collections import deque, OrderedDict
 import os
+import re
 import sys
+import time
+import uuid
+import queue
+import hashlib
+import atexit
+import threading
 import traceback
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
     SUPABASE_URL, SUPABASE_HOST, SUPABASE_PORT, SUPABASE_DATABASE,
-    SUPABASE_USER, SUPABASE_PASSWORD, SYSTEM_TABLE_PREFIX
+    SUPABASE_USER, SUPABASE_PASSWORD,
+    DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT,
+    DB_POOL_MAX_LIFETIME, DB_POOL_PING_INTERVAL,
+    DB_PREPARED_STATEMENTS, DB_PREPARED_STATEMENT_CACHE_SIZE, REPORT_STREAM_BATCH_SIZE
 )
+from utils.json_types import register_json_typecasters
 
 def get_connection():
     """
-    PostgreSQL veritabanına bağlantı oluşturur ve bir bağlantı nesnesi döndürür.
+    PostgreSQL veritabanına yeni bir bağlantı oluşturur ve bir bağlantı nesnesi döndürür.
+    
+    Not: Uygulama kodu bu fonksiyon yerine havuzdan bağlantı alan
+    get_db_connection() context manager'ını kullanmalıdır.
     """
     try:
         # SUPABASE_URL varsa, öncelikle onu kullan (tam bağlantı URL'si formatında)
@@ -36,51 +53,542 @@ def get_connection():
         logging.error(f"Hata detayı: {traceback.format_exc()}")
         raise
 
-def execute_query(query, params=None, fetch_all=True, commit=False, log_error=True):
+class PoolTimeoutError(Exception):
+    """Havuzdan belirlenen süre içinde bağlantı alınamadığında fırlatılır."""
+    pass
+
+class ConnectionPool:
+    """
+    Süreç genelinde paylaşılan, thread-safe PostgreSQL bağlantı havuzu.
+    
+    - En az min_size, en fazla max_size bağlantı tutar
+    - Havuz doluysa boş bağlantı için en fazla timeout saniye bekler
+    - Bağlantı verilmeden önce sağlık kontrolü yapılır (kapalı/bozuk bağlantılar atılır,
+      ping_interval saniyeden uzun boşta kalanlar SELECT 1 ile test edilir)
+    - max_lifetime saniyeden eski bağlantılar kapatılıp yenisiyle değiştirilir
+    """
+    
+    def __init__(self, min_size=1, max_size=10, timeout=30, max_lifetime=1800, ping_interval=30):
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        
+        self._cond = threading.Condition()
+        self._idle = deque()  # (conn, son kullanım zamanı)
+        self._created_at = {}  # conn -> oluşturulma zamanı
+        self._size = 0  # Açık (boşta + kullanımda) bağlantı sayısı
+        self._in_use = 0
+        self._closed = False
+        
+        # Metrikler
+        self._stats = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'connections_created': 0,
+            'connections_recycled': 0,
+            'connections_discarded': 0,
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0,
+            'peak_in_use': 0
+        }
+        
+        for _ in range(self.min_size):
+            try:
+                conn = self._connect()
+                with self._cond:
+                    self._size += 1
+                    self._idle.append((conn, time.monotonic()))
+            except Exception as e:
+                # Havuz yine de oluşturulur; bağlantılar ihtiyaç halinde açılır
+                logging.warning(f"Havuz ön bağlantısı açılamadı: {e}")
+                break
+    
+    def _connect(self):
+        conn = get_connection()
+        with self._cond:
+            self._created_at[conn] = time.monotonic()
+            self._stats['connections_created'] += 1
+        return conn
+    
+    def _close(self, conn):
+        self._created_at.pop(conn, None)
+        with _prepared_lock:
+            _prepared_statements.pop(conn, None)
+        try:
+            if not conn.closed:
+                conn.close()
+        except Exception as e:
+            logging.debug(f"Bağlantı kapatılırken hata: {e}")
+    
+    def _is_healthy(self, conn, last_used):
+        """Havuzdan verilecek bağlantının kullanılabilir olup olmadığını kontrol eder."""
+        if conn.closed:
+            return False
+        
+        created_at = self._created_at.get(conn, 0)
+        if self.max_lifetime and time.monotonic() - created_at > self.max_lifetime:
+            with self._cond:
+                self._stats['connections_recycled'] += 1
+            logging.debug("Bağlantı maksimum yaşam süresini aştı, yenileniyor")
+            return False
+        
+        if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        
+        # Uzun süre boşta kalan bağlantıyı sunucuya sorarak test et
+        if time.monotonic() - last_used > self.ping_interval:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except Exception as e:
+                logging.warning(f"Havuzdaki bağlantı sağlık kontrolünden geçemedi: {e}")
+                return False
+        
+        return True
+    
+    def getconn(self):
+        """
+        Havuzdan bir bağlantı alır. Boş bağlantı yoksa ve havuz doluysa
+        timeout süresi boyunca bekler, süre aşılırsa PoolTimeoutError fırlatır.
+        """
+        start = time.monotonic()
+        
+        while True:
+            entry = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Bağlantı havuzu kapatılmış")
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        # Yeni bağlantı için yer ayır, bağlantıyı kilit dışında aç
+                        self._size += 1
+                        break
+                    
+                    remaining = self.timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"{self.timeout} saniye içinde havuzdan bağlantı alınamadı "
+                            f"(kullanımda: {self._in_use}/{self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+            
+            if entry is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                conn, last_used = entry
+                if not self._is_healthy(conn, last_used):
+                    self._close(conn)
+                    with self._cond:
+                        self._size -= 1
+                        self._stats['connections_discarded'] += 1
+                    continue
+            
+            wait_time = time.monotonic() - start
+            with self._cond:
+                self._in_use += 1
+                self._stats['checkouts'] += 1
+                self._stats['total_wait_time'] += wait_time
+                self._stats['max_wait_time'] = max(self._stats['max_wait_time'], wait_time)
+                self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._in_use)
+            return conn
+    
+    def putconn(self, conn, discard=False):
+        """
+        Bağlantıyı havuza geri verir. Açık kalan transaction geri alınır;
+        bozuk bağlantılar veya discard=True ise bağlantı kapatılır.
+        """
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception as e:
+                logging.warning(f"Havuza dönen bağlantıda rollback başarısız: {e}")
+                discard = True
+        
+        with self._cond:
+            self._in_use -= 1
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                self._stats['connections_discarded'] += 1
+                close_conn = True
+            else:
+                self._idle.append((conn, time.monotonic()))
+                close_conn = False
+            self._cond.notify()
+        
+        if close_conn:
+            self._close(conn)
+    
+    @contextmanager
+    def connection(self):
+        """
+        Havuzdan bağlantı alıp blok sonunda geri veren context manager.
+        Bağlantı seviyesindeki hatalarda bağlantı havuza geri konmaz.
+        """
+        conn = self.getconn()
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        finally:
+            self.putconn(conn, discard=discard)
+    
+    def closeall(self):
+        """Havuzdaki tüm boş bağlantıları kapatır ve havuzu kullanıma kapatır."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close(conn)
+    
+    def stats(self):
+        """Havuz kullanım ve bekleme metriklerini döndürür."""
+        with self._cond:
+            checkouts = self._stats['checkouts']
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'checkouts': checkouts,
+                'timeouts': self._stats['timeouts'],
+                'connections_created': self._stats['connections_created'],
+                'connections_recycled': self._stats['connections_recycled'],
+                'connections_discarded': self._stats['connections_discarded'],
+                'peak_in_use': self._stats['peak_in_use'],
+                'total_wait_ms': round(self._stats['total_wait_time'] * 1000, 2),
+                'avg_wait_ms': round(self._stats['total_wait_time'] * 1000 / checkouts, 2) if checkouts else 0,
+                'max_wait_ms': round(self._stats['max_wait_time'] * 1000, 2)
+            }
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """
+    Süreç genelindeki bağlantı havuzunu döndürür, ilk çağrıda oluşturur.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    min_size=DB_POOL_MIN_SIZE,
+                    max_size=DB_POOL_MAX_SIZE,
+                    timeout=DB_POOL_TIMEOUT,
+                    max_lifetime=DB_POOL_MAX_LIFETIME,
+                    ping_interval=DB_POOL_PING_INTERVAL
+                )
+                logging.info(f"Veritabanı bağlantı havuzu oluşturuldu (min={DB_POOL_MIN_SIZE}, max={DB_POOL_MAX_SIZE})")
+    return _pool
+
+# pinned_connection bloğu içindeki thread'in kullandığı sabit bağlantı
+_pinned = threading.local()
+
+def get_db_connection():
+    """
+    Havuzdan bağlantı veren context manager. Thread'e pinned_connection ile bir
+    bağlantı sabitlendiyse havuza gidilmeden o bağlantı verilir.
+    
+    Kullanım:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+    """
+    conn = getattr(_pinned, 'conn', None)
+    if conn is not None:
+        timeout = getattr(_pinned, 'statement_timeout', None)
+        if timeout and conn.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE:
+            # SET LOCAL yalnızca bu transaction'da geçerlidir; pooler arkasında da
+            # bağlantıyı paylaşan başka bir istemcinin oturumuna sızmaz
+            with conn.cursor() as cursor:
+                cursor.execute("SET LOCAL statement_timeout = %s", (f"{timeout}s",))
+        return nullcontext(conn)
+    return get_pool().connection()
+
+@contextmanager
+def pinned_connection(conn, statement_timeout=None):
+    """
+    Blok içinde bu thread'deki tüm get_db_connection() (ve dolayısıyla execute_query)
+    çağrılarının verilen bağlantıyı kullanmasını sağlar. Rapor işleri bütün sorgularını
+    böylece tek bir backend'de çalıştırır; backend PID'i iş boyunca değişmez ve
+    başka bir isteğe geçmez (bkz. report_jobs.cancel_job).
+
+    Args:
+        conn: Çağıranın havuzdan aldığı ve blok boyunca elinde tuttuğu bağlantı
+        statement_timeout (int, optional): Verilirse get_db_connection() her yeni
+            transaction'ı SET LOCAL statement_timeout ile başlatır (saniye). Tek bir
+            get_db_connection() bloğu içinde commit edip devam eden kod (özet tablolarının
+            partili ilk oluşturması gibi) sonraki transaction'larda sunucu varsayılanıyla çalışır.
+    """
+    previous = getattr(_pinned, 'conn', None)
+    previous_timeout = getattr(_pinned, 'statement_timeout', None)
+    _pinned.conn = conn
+    _pinned.statement_timeout = statement_timeout
+    try:
+        yield conn
+    finally:
+        _pinned.conn = previous
+        _pinned.statement_timeout = previous_timeout
+
+def get_pool_stats():
+    """
+    Bağlantı havuzu metriklerini döndürür. Havuz henüz oluşturulmadıysa None döner.
+    """
+    if _pool is None:
+        return None
+    return _pool.stats()
+
+def close_pool():
+    """Uygulama kapanırken havuzdaki bağlantıları kapatır."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+atexit.register(close_pool)
+
+def _gevent_wait_callback(conn, timeout=None):
+    """psycopg2 bekleme callback'i: soket hazır olana kadar diğer greenlet'lere yol verir."""
+    from gevent.socket import wait_read, wait_write
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(f"Beklenmeyen bağlantı durumu: {state}")
+
+def _eventlet_wait_callback(conn, timeout=-1):
+    """_gevent_wait_callback'in eventlet karşılığı."""
+    from eventlet.hubs import trampoline
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            trampoline(conn.fileno(), read=True)
+        elif state == extensions.POLL_WRITE:
+            trampoline(conn.fileno(), write=True)
+        else:
+            raise psycopg2.OperationalError(f"Beklenmeyen bağlantı durumu: {state}")
+
+GREEN_WAIT_CALLBACKS = {
+    'gevent': _gevent_wait_callback,
+    'eventlet': _eventlet_wait_callback,
+}
+
+def enable_green_io(library):
+    """
+    psycopg2'nin veritabanı beklemelerini gevent/eventlet döngüsüne devreder. Callback
+    olmadan bir sorgu sürerken tüm worker (içindeki bütün greenlet'ler) bloklanır.
+    gunicorn.conf.py'deki post_worker_init kancasından, monkey patch'ten sonra çağrılır.
+
+    Args:
+        library (str): 'gevent' veya 'eventlet'
+    """
+    extensions.set_wait_callback(GREEN_WAIT_CALLBACKS[library])
+    logging.info(f"psycopg2 bekleme callback'i etkinleştirildi ({library})")
+
+def is_green_io():
+    """Veritabanı beklemeleri gevent/eventlet döngüsüne devredildiyse True döner."""
+    return extensions.get_wait_callback() is not None
+
+# Bağlantı başına sunucuda hazırlanmış ifadeler: conn -> OrderedDict(ifade adı -> None)
+# Havuzlar ve iş thread'leri arasında paylaşılır; sözlük, açık/kapalı bayrağı ve sayaçlar
+# _prepared_lock ile korunur. Bağlantıya ait ifade listesini yalnızca bağlantıyı o an
+# kullanan thread değiştirir.
+_prepared_statements = {}
+_prepared_enabled = DB_PREPARED_STATEMENTS
+_prepared_stats = {'prepares': 0, 'executions': 0, 'fallbacks': 0}
+_prepared_lock = threading.Lock()
+
+_NAMED_PARAM_PATTERN = re.compile(r'%\((\w+)\)s|%%')
+
+def _to_positional(query_text):
+    """
+    %(ad)s biçimindeki parametreleri PREPARE için $1, $2... biçimine çevirir.
+    
+    Returns:
+        tuple: (PREPARE gövdesi, parametre adlarının sırası)
+    """
+    names = []
+    
+    def replace(match):
+        if match.group(0) == '%%':
+            return '%'
+        name = match.group(1)
+        if name not in names:
+            names.append(name)
+        return f"${names.index(name) + 1}"
+    
+    return _NAMED_PARAM_PATTERN.sub(replace, query_text), names
+
+def _execute_prepared(conn, cursor, query, params):
+    """
+    Sorguyu bağlantıya özel hazırlanmış ifade (PREPARE/EXECUTE) olarak çalıştırır.
+    Aynı sorgu metni aynı bağlantıda tekrar geldiğinde PostgreSQL ayrıştırma ve
+    planlama adımlarını atlar.
+    
+    pgbouncer transaction modu gibi hazırlanmış ifadelerin oturumda kalmadığı
+    ortamlarda (26000 - invalid_sql_statement_name) özellik kapatılır ve sorgu
+    normal şekilde çalıştırılır.
+    """
+    global _prepared_enabled
+    
+    query_text = query.as_string(conn) if isinstance(query, sql.Composable) else query
+    body, names = _to_positional(query_text)
+    statement = 'knowhy_' + hashlib.md5(body.encode('utf-8')).hexdigest()[:16]
+    
+    with _prepared_lock:
+        statements = _prepared_statements.setdefault(conn, OrderedDict())
+    try:
+        if statement not in statements:
+            try:
+                cursor.execute(f"PREPARE {statement} AS {body}")
+                with _prepared_lock:
+                    _prepared_stats['prepares'] += 1
+            except psycopg2.Error as e:
+                if e.pgcode != '42P05':  # duplicate_prepared_statement
+                    raise
+                # İfade bu oturumda zaten var (önbellek bilgisi kaybolmuş olabilir)
+                conn.rollback()
+            statements[statement] = None
+            
+            # Önbellek dolduysa en eski ifadeyi sunucudan sil
+            while len(statements) > DB_PREPARED_STATEMENT_CACHE_SIZE:
+                oldest, _ = statements.popitem(last=False)
+                cursor.execute(f"DEALLOCATE {oldest}")
+        else:
+            statements.move_to_end(statement)
+        
+        values = tuple(params[name] for name in names)
+        if values:
+            cursor.execute(
+                f"EXECUTE {statement} ({', '.join(['%s'] * len(values))})",
+                values
+            )
+        else:
+            cursor.execute(f"EXECUTE {statement}")
+        with _prepared_lock:
+            _prepared_stats['executions'] += 1
+    except psycopg2.Error as e:
+        if e.pgcode != '26000':  # invalid_sql_statement_name
+            raise
+        logging.warning(
+            "Hazırlanmış ifade sunucuda bulunamadı (pgbouncer transaction modu olabilir), "
+            "prepared statement kullanımı kapatılıyor"
+        )
+        with _prepared_lock:
+            _prepared_enabled = False
+            _prepared_statements.clear()
+            _prepared_stats['fallbacks'] += 1
+        conn.rollback()
+        cursor.execute(query, params)
+
+def get_prepared_statement_stats():
+    """Hazırlanmış ifade kullanım metriklerini döndürür."""
+    with _prepared_lock:
+        return {
+            'enabled': _prepared_enabled,
+            'connections': len(_prepared_statements),
+            'statements': sum(len(statements) for statements in _prepared_statements.values()),
+            **_prepared_stats
+        }
+
+def execute_query(query, params=None, fetch_all=True, commit=False, log_error=True, prepare=False, columnar=False,
+                  json_types=False):
     """
     Veritabanında bir sorgu çalıştırır ve sonuçları döndürür.
     
     Args:
-        query (str): Çalıştırılacak SQL sorgusu
+        query (str, psycopg2.sql.Composable): Çalıştırılacak SQL sorgusu
         params (tuple, dict): Parametreler
         fetch_all (bool): Tüm sonuçları getir (True) veya sadece ilk satırı (False)
         commit (bool): İşlem sonrası commit yapılsın mı?
         log_error (bool): Hatayı logla
+        prepare (bool): Sorgu bağlantıda hazırlanmış ifade olarak çalıştırılsın mı?
+            (params, %(ad)s biçiminde sözlük olmalıdır)
+        columnar (bool): RealDictCursor yerine düz cursor kullan; satırlar sözlüğe
+            çevrilmeden tuple olarak döner (fetch_all ile birlikte kullanılır)
+        json_types (bool): numeric, tarih/saat ve interval değerleri okunurken JSON'a hazır
+            tiplere çevrilsin (bkz. utils/json_types.py)
         
     Returns:
         list: Sorgu sonuçları liste olarak
         dict: Tek satır sorgu sonucu sözlük olarak
+        tuple: columnar=True ise (kolon adları, tip OID'leri, satır tuple'ları)
         None: Sorgu hiç sonuç döndürmediyse
     """
-    conn = None
     try:
-        conn = get_connection()
-        logging.debug(f"Sorgu çalıştırılıyor: {query}")
-        logging.debug(f"Parametreler: {params}")
-        
-        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-            cursor.execute(query, params)
-            
-            if commit:
-                conn.commit()
-                logging.debug("Commit yapıldı")
-                
-            if cursor.description:
-                if fetch_all:
-                    result = cursor.fetchall()
-                    logging.debug(f"Sorgu sonucu: {len(result)} satır")
-                    return result
-                else:
-                    result = cursor.fetchone()
-                    logging.debug(f"Sorgu sonucu: {result}")
-                    return result
+        with get_db_connection() as conn:
+            logging.debug(f"Sorgu çalıştırılıyor: {query}")
+            logging.debug(f"Parametreler: {params}")
             
-            return None
+            try:
+                with conn.cursor(cursor_factory=None if columnar else RealDictCursor) as cursor:
+                    if json_types:
+                        register_json_typecasters(cursor)
+                    if prepare and _prepared_enabled and isinstance(params, dict):
+                        _execute_prepared(conn, cursor, query, params)
+                    else:
+                        cursor.execute(query, params)
+                    
+                    if commit:
+                        conn.commit()
+                        logging.debug("Commit yapıldı")
+                        
+                    if cursor.description:
+                        if columnar:
+                            result = cursor.fetchall()
+                            logging.debug(f"Sorgu sonucu: {len(result)} satır")
+                            return (
+                                [column.name for column in cursor.description],
+                                [column.type_code for column in cursor.description],
+                                result
+                            )
+                        if fetch_all:
+                            result = cursor.fetchall()
+                            logging.debug(f"Sorgu sonucu: {len(result)} satır")
+                            return result
+                        else:
+                            result = cursor.fetchone()
+                            logging.debug(f"Sorgu sonucu: {result}")
+                            return result
+                    
+                    return None
+            except Exception:
+                if not conn.closed:
+                    try:
+                        conn.rollback()
+                        logging.debug("Rollback yapıldı")
+                    except psycopg2.Error as rollback_error:
+                        logging.debug(f"Rollback yapılamadı: {rollback_error}")
+                raise
     except psycopg2.Error as e:
-        if conn and commit:
-            conn.rollback()
-            logging.debug("Rollback yapıldı")
-        
         # İstenirse hatayı logla
         if log_error:
             logging.error(f"SQL Sorgu hatası: {e}")
@@ -96,10 +604,6 @@ def execute_query(query, params=None, fetch_all=True, commit=False, log_error=Tr
         
         raise
     except Exception as e:
-        if conn and commit:
-            conn.rollback()
-            logging.debug("Rollback yapıldı")
-        
         # İstenirse hatayı logla
         if log_error:
             logging.error(f"Genel sorgu hatası: {e}")
@@ -108,61 +612,194 @@ def execute_query(query, params=None, fetch_all=True, commit=False, log_error=Tr
             logging.error(f"Hata detayı: {traceback.format_exc()}")
             
         raise
+
+def stream_query(query, params=None, batch_size=REPORT_STREAM_BATCH_SIZE, json_types=False, columnar=False):
+    """
+    Sorguyu sunucu tarafı (named) cursor ile çalıştırır ve satırları batch_size'lık
+    partiler halinde döndüren bir generator verir. Sonucun tamamı hiçbir zaman
+    bellekte tutulmaz; bağlantı generator tükenene ya da kapatılana kadar havuzdan
+    alınmış olarak kalır.
+    
+    Args:
+        query (str, psycopg2.sql.Composable): Çalıştırılacak SQL sorgusu
+        params (dict, tuple): Parametreler
+        batch_size (int): Sunucudan tek seferde çekilecek satır sayısı
+        json_types (bool): Değerler okunurken JSON'a hazır tiplere çevrilsin (bkz. execute_query)
+        columnar (bool): RealDictCursor yerine düz cursor kullan; ilk eleman kolon adları
+            listesi, sonrakiler satır tuple'larından oluşan partiler olur
+        
+    Yields:
+        list: Satır partisi (RealDictRow listesi; columnar=True ise önce kolon adları)
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    discard = False
+    cursor = None
+    try:
+        cursor = conn.cursor(
+            name=f"knowhy_stream_{uuid.uuid4().hex[:12]}",
+            cursor_factory=None if columnar else RealDictCursor
+        )
+        cursor.itersize = batch_size
+        if json_types:
+            register_json_typecasters(cursor)
+        cursor.execute(query, params)
+        
+        # Named cursor'da kolon bilgisi ilk fetch'ten sonra gelir
+        rows = cursor.fetchmany(batch_size)
+        if columnar:
+            yield [column.name for column in cursor.description]
+        while rows:
+            yield rows
+            rows = cursor.fetchmany(batch_size)
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        discard = True
+        raise
+    except psycopg2.Error as e:
+        logging.error(f"Akış sorgusu hatası: {e}")
+        logging.error(f"Sorgu: {query}")
+        raise
     finally:
-        if conn:
-            conn.close()
-            logging.debug("Veritabanı bağlantısı kapatıldı")
+        if cursor is not None and not conn.closed:
+            try:
+                cursor.close()
+            except psycopg2.Error as close_error:
+                logging.debug(f"Akış cursor'ı kapatılamadı: {close_error}")
+        # putconn açık kalan transaction'ı geri alır
+        pool.putconn(conn, discard=discard)
+
+class _CopyCancelled(Exception):
+    """COPY çıktısını okuyan taraf akışı bıraktı."""
+
+class _CopyOutBuffer:
+    """
+    copy_expert'in yazdığı satırları sınırlı bir kuyruk üzerinden akışı tüketen
+    generator'a aktaran dosya benzeri nesne. Satırlar chunk_bytes'lık parçalar halinde
+    kuyruğa konur; kuyruk doluysa (istemci yavaş okuyorsa) write() bekler ve COPY de
+    sunucudan okumayı durdurur.
+    """
+
+    def __init__(self, chunk_bytes, max_chunks=8):
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._parts = []
+        self._size = 0
+        self._chunk_bytes = chunk_bytes
+        self.cancelled = threading.Event()
+
+    def write(self, data):
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size >= self._chunk_bytes:
+            self._put(b''.join(self._parts))
+            self._parts = []
+            self._size = 0
+
+    def _put(self, item):
+        while True:
+            if self.cancelled.is_set():
+                raise _CopyCancelled()
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def finish(self, error=None, row_count=None):
+        """COPY bitti: kalan veriyi ve bitiş işaretini (veya hatayı) kuyruğa koyar."""
+        try:
+            if error is None and self._parts:
+                self._put(b''.join(self._parts))
+            self._put((error, row_count))
+        except _CopyCancelled:
+            pass
+
+    def chunks(self):
+        """Kuyruktaki parçaları döndürür; COPY'nin aktardığı satır sayısını return eder."""
+        while True:
+            item = self._queue.get()
+            if isinstance(item, tuple):
+                error, row_count = item
+                if error is not None:
+                    raise error
+                return row_count
+            yield item
+
+def copy_to_stream(query, params=None, options='FORMAT csv, HEADER true', chunk_bytes=64 * 1024):
+    """
+    Sorgunun sonucunu COPY (...) TO STDOUT ile PostgreSQL'in kendi CSV/metin biçiminde
+    alır ve bayt parçaları halinde döndüren bir generator verir. Satırlar Python
+    nesnelerine dönüştürülmez ve sonuç hiçbir zaman bellekte toplanmaz.
+
+    copy_expert dosyaya yazarak çalıştığı için COPY ayrı bir thread'de yürütülür,
+    parçalar sınırlı bir kuyruk üzerinden aktarılır. Generator erken kapatılırsa
+    (istemci bağlantıyı kesti) sorgu sunucuda iptal edilir.
+
+    COPY parametre bağlamayı desteklemez; değerler mogrify ile sorguya güvenli biçimde
+    gömülür. psycopg2 yeşil modda (bkz. enable_green_io) COPY desteklemez; bu durumda
+    çağıran stream_query kullanmalıdır (is_green_io).
+
+    Args:
+        query (str): SELECT sorgusu
+        params (dict, tuple): Parametreler
+        options (str): COPY ... WITH (...) seçenekleri
+        chunk_bytes (int): Yaklaşık parça boyutu
+
+    Yields:
+        bytes: COPY çıktısı parçaları (generator, aktarılan satır sayısını return eder)
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    buffer = _CopyOutBuffer(chunk_bytes)
+    producer = None
+    discard = False
+    try:
+        with conn.cursor() as cursor:
+            select_query = cursor.mogrify(query, params).decode(extensions.encodings.get(conn.encoding, 'utf-8'))
+        copy_query = f"COPY (\n{select_query}\n) TO STDOUT WITH ({options})"
+
+        def produce():
+            try:
+                with conn.cursor() as cursor:
+                    cursor.copy_expert(copy_query, buffer)
+                    buffer.finish(row_count=cursor.rowcount)
+            except Exception as e:
+                buffer.finish(error=e)
+
+        producer = threading.Thread(target=produce, name='knowhy-copy-out', daemon=True)
+        producer.start()
+        return (yield from buffer.chunks())
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        discard = True
+        raise
+    except psycopg2.Error as e:
+        logging.error(f"COPY sorgusu hatası: {e}")
+        logging.error(f"Sorgu: {query}")
+        raise
+    finally:
+        if producer is not None and producer.is_alive():
+            # Okuyan taraf akışı bıraktı: COPY'yi sunucuda iptal et; bağlantı COPY
+            # durumunda kalmış olabileceğinden havuza geri konmaz
+            buffer.cancelled.set()
+            try:
+                conn.cancel()
+            except psycopg2.Error as cancel_error:
+                logging.debug(f"COPY iptal edilemedi: {cancel_error}")
+            producer.join(timeout=5)
+            discard = True
+        pool.putconn(conn, discard=discard)
 
 def is_setup_done():
     """
-    Sistemin kurulum durumunu kontrol eder.
+    Sistemin kurulum durumunu kontrol eder. Tamamlanmış kurulum şema önbelleğinde
+    saklanır; her istekte information_schema ve config tabloları sorgulanmaz.
     
     Returns:
         bool: Kurulum tamamlandıysa True, aksi halde False
     """
+    # db modülünü içe aktardığı için döngüsel import'u önlemek amacıyla burada alınır
+    from utils.schema_cache import schema_cache
     try:
-        # Önce knowhy_config tablosu var mı kontrol et
-        # Global SYSTEM_TABLE_PREFIX kullanmak yerine DEFAULT prefix kullan
-        # çünkü sistem henüz kurulmadığında SYSTEM_ID henüz belirlenmemiş olabilir
-        prefix = 'knowhy_'
-        
-        if SYSTEM_TABLE_PREFIX.startswith('knowhy_') and len(SYSTEM_TABLE_PREFIX) > 7:
-            # Eğer özelleştirilmiş prefix varsa, onu kullan
-            prefix = SYSTEM_TABLE_PREFIX
-        
-        logging.debug(f"Kurulum kontrolü için prefix: {prefix}")
-        
-        # Önce herhangi bir config tablosu aramak için wildcard kullan
-        query = """
-        SELECT table_name
-        FROM information_schema.tables 
-        WHERE table_schema = 'public' AND table_name LIKE 'knowhy_%config'
-        """
-        tables = execute_query(query)
-        
-        if not tables:
-            logging.info("Kurulum kontrolü: Hiçbir config tablosu bulunamadı")
-            return False
-            
-        logging.debug(f"Bulunan config tabloları: {tables}")
-        
-        # Her bir config tablosunda IS_SETUP_DONE kontrolü yap
-        for table in tables:
-            table_name = table['table_name']
-            query = f"""
-            SELECT config_value FROM {table_name} 
-            WHERE config_key = 'IS_SETUP_DONE';
-            """
-            result = execute_query(query, fetch_all=False)
-            
-            if result and result['config_value'] == 'TRUE':
-                logging.info(f"Kurulum kontrolü: '{table_name}' tablosunda tamamlanmış olarak işaretlenmiş")
-                return True
-                
-        # Hiçbir tabloda tamamlanmış kurulum bulunamadı
-        logging.info("Kurulum kontrolü: Tamamlanmamış")
-        return False
-        
+        return schema_cache.is_setup_done()
     except Exception as e:
         logging.error(f"Kurulum durumu kontrolü hatası: {e}")
         logging.error(f"Hata detayı: {traceback.format_exc()}")
@@ -170,7 +807,8 @@ def is_setup_done():
 
 def check_table_exists(table_name):
     """
-    Belirtilen tablonun var olup olmadığını kontrol eder.
+    Belirtilen tablonun var olup olmadığını kontrol eder. Tablo listesi şema
+    önbelleğinden okunur; listede olmayan tablo için liste yeniden yüklenir.
     
     Args:
         table_name (str): Kontrol edilecek tablo adı
@@ -178,18 +816,11 @@ def check_table_exists(table_name):
     Returns:
         bool: Tablo mevcutsa True, aksi halde False
     """
+    from utils.schema_cache import schema_cache
     try:
-        query = """
-        SELECT EXISTS (
-            SELECT FROM information_schema.tables 
-            WHERE table_schema = 'public' AND table_name = %s
-        ) AS table_exists;
-        """
-        result = execute_query(query, (table_name,), fetch_all=False)
-        
-        exists = result and result['table_exists']
+        exists = schema_cache.table_exists(table_name)
         if exists:
-            logging.info(f"'{table_name}' tablosu bulundu")
+            logging.debug(f"'{table_name}' tablosu bulundu")
         else:
             logging.warning(f"'{table_name}' tablosu bulunamadı")
         return exists
@@ -206,12 +837,10 @@ def test_connection():
         dict: Bağlantı durumu ve mesaj
     """
     try:
-        conn = get_connection()
-        if conn:
+        with get_db_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute("SELECT 1")
-                conn.close()
-                return {"status": "success", "message": "Veritabanı bağlantısı başarılı"}
+            return {"status": "success", "message": "Veritabanı bağlantısı başarılı"}
     except Exception as e:
         logging.error(f"Bağlantı testi hatası: {e}")
         logging.error(f"Hata detayı: {traceback.format_exc()}")
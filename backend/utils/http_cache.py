@@ -0,0 +1,84 @@
+import os
+import sys
+import gzip
+import json
+import hashlib
+from flask import request, Response
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    REPORT_HTTP_MAX_AGE, REPORT_HTTP_STALE_WHILE_REVALIDATE, HTTP_GZIP_MIN_BYTES, HTTP_GZIP_LEVEL
+)
+
+# Sonucu yalnızca sunucuya sorarak (If-None-Match) yeniden kullanılabilecek yanıtlar
+NO_CACHE = 'private, no-cache'
+
+def make_etag(*parts):
+    """Verilen parçalardan (JSON'a çevrilebilir değerler) kısa bir ETag değeri üretir."""
+    raw = json.dumps(parts, default=str, sort_keys=True, separators=(',', ':'))
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+def report_cache_control(ttl):
+    """
+    Rapor sonucu için Cache-Control değerini döndürür. Tarayıcı sonucu en fazla
+    REPORT_HTTP_MAX_AGE (ve raporun cacheTtl) saniye boyunca sormadan kullanır, sonra
+    arka planda yenilerken REPORT_HTTP_STALE_WHILE_REVALIDATE saniye daha gösterebilir.
+    """
+    max_age = min(ttl, REPORT_HTTP_MAX_AGE)
+    if max_age <= 0:
+        return NO_CACHE
+    return f'private, max-age={max_age}, stale-while-revalidate={REPORT_HTTP_STALE_WHILE_REVALIDATE}'
+
+def not_modified(etag, cache_control=NO_CACHE):
+    """
+    İstemcinin If-None-Match başlığındaki ETag eşleşiyorsa gövdesiz 304 yanıtı döndürür,
+    eşleşmiyorsa None döner.
+    """
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    response = Response(status=304)
+    return set_cache_headers(response, etag, cache_control)
+
+def set_cache_headers(response, etag, cache_control=NO_CACHE):
+    """Yanıta (zayıf) ETag ve Cache-Control başlıklarını ekler."""
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def _is_json_body(response):
+    return (
+        response.status_code == 200
+        and response.mimetype == 'application/json'
+        and not response.is_streamed
+        and not response.direct_passthrough
+    )
+
+def finalize_json_response(response):
+    """
+    Blueprint'lerin after_request kancası.
+
+    - ETag'i olmayan GET JSON yanıtlarına gövdenin özetinden ETag ekler; istemci aynı
+      ETag'i gönderdiyse yanıtı 304'e çevirir (gövde tekrar indirilmez)
+    - HTTP_GZIP_MIN_BYTES'tan büyük JSON gövdelerini, istemci destekliyorsa gzip'ler
+
+    Akış (streaming) yanıtları olduğu gibi bırakılır.
+    """
+    if not _is_json_body(response):
+        return response
+
+    if request.method in ('GET', 'HEAD'):
+        etag, _ = response.get_etag()
+        if etag is None:
+            etag = hashlib.md5(response.get_data()).hexdigest()
+            set_cache_headers(response, etag, response.headers.get('Cache-Control', NO_CACHE))
+        cached = not_modified(etag, response.headers['Cache-Control'])
+        if cached is not None:
+            return cached
+
+    if 'Content-Encoding' not in response.headers and request.accept_encodings['gzip'] > 0:
+        data = response.get_data()
+        if len(data) >= HTTP_GZIP_MIN_BYTES:
+            response.set_data(gzip.compress(data, compresslevel=HTTP_GZIP_LEVEL))
+            response.headers['Content-Encoding'] = 'gzip'
+            response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,255 @@
+import os
+import re
+import sys
+import time
+import logging
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from psycopg2 import sql
+from utils.db import get_db_connection, execute_query
+from utils.sql_helper import build_report_query
+from utils.schema_cache import schema_cache
+
+# Mesaj tablosu için önerilebilecek indeksler.
+# signature: pg_indexes.indexdef içinde (boşluklar atılmış, küçük harf) aranan ifade;
+# aynı tanımlı bir indeks farklı bir adla zaten varsa öneri tekrar yapılmaz.
+RECOMMENDED_INDEXES = {
+    'session_created': {
+        'definition': 'USING btree (session_id, created_date)',
+        'signature': 'usingbtree(session_id,created_date)',
+        'reason': 'Oturum bazlı pencere fonksiyonları (PARTITION BY session_id ORDER BY created_date) ve oturum filtreleri'
+    },
+    'role_created': {
+        'definition': 'USING btree (role, created_date)',
+        'signature': 'usingbtree(role,created_date)',
+        'reason': "role = 'userMessage' / 'apiMessage' ve tarih aralığı filtreleri"
+    },
+    'context_created': {
+        'definition': 'USING btree (created_date) WHERE has_context = TRUE',
+        'signature': 'usingbtree(created_date)where(has_context=true)',
+        'reason': 'Yalnızca context kullanan mesajları okuyan raporlar (kısmi indeks)'
+    },
+    'content_trgm': {
+        'definition': 'USING gin (lower(content) gin_trgm_ops)',
+        'signature': 'usinggin(lower(content)gin_trgm_ops)',
+        'extension': 'pg_trgm',
+        'reason': "LOWER(content) LIKE '%...%' aramaları (trigram GIN indeksi)"
+    }
+}
+
+def get_index_name(table_name, key):
+    """Önerilen indeksin tablo adına göre indeks adını döndürür (PostgreSQL 63 karakter sınırı)."""
+    return f"idx_{table_name.split('.')[-1]}_{key}"[:63]
+
+def _normalize(definition):
+    return re.sub(r'\s+', '', definition or '').lower()
+
+def get_existing_indexes(table_name):
+    """
+    Tablodaki mevcut indeksleri şema önbelleğinden döndürür.
+
+    Returns:
+        list: [{'indexname', 'indexdef'}, ...]
+    """
+    table_schema = schema_cache.get_table_schema(table_name)
+    return table_schema['indexes'] if table_schema else []
+
+def _find_existing(table_name, key, existing):
+    """Önerilen indeksle aynı ada veya tanıma sahip mevcut indeksin adını döndürür."""
+    index_name = get_index_name(table_name, key)
+    signature = RECOMMENDED_INDEXES[key]['signature']
+    for index in existing:
+        if index['indexname'] == index_name or signature in _normalize(index['indexdef']):
+            return index['indexname']
+    return None
+
+def _walk_plan(node, table, findings):
+    """
+    EXPLAIN planını dolaşır; mesaj tablosu üzerindeki sıralı taramaları, indeks
+    taramalarında satır satır uygulanan filtreleri ve session_id ile başlayan
+    sıralamaları toplar.
+    """
+    node_type = node.get('Node Type')
+    if node.get('Relation Name') == table and node.get('Filter') and node_type != 'Seq Scan':
+        findings['filters'].append(node['Filter'])
+    if node_type == 'Seq Scan' and node.get('Relation Name') == table:
+        findings['seq_scans'].append({
+            'relation': node.get('Relation Name'),
+            'filter': node.get('Filter'),
+            'plan_rows': node.get('Plan Rows'),
+            'total_cost': node.get('Total Cost')
+        })
+    elif node_type in ('Sort', 'Incremental Sort'):
+        sort_key = [str(key) for key in node.get('Sort Key', [])]
+        if sort_key and 'session_id' in sort_key[0]:
+            findings['sorts'].append(sort_key)
+
+    for child in node.get('Plans', []):
+        _walk_plan(child, table, findings)
+
+def _recommend(findings, sql_query):
+    """Plan bulgularından hangi indekslerin faydalı olacağını çıkarır."""
+    recommendations = set()
+    query_text = sql_query.lower()
+
+    # İndeksle daraltılmış taramalarda da Filter satır satır uygulanır; daha dar bir
+    # bileşik/kısmi indeks aynı satırları doğrudan bulabilir
+    filters = [scan['filter'] for scan in findings['seq_scans'] if scan['filter']] + findings['filters']
+    for filter_text in filters:
+        filter_text = filter_text.lower()
+        if 'session_id' in filter_text:
+            recommendations.add('session_created')
+        if 'role' in filter_text:
+            recommendations.add('role_created')
+        if 'has_context' in filter_text:
+            recommendations.add('context_created')
+        if 'lower(content)' in filter_text and '~~' in filter_text:
+            recommendations.add('content_trgm')
+
+    if findings['seq_scans'] and (
+        findings['sorts'] or re.search(r'partition\s+by\s+session_id', query_text)
+    ):
+        recommendations.add('session_created')
+
+    return sorted(recommendations)
+
+def explain_report(report, table_name):
+    """
+    Raporu varsayılan parametreleriyle EXPLAIN (FORMAT JSON) ile planlatır (sorgu çalıştırılmaz).
+
+    Args:
+        report (dict): Kayıt defterindeki rapor tanımı
+        table_name (str): Mesaj tablosu
+
+    Returns:
+        dict: Sıralı taramalar, önerilen indeksler ve tahmini maliyet
+    """
+    table = table_name.split('.')[-1]
+    params = dict(report['default_parameters'])
+    params.pop('TABLE_NAME', None)
+
+    query, values = build_report_query(report['sql'], params, table_name)
+    result = execute_query(
+        sql.SQL("EXPLAIN (FORMAT JSON) ") + query, values, fetch_all=False, log_error=False
+    )
+    plan = result['QUERY PLAN'][0]['Plan']
+
+    findings = {'seq_scans': [], 'filters': [], 'sorts': []}
+    _walk_plan(plan, table, findings)
+
+    return {
+        'report_name': report['report_name'],
+        'total_cost': plan.get('Total Cost'),
+        'plan_rows': plan.get('Plan Rows'),
+        'seq_scans': findings['seq_scans'],
+        'recommendations': _recommend(findings, report['sql'])
+    }
+
+def analyze_reports(table_name):
+    """
+    Kayıtlı tüm raporları planlatır, mesaj tablosunda sıralı tarama yapanları bulur ve
+    eksik indeksleri önerir.
+
+    Args:
+        table_name (str): Mesaj tablosu
+
+    Returns:
+        dict: Rapor bazında bulgular ve indeks önerileri
+    """
+    from utils.report_registry import report_registry
+
+    existing = get_existing_indexes(table_name)
+    reports = []
+    benefits = {}
+
+    for report in report_registry.list_reports():
+        try:
+            analysis = explain_report(report, table_name)
+        except Exception as e:
+            reports.append({
+                'report_name': report['report_name'],
+                'error': str(e).strip()
+            })
+            continue
+
+        reports.append(analysis)
+        for key in analysis['recommendations']:
+            benefits.setdefault(key, []).append(report['report_name'])
+
+    trgm = execute_query("""
+    SELECT
+        EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') AS installed,
+        EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') AS available
+    """, fetch_all=False)
+
+    indexes = []
+    for key, spec in RECOMMENDED_INDEXES.items():
+        existing_name = _find_existing(table_name, key, existing)
+        indexes.append({
+            'key': key,
+            'index_name': existing_name or get_index_name(table_name, key),
+            'definition': spec['definition'],
+            'reason': spec['reason'],
+            'exists': existing_name is not None,
+            'reports': benefits.get(key, []),
+            'recommended': existing_name is None and key in benefits,
+            'extension': spec.get('extension')
+        })
+
+    return {
+        'table_name': table_name,
+        'existing_indexes': existing,
+        'indexes': indexes,
+        'reports': reports,
+        'pg_trgm': dict(trgm) if trgm else None
+    }
+
+def create_recommended_index(table_name, key):
+    """
+    Önerilen indeksi CREATE INDEX CONCURRENTLY ile oluşturur; tablo yazmaya kapatılmaz.
+    CONCURRENTLY transaction içinde çalışamadığından bağlantı geçici olarak autocommit
+    moduna alınır. Yarıda kalan işlem geçersiz (INVALID) bir indeks bırakırsa silinir.
+
+    Args:
+        table_name (str): Mesaj tablosu
+        key (str): RECOMMENDED_INDEXES anahtarı
+
+    Returns:
+        dict: İşlem sonucu (status: 'created' | 'exists')
+    """
+    if key not in RECOMMENDED_INDEXES:
+        raise ValueError(f"Bilinmeyen indeks önerisi: {key}")
+
+    spec = RECOMMENDED_INDEXES[key]
+    existing_name = _find_existing(table_name, key, get_existing_indexes(table_name))
+    if existing_name:
+        return {'key': key, 'index_name': existing_name, 'status': 'exists'}
+
+    index_name = get_index_name(table_name, key)
+    statement = sql.SQL("CREATE INDEX CONCURRENTLY IF NOT EXISTS {} ON {} ").format(
+        sql.Identifier(index_name), sql.Identifier(*table_name.split('.'))
+    ) + sql.SQL(spec['definition'])
+
+    start = time.monotonic()
+    with get_db_connection() as conn:
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                if spec.get('extension'):
+                    cursor.execute(sql.SQL("CREATE EXTENSION IF NOT EXISTS {}").format(
+                        sql.Identifier(spec['extension'])
+                    ))
+                try:
+                    cursor.execute(statement)
+                except Exception:
+                    # Başarısız CONCURRENTLY işlemi geride INVALID bir indeks bırakır
+                    cursor.execute(
+                        sql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(sql.Identifier(index_name))
+                    )
+                    raise
+        finally:
+            conn.autocommit = False
+            schema_cache.invalidate(table_name)
+
+    duration = round((time.monotonic() - start) * 1000, 2)
+    logging.info(f"İndeks oluşturuldu: {index_name} ({table_name}), {duration} ms")
+    return {'key': key, 'index_name': index_name, 'status': 'created', 'duration_ms': duration}
@@ -0,0 +1,83 @@
+import os
+import sys
+from psycopg2 import extensions
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Rapor sonuçları için PostgreSQL tip OID'ine göre JSON dönüşümleri.
+#
+# Dönüşümler psycopg2 typecaster'ı olarak yalnızca rapor sorgusunun cursor'ına
+# kaydedilir; değerler veritabanından okunurken JSON'a hazır hale gelir ve ayrıca
+# hücre hücre dolaşılmaz. Aynı bağlantıyı kullanan diğer sorgular (özet tabloları,
+# önbellek filigranı vb.) datetime/Decimal almaya devam eder.
+
+NUMERIC_OID = 1700
+DATE_OID = 1082
+TIME_OID = 1083
+TIMESTAMP_OID = 1114
+TIMESTAMPTZ_OID = 1184
+INTERVAL_OID = 1186
+TIMETZ_OID = 1266
+
+NUMERIC_ARRAY_OID = 1231
+DATE_ARRAY_OID = 1182
+TIMESTAMP_ARRAY_OID = 1115
+TIMESTAMPTZ_ARRAY_OID = 1185
+
+def _cast_numeric(value, cursor):
+    """numeric -> float (Decimal nesnesi oluşturulmaz)."""
+    return float(value) if value is not None else None
+
+def _cast_interval(value, cursor):
+    """interval -> PostgreSQL'in metin gösterimi (ör. '1 day 02:00:00')."""
+    return value
+
+def _iso_caster(base):
+    """psycopg2'nin tarih/saat typecaster'ının sonucunu ISO 8601 metnine çevirir."""
+    def cast(value, cursor):
+        if value is None:
+            return None
+        return base(value, cursor).isoformat()
+    return cast
+
+NUMERIC_JSON = extensions.new_type((NUMERIC_OID,), 'KNOWHY_NUMERIC_JSON', _cast_numeric)
+INTERVAL_JSON = extensions.new_type((INTERVAL_OID,), 'KNOWHY_INTERVAL_JSON', _cast_interval)
+DATE_JSON = extensions.new_type((DATE_OID,), 'KNOWHY_DATE_JSON', _iso_caster(extensions.PYDATE))
+TIME_JSON = extensions.new_type((TIME_OID, TIMETZ_OID), 'KNOWHY_TIME_JSON', _iso_caster(extensions.PYTIME))
+TIMESTAMP_JSON = extensions.new_type((TIMESTAMP_OID,), 'KNOWHY_TIMESTAMP_JSON', _iso_caster(extensions.PYDATETIME))
+TIMESTAMPTZ_JSON = extensions.new_type((TIMESTAMPTZ_OID,), 'KNOWHY_TIMESTAMPTZ_JSON', _iso_caster(extensions.PYDATETIMETZ))
+
+JSON_TYPECASTERS = (
+    NUMERIC_JSON, INTERVAL_JSON, DATE_JSON, TIME_JSON, TIMESTAMP_JSON, TIMESTAMPTZ_JSON,
+    extensions.new_array_type((NUMERIC_ARRAY_OID,), 'KNOWHY_NUMERIC_ARRAY_JSON', NUMERIC_JSON),
+    extensions.new_array_type((DATE_ARRAY_OID,), 'KNOWHY_DATE_ARRAY_JSON', DATE_JSON),
+    extensions.new_array_type((TIMESTAMP_ARRAY_OID,), 'KNOWHY_TIMESTAMP_ARRAY_JSON', TIMESTAMP_JSON),
+    extensions.new_array_type((TIMESTAMPTZ_ARRAY_OID,), 'KNOWHY_TIMESTAMPTZ_ARRAY_JSON', TIMESTAMPTZ_JSON),
+)
+
+# JSON_TYPECASTERS kayıtlıyken değeri doğrudan JSON'a yazılabilen tipler:
+# bool, int2/4/8, oid, float4/8, text, name, bpchar, varchar, uuid (psycopg2 str döndürür),
+# json/jsonb (psycopg2 dict/list döndürür), bunların dizileri ve yukarıdaki dönüşümler
+JSON_READY_TYPE_OIDS = frozenset((
+    16, 20, 21, 23, 26, 700, 701, 25, 19, 1042, 1043, 2950, 114, 3802,
+    1000, 1005, 1007, 1016, 1021, 1022, 1009, 1014, 1015, 2951, 199, 3807,
+    NUMERIC_OID, DATE_OID, TIME_OID, TIMETZ_OID, TIMESTAMP_OID, TIMESTAMPTZ_OID, INTERVAL_OID,
+    NUMERIC_ARRAY_OID, DATE_ARRAY_OID, TIMESTAMP_ARRAY_OID, TIMESTAMPTZ_ARRAY_OID,
+))
+
+def register_json_typecasters(cursor):
+    """
+    JSON dönüşüm typecaster'larını yalnızca verilen cursor için kaydeder.
+
+    Args:
+        cursor: psycopg2 cursor'ı (named cursor da olabilir)
+    """
+    for typecaster in JSON_TYPECASTERS:
+        extensions.register_type(typecaster, cursor)
+    return cursor
+
+def fallback_columns(type_oids):
+    """
+    JSON'a hazır olmayan (ör. bytea, range) kolonların sıra numaralarını döndürür;
+    bu kolonlardaki değerler str() ile çevrilir.
+    """
+    return [index for index, type_oid in enumerate(type_oids) if type_oid not in JSON_READY_TYPE_OIDS]
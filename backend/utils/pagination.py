@@ -0,0 +1,238 @@
+import os
+import re
+import sys
+import json
+import base64
+import hashlib
+from functools import lru_cache
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from psycopg2 import sql
+from config import REPORT_MAX_PAGE_SIZE
+
+class PaginationError(ValueError):
+    """Geçersiz sayfa boyutu, bozuk cursor veya sayfalamayı desteklemeyen rapor."""
+    pass
+
+# page_size verilmeden cursor ile istek yapıldığında kullanılacak sayfa boyutu
+DEFAULT_PAGE_SIZE = 100
+
+_ORDER_BY_PATTERN = re.compile(r'\bORDER\s+BY\b', re.IGNORECASE)
+_TRAILING_LIMIT_PATTERN = re.compile(r'\s+LIMIT\s+\d+\s*$', re.IGNORECASE)
+
+def parse_order_key(metadata):
+    """
+    report_metadata.json'daki orderKey tanımını (kolon, yön) listesine çevirir.
+
+    Sıralama anahtarı sonuç satırlarını tekil olarak belirlemelidir; aksi halde
+    sayfa sınırında aynı değere sahip satırlar atlanabilir.
+
+    Args:
+        metadata (dict): Raporun report_metadata.json'daki tanımı
+
+    Returns:
+        list: [(kolon, 'ASC' | 'DESC'), ...], tanım yoksa boş liste
+    """
+    order_key = []
+    for item in (metadata or {}).get('orderKey', []):
+        direction = str(item.get('direction', 'asc')).upper()
+        if direction not in ('ASC', 'DESC'):
+            raise PaginationError(f"Geçersiz sıralama yönü: {item.get('direction')}")
+        order_key.append((item['column'], direction))
+    return order_key
+
+def _scan_outer_query(sql_query):
+    """
+    Yorumları ve string sabitlerini atlayarak sorguyu tarar.
+
+    Returns:
+        tuple: (en dış seviyedeki (parantez dışı) son ORDER BY konumu veya None,
+            sondaki yorumlar hariç kodun bittiği konum)
+    """
+    depth = 0
+    last_order_by = None
+    code_end = 0
+    i = 0
+    length = len(sql_query)
+    while i < length:
+        if sql_query.startswith('--', i):
+            end = sql_query.find('\n', i)
+            i = length if end == -1 else end
+            continue
+        char = sql_query[i]
+        if char == "'":
+            end = sql_query.find("'", i + 1)
+            while end != -1 and sql_query.startswith("''", end):
+                end = sql_query.find("'", end + 2)
+            i = length if end == -1 else end + 1
+            code_end = i
+            continue
+        if not char.isspace():
+            code_end = i + 1
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif depth == 0 and char in 'oO':
+            match = _ORDER_BY_PATTERN.match(sql_query, i)
+            if match and (i == 0 or not (sql_query[i - 1].isalnum() or sql_query[i - 1] == '_')):
+                last_order_by = i
+                i = match.end()
+                continue
+        i += 1
+
+    return last_order_by, code_end
+
+@lru_cache(maxsize=256)
+def strip_trailing_order_and_limit(sql_query):
+    """
+    Sorgunun en dış seviyedeki son ORDER BY / LIMIT bölümünü ve noktalı virgülü kaldırır.
+    Sıralama ve sınır sayfalama sorgusu tarafından yeniden eklenir; böylece şablondaki
+    sabit LIMIT değerleri sayfalamayı kısıtlamaz. Alt sorgu ve pencere fonksiyonlarının
+    içindeki ORDER BY ifadelerine dokunulmaz.
+
+    Args:
+        sql_query (str): SQL şablonu
+
+    Returns:
+        str: Sıralama ve sınırı kaldırılmış SQL şablonu
+    """
+    last_order_by, code_end = _scan_outer_query(sql_query)
+    sql_query = sql_query[:last_order_by if last_order_by is not None else code_end]
+    return sql_query.rstrip().rstrip(';').rstrip()
+
+def strip_trailing_limit(sql_query):
+    """
+    Sorgunun sonundaki sabit LIMIT değerini (ör. "LIMIT 1000") ve noktalı virgülü kaldırır;
+    ORDER BY korunur. Dışa aktarmada sonucun tamamı istenir. Parametreyle verilen
+    LIMIT ({{RESULT_LIMIT}} gibi) kullanıcının seçimi olduğu için olduğu gibi bırakılır.
+
+    Args:
+        sql_query (str): SQL şablonu
+
+    Returns:
+        str: Sondaki sabit sınırı kaldırılmış SQL şablonu
+    """
+    _, code_end = _scan_outer_query(sql_query)
+    sql_query = sql_query[:code_end].rstrip().rstrip(';')
+    return _TRAILING_LIMIT_PATTERN.sub('', sql_query).rstrip()
+
+def parse_page_size(value):
+    """
+    page_size parametresini doğrular. Değer verilmezse DEFAULT_PAGE_SIZE kullanılır.
+
+    Returns:
+        int: Sayfa boyutu
+    """
+    if value is None or value == '':
+        return DEFAULT_PAGE_SIZE
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        raise PaginationError(f"Geçersiz page_size değeri: {value}")
+    if page_size < 1 or page_size > REPORT_MAX_PAGE_SIZE:
+        raise PaginationError(f"page_size 1 ile {REPORT_MAX_PAGE_SIZE} arasında olmalıdır")
+    return page_size
+
+def _cursor_signature(report_name, order_key, filter_params):
+    """Cursor'ın üretildiği rapor, sıralama ve filtreleri özetleyen kısa imza."""
+    raw = json.dumps([report_name, order_key, sorted(filter_params.items())], default=str)
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()[:12]
+
+def encode_cursor(report_name, order_key, filter_params, row):
+    """
+    Sayfanın son satırından, bir sonraki sayfayı başlatacak opak cursor üretir.
+
+    Args:
+        report_name (str): Rapor adı
+        order_key (list): Sıralama anahtarı
+        filter_params (dict): Sorguyu etkileyen parametreler
+        row (dict): Sayfanın son (serileştirilmiş) satırı
+
+    Returns:
+        str: URL güvenli base64 cursor
+    """
+    payload = {
+        'v': [row.get(column) for column, _ in order_key],
+        's': _cursor_signature(report_name, order_key, filter_params)
+    }
+    raw = json.dumps(payload, separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token, report_name, order_key, filter_params):
+    """
+    Opak cursor'ı çözer ve aynı rapor/filtreler için üretildiğini doğrular.
+
+    Returns:
+        list: Sıralama anahtarı kolonlarının son değerleri
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        values = payload['v']
+        signature = payload['s']
+    except Exception:
+        raise PaginationError("Geçersiz cursor değeri")
+
+    if signature != _cursor_signature(report_name, order_key, filter_params) or len(values) != len(order_key):
+        raise PaginationError("Cursor bu rapor veya parametrelerle üretilmemiş")
+    return values
+
+def _key_condition(column, operator, index, value):
+    """
+    Sıralama anahtarı kolonu için karşılaştırma koşulu üretir. numeric kolonlar JSON'da
+    float olarak taşındığından float cursor değerleri float8 olarak karşılaştırılır;
+    böylece yuvarlanmış değer, kolonun kesin değerinden küçük/büyük görünmez.
+    """
+    if isinstance(value, float):
+        template = "{}::float8 {} {}::float8"
+    else:
+        template = "{} {} {}"
+    return sql.SQL(template).format(
+        sql.Identifier(column), sql.SQL(operator), sql.Placeholder(f"_after_{index}")
+    )
+
+def build_page_query(query, values, order_key, after, page_size):
+    """
+    Rapor sorgusunu keyset sayfalama ile sarar. Önceki sayfalar OFFSET ile hesaplanıp
+    atılmaz; son görülen anahtar değerinden sonraki satırlar istenir.
+
+    Args:
+        query (psycopg2.sql.Composed): Sıralaması kaldırılmış rapor sorgusu
+        values (dict): Rapor sorgusunun bind parametreleri
+        order_key (list): [(kolon, yön), ...]
+        after (list): Önceki sayfanın son anahtar değerleri (ilk sayfa için None)
+        page_size (int): Sayfa boyutu
+
+    Returns:
+        tuple: (sayfalama sorgusu, bind parametreleri)
+    """
+    values = dict(values)
+    parts = [sql.SQL("SELECT * FROM ("), query, sql.SQL(") AS report_page")]
+
+    if after is not None:
+        # (a, b) anahtarı için: a > x OR (a = x AND b > y) - yönler kolon bazında uygulanır
+        branches = []
+        for index, (column, direction) in enumerate(order_key):
+            conditions = []
+            for prev_index, (prev_column, _) in enumerate(order_key[:index]):
+                conditions.append(_key_condition(prev_column, '=', prev_index, after[prev_index]))
+            operator = '<' if direction == 'DESC' else '>'
+            conditions.append(_key_condition(column, operator, index, after[index]))
+            branches.append(sql.SQL("(") + sql.SQL(" AND ").join(conditions) + sql.SQL(")"))
+
+        for index, value in enumerate(after):
+            values[f"_after_{index}"] = value
+        parts += [sql.SQL(" WHERE "), sql.SQL(" OR ").join(branches)]
+
+    parts += [
+        sql.SQL(" ORDER BY "),
+        sql.SQL(", ").join(
+            sql.SQL("{} {}").format(sql.Identifier(column), sql.SQL(direction))
+            for column, direction in order_key
+        ),
+        sql.SQL(" LIMIT "),
+        sql.Placeholder('_page_limit')
+    ]
+    # Sonraki sayfa olup olmadığını anlamak için bir satır fazla istenir
+    values['_page_limit'] = page_size + 1
+    return sql.Composed(parts), values
@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import check_table_exists
+from utils.pagination import PaginationError
+from utils.report_registry import report_registry
+from utils.sql_helper import check_request_parameters, ReportParameterError
+from utils.report_metrics import track_report_run
+from utils.report_runner import (
+    execute_report, execute_report_page, parse_bool_param, parse_format_param,
+    count_rows, COLUMNAR_FORMAT
+)
+from config import DB_POOL_MAX_SIZE, REPORT_BATCH_MAX_REPORTS, REPORT_BATCH_WORKERS, REPORT_BATCH_TIMEOUT
+
+class BatchRequestError(ValueError):
+    """Toplu rapor isteğinin gövdesi geçersiz."""
+    pass
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_batch_executor():
+    """
+    Toplu rapor çalıştırmada kullanılan ortak worker havuzunu döndürür.
+    Worker sayısı bağlantı havuzunu tüketmemesi için DB_POOL_MAX_SIZE - 1 ile sınırlanır.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = max(1, min(REPORT_BATCH_WORKERS, DB_POOL_MAX_SIZE - 1))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-batch')
+                logging.info(f"Toplu rapor worker havuzu oluşturuldu ({workers} worker)")
+    return _executor
+
+def parse_batch_items(data):
+    """
+    İstek gövdesindeki rapor listesini doğrular.
+
+    Args:
+        data (dict): {"reports": [{"report_name": "...", "params": {...}}, ...]}
+
+    Returns:
+        list: [{'report_name', 'params'}, ...]
+    """
+    items = (data or {}).get('reports')
+    if not isinstance(items, list) or not items:
+        raise BatchRequestError("Çalıştırılacak rapor listesi (reports) boş veya geçersiz")
+    if len(items) > REPORT_BATCH_MAX_REPORTS:
+        raise BatchRequestError(f"Tek istekte en fazla {REPORT_BATCH_MAX_REPORTS} rapor çalıştırılabilir")
+
+    parsed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get('report_name'), str) or not item['report_name']:
+            raise BatchRequestError(f"{index}. öğede report_name eksik")
+        params = item.get('params') or {}
+        if not isinstance(params, dict):
+            raise BatchRequestError(f"{index}. öğede params bir nesne olmalıdır")
+        parsed.append({'report_name': item['report_name'], 'params': dict(params)})
+    return parsed
+
+def _error(report_name, code, message, **extra):
+    return {'report_name': report_name, 'status': 'error', 'code': code, 'message': message, **extra}
+
+def _run_item(item, table_name, queued_at):
+    """Tek bir raporu worker thread'inde çalıştırır; hatalar sonuç olarak döner."""
+    started = time.monotonic()
+    wait_ms = round((started - queued_at) * 1000, 2)
+    report_name = item['report_name']
+    params = item['params']
+
+    report = report_registry.get(report_name)
+    if report is None:
+        return _error(report_name, 404, f"'{report_name}' rapor dosyası bulunamadı")
+    try:
+        check_request_parameters(params)
+    except ReportParameterError as e:
+        return _error(report_name, 400, str(e))
+
+    refresh = parse_bool_param(params, 'refresh')
+    output_format = parse_format_param(params)
+    if output_format not in ('json', COLUMNAR_FORMAT):
+        return _error(report_name, 400, 'Toplu çalıştırmada yalnızca json ve columnar formatları desteklenir')
+    columnar = output_format == COLUMNAR_FORMAT
+    page_size = params.pop('page_size', None)
+    cursor = params.pop('cursor', None)
+
+    try:
+        with track_report_run(report_name, table_name, 'batch') as run:
+            result = {'report_name': report_name, 'status': 'success', 'code': 200}
+            if page_size is not None or cursor:
+                rows, cache_info, pagination = execute_report_page(
+                    report, params, table_name, page_size, cursor=cursor, refresh=refresh, run=run,
+                    columnar=columnar
+                )
+                result['pagination'] = pagination
+            else:
+                rows, cache_info = execute_report(
+                    report_name, report['sql'], params, table_name, refresh=refresh, run=run,
+                    columnar=columnar
+                )
+    except PaginationError as e:
+        return _error(report_name, 400, f'Sayfalama hatası: {str(e)}')
+    except Exception as e:
+        logging.error(f"Toplu çalıştırmada rapor hatası: {e} (Rapor: {report_name})")
+        return _error(report_name, 500, f'Sorgu çalıştırma hatası: {str(e).strip()}', timing={
+            'wait_ms': wait_ms,
+            'wall_ms': round((time.monotonic() - started) * 1000, 2)
+        })
+
+    result.update({
+        **(rows if columnar else {'data': rows}),
+        'rowCount': count_rows(rows),
+        'cache': cache_info,
+        'timing': {
+            'wait_ms': wait_ms,
+            'wall_ms': round((time.monotonic() - started) * 1000, 2),
+            'db_ms': run['db_ms']
+        }
+    })
+    return result
+
+def run_report_batch(items, default_table):
+    """
+    Raporları ortak worker havuzunda eşzamanlı çalıştırır. Bir raporun hatası diğerlerini
+    etkilemez; her rapor için ayrı durum, süre ve sonuç döner. Sonuçlar istekteki sırayla
+    döndürülür.
+
+    Args:
+        items (list): parse_batch_items() çıktısı
+        default_table (str): params.table_name verilmeyen raporların kaynak tablosu
+
+    Returns:
+        list: Rapor başına sonuç (status: 'success' | 'error', code, data/message, timing)
+    """
+    results = [None] * len(items)
+    futures = {}
+    existing_tables = {}
+    executor = get_batch_executor()
+
+    for index, item in enumerate(items):
+        table_name = item['params'].get('TABLE_NAME') or item['params'].get('table_name') or default_table
+        if table_name not in existing_tables:
+            existing_tables[table_name] = check_table_exists(table_name)
+        if not existing_tables[table_name]:
+            results[index] = _error(item['report_name'], 404, f"'{table_name}' tablosu bulunamadı")
+            continue
+        futures[executor.submit(_run_item, item, table_name, time.monotonic())] = index
+
+    done, not_done = wait(futures, timeout=REPORT_BATCH_TIMEOUT)
+    for future in done:
+        index = futures[future]
+        try:
+            results[index] = future.result()
+        except Exception as e:
+            results[index] = _error(items[index]['report_name'], 500, str(e))
+    for future in not_done:
+        # Başlamamış işler iptal edilir; çalışmakta olanlar arka planda tamamlanır
+        future.cancel()
+        index = futures[future]
+        results[index] = _error(
+            items[index]['report_name'], 504,
+            f'Rapor {REPORT_BATCH_TIMEOUT:g} saniye içinde tamamlanamadı'
+        )
+
+    return results
@@ -0,0 +1,334 @@
+import os
+import sys
+import json
+import hashlib
+import time
+import logging
+import threading
+from collections import OrderedDict
+from psycopg2 import sql
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SYSTEM_TABLE_PREFIX, REPORT_CACHE_MAX_BYTES, REPORT_CACHE_DEFAULT_TTL, REPORT_CACHE_WATERMARK_INTERVAL
+
+class ReportResultCache:
+    """
+    Rapor sonuçları için bellek içi önbellek.
+
+    - Anahtar: (rapor adı, normalize edilmiş parametreler, tablo adı)
+    - Her kayıt kendi TTL süresi ile saklanır
+    - Toplam boyut max_bytes'ı aşarsa en uzun süredir kullanılmayan kayıtlar atılır (LRU)
+    - Kayıt, kaynak tablonun veri filigranı (MAX(created_date)) değiştiğinde geçersiz sayılır
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._current_bytes = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0
+        }
+
+    @staticmethod
+    def make_key(report_name, params, table_name):
+        """
+        Önbellek anahtarı oluşturur. Parametreler ada göre sıralanır ve
+        değerlerin başındaki/sonundaki boşluklar temizlenir.
+        """
+        normalized = tuple(sorted(
+            (str(key), str(value).strip()) for key, value in (params or {}).items()
+        ))
+        return (report_name, normalized, table_name)
+
+    def get(self, key, watermark):
+        """
+        Geçerli bir kayıt varsa sonucu döndürür, yoksa None döner.
+        Süresi dolmuş veya filigranı değişmiş kayıtlar silinir.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            if entry['expires_at'] <= time.monotonic() or entry['watermark'] != watermark:
+                if entry['watermark'] != watermark:
+                    self._stats['invalidations'] += 1
+                self._remove(key)
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry['value']
+
+    def put(self, key, value, ttl, watermark):
+        """
+        Sonucu önbelleğe ekler. Tek başına önbelleğin dörtte birinden büyük
+        sonuçlar saklanmaz.
+        """
+        if ttl <= 0:
+            return False
+
+        size = len(json.dumps(value, default=str).encode('utf-8'))
+        if size > self.max_bytes // 4:
+            logging.debug(f"Sonuç önbellek için çok büyük ({size} bayt), saklanmadı")
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = {
+                'value': value,
+                'size': size,
+                'watermark': watermark,
+                'expires_at': time.monotonic() + ttl
+            }
+            self._current_bytes += size
+
+            # Boyut sınırı aşıldıysa en eski kayıtları at
+            while self._current_bytes > self.max_bytes and self._entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._stats['evictions'] += 1
+        return True
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._current_bytes -= entry['size']
+
+    def invalidate(self, report_name=None, table_name=None):
+        """
+        Verilen rapora ve/veya tabloya ait kayıtları siler. Argüman verilmezse
+        tüm önbellek temizlenir.
+        """
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if (report_name is None or key[0] == report_name)
+                and (table_name is None or key[2] == table_name)
+            ]
+            for key in keys:
+                self._remove(key)
+        return len(keys)
+
+    def stats(self):
+        """Önbellek metriklerini döndürür."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._current_bytes,
+                'max_bytes': self.max_bytes,
+                **self._stats
+            }
+
+# Süreç genelindeki rapor sonuç önbelleği
+report_cache = ReportResultCache(REPORT_CACHE_MAX_BYTES)
+
+_watermarks = {}
+_watermark_lock = threading.Lock()
+
+def get_table_watermark(table_name):
+    """
+    Kaynak tablonun veri filigranını (MAX(created_date)) döndürür.
+
+    Aynı tablo için art arda gelen isteklerde veritabanına tekrar gidilmemesi için
+    değer REPORT_CACHE_WATERMARK_INTERVAL saniye boyunca bellekte tutulur.
+
+    Returns:
+        str: Filigran değeri (tablo boşsa 'empty'), sorgu başarısız olursa None
+    """
+    from utils.db import execute_query
+
+    now = time.monotonic()
+    with _watermark_lock:
+        cached = _watermarks.get(table_name)
+        if cached and now - cached[1] < REPORT_CACHE_WATERMARK_INTERVAL:
+            return cached[0]
+
+    try:
+        # Tablo adı istekten gelebilir; sorguya yalnızca tanımlayıcı olarak girer
+        result = execute_query(
+            sql.SQL("SELECT MAX(created_date) AS watermark FROM {}").format(
+                sql.Identifier(*str(table_name).split('.'))
+            ),
+            fetch_all=False,
+            log_error=False
+        )
+    except Exception as e:
+        logging.warning(f"'{table_name}' tablosu için veri filigranı alınamadı: {e}")
+        return None
+
+    watermark = result['watermark'].isoformat() if result and result['watermark'] else 'empty'
+    with _watermark_lock:
+        _watermarks[table_name] = (watermark, now)
+    return watermark
+
+def get_report_cache_ttl(report_name):
+    """
+    Rapor için önbellek süresini (saniye) döndürür. report_metadata.json'daki
+    cacheTtl değeri yoksa REPORT_CACHE_DEFAULT_TTL kullanılır.
+    """
+    from utils.report_registry import report_registry
+
+    report = report_registry.get(report_name)
+    metadata = report['metadata'] if report else None
+    if metadata and 'cacheTtl' in metadata:
+        try:
+            return int(metadata['cacheTtl'])
+        except (TypeError, ValueError):
+            logging.warning(f"'{report_name}' raporu için geçersiz cacheTtl değeri: {metadata['cacheTtl']}")
+    return REPORT_CACHE_DEFAULT_TTL
+
+def get_report_schedule(report_name):
+    """
+    Raporun report_metadata.json'daki schedule tanımını döndürür.
+
+    Örnek: {"interval": 60, "params": {}, "formats": ["json"]}
+    - interval: Yeniden hesaplama aralığı (saniye); verilmezse cacheTtl'nin yarısı
+    - params: Raporun varsayılan parametrelerinden farklı çalıştırılacak değerler
+    - formats: Önbelleğe alınacak çıktı formatları ('json', 'columnar')
+
+    Returns:
+        dict: Normalize edilmiş zamanlama, rapor zamanlanmamışsa veya önbelleği kapalıysa None
+    """
+    from utils.report_registry import report_registry
+
+    report = report_registry.get(report_name)
+    schedule = report['metadata'].get('schedule') if report else None
+    if not schedule:
+        return None
+
+    ttl = get_report_cache_ttl(report_name)
+    if ttl <= 0:
+        return None
+    try:
+        interval = int(schedule.get('interval') or max(ttl // 2, 1))
+    except (TypeError, ValueError, AttributeError):
+        logging.warning(f"'{report_name}' raporu için geçersiz schedule değeri: {schedule}")
+        return None
+
+    return {
+        'interval': interval,
+        'params': dict(schedule.get('params') or {}),
+        'formats': [str(fmt).lower() for fmt in schedule.get('formats') or ['json']]
+    }
+
+# Zamanlayıcının (utils/scheduler.py) önceden hesapladığı sonuçların tüm worker'larla
+# paylaşıldığı tablo. Bellek içi önbellek süreç başına olduğu için lider worker'ın
+# ısıttığı sonuçlar diğer worker'lara bu tablo üzerinden ulaşır.
+REPORT_SNAPSHOTS_TABLE = f"{SYSTEM_TABLE_PREFIX}report_snapshots"
+
+_snapshots_ready = False
+
+def create_report_snapshots_table():
+    """Paylaşılan rapor sonuçlarının saklandığı tabloyu oluşturur."""
+    global _snapshots_ready
+    from utils.db import execute_query
+
+    execute_query(f"""
+    CREATE TABLE IF NOT EXISTS {REPORT_SNAPSHOTS_TABLE} (
+        cache_key VARCHAR(32) PRIMARY KEY,
+        report_name VARCHAR(255) NOT NULL,
+        table_name VARCHAR(255),
+        watermark TEXT NOT NULL,
+        result JSONB NOT NULL,
+        expires_at TIMESTAMPTZ NOT NULL,
+        computed_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """, commit=True)
+
+    _snapshots_ready = True
+
+def _snapshot_key(key):
+    return hashlib.md5(json.dumps(key, default=str).encode('utf-8')).hexdigest()
+
+def save_snapshot(key, value, ttl, watermark):
+    """
+    Sonucu paylaşılan tabloya yazar; aynı anahtardaki eski sonucun üzerine yazılır.
+
+    Args:
+        key (tuple): report_cache.make_key() ile oluşturulan anahtar
+        value: Serileştirilmiş rapor sonucu
+        ttl (int): Geçerlilik süresi (saniye)
+        watermark (str): Sonucun hesaplandığı andaki veri filigranı
+
+    Returns:
+        bool: Yazıldıysa True
+    """
+    from utils.db import execute_query
+
+    if ttl <= 0 or watermark is None:
+        return False
+    if not _snapshots_ready:
+        create_report_snapshots_table()
+
+    execute_query(f"""
+    INSERT INTO {REPORT_SNAPSHOTS_TABLE} (cache_key, report_name, table_name, watermark, result, expires_at)
+    VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP + make_interval(secs => %s))
+    ON CONFLICT (cache_key) DO UPDATE SET
+        watermark = EXCLUDED.watermark,
+        result = EXCLUDED.result,
+        expires_at = EXCLUDED.expires_at,
+        computed_at = CURRENT_TIMESTAMP
+    """, (
+        _snapshot_key(key), key[0], key[2], watermark,
+        json.dumps(value, default=str), ttl
+    ), fetch_all=False, commit=True)
+    return True
+
+def load_snapshot(key, watermark):
+    """
+    Paylaşılan tablodan süresi dolmamış ve filigranı eşleşen sonucu okur.
+
+    Returns:
+        tuple: (sonuç, kalan süre saniye) veya bulunamazsa None
+    """
+    from utils.db import execute_query
+
+    if watermark is None:
+        return None
+    try:
+        if not _snapshots_ready:
+            create_report_snapshots_table()
+        row = execute_query(f"""
+        SELECT result, EXTRACT(EPOCH FROM expires_at - CURRENT_TIMESTAMP) AS remaining
+        FROM {REPORT_SNAPSHOTS_TABLE}
+        WHERE cache_key = %s AND watermark = %s AND expires_at > CURRENT_TIMESTAMP
+        """, (_snapshot_key(key), watermark), fetch_all=False, log_error=False)
+    except Exception as e:
+        logging.warning(f"Paylaşılan rapor sonucu okunamadı ({key[0]}): {e}")
+        return None
+
+    if not row:
+        return None
+    return row['result'], int(row['remaining'])
+
+def delete_snapshots(report_name=None):
+    """Verilen rapora (verilmezse tüm raporlara) ait paylaşılan sonuçları siler."""
+    from utils.db import execute_query
+
+    if not _snapshots_ready:
+        create_report_snapshots_table()
+    execute_query(
+        f"DELETE FROM {REPORT_SNAPSHOTS_TABLE} WHERE %(report_name)s::text IS NULL OR report_name = %(report_name)s",
+        {'report_name': report_name}, fetch_all=False, commit=True
+    )
+
+def list_snapshots():
+    """Paylaşılan sonuçların özetini (rapor, tablo, hesaplanma ve bitiş zamanı) döndürür."""
+    from utils.db import execute_query
+
+    if not _snapshots_ready:
+        create_report_snapshots_table()
+    return execute_query(f"""
+    SELECT report_name, table_name, watermark, computed_at, expires_at,
+        pg_column_size(result) AS bytes
+    FROM {REPORT_SNAPSHOTS_TABLE}
+    ORDER BY report_name, computed_at DESC
+    """)
@@ -0,0 +1,157 @@
+import os
+import io
+import sys
+import csv
+import time
+import logging
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import stream_query, copy_to_stream, is_green_io
+from utils.sql_helper import build_report_query
+from utils.pagination import strip_trailing_limit
+from utils.report_runner import prepare_system_tables, STREAM_CHUNK_BYTES
+from utils.xlsx_stream import XlsxStreamWriter
+
+# Dışa aktarma formatı -> yanıt tipi
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'tsv': 'text/tab-separated-values',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Metin formatları için ayraç; ikisi de COPY'nin CSV kurallarıyla tırnaklanır
+EXPORT_DELIMITERS = {
+    'csv': ',',
+    'tsv': '\t',
+}
+
+# Excel'in dosyayı UTF-8 olarak açması için metin dosyalarının başına eklenir
+UTF8_BOM = '\ufeff'.encode('utf-8')
+
+def _copy_chunks(query, values, delimiter):
+    """CSV/TSV: sonucu PostgreSQL'in COPY ... TO STDOUT çıktısından doğrudan aktarır."""
+    options = "FORMAT csv, HEADER true" + (", DELIMITER E'\\t'" if delimiter == '\t' else '')
+    return (yield from copy_to_stream(query, values, options=options, chunk_bytes=STREAM_CHUNK_BYTES))
+
+def _csv_chunks(query, values, delimiter):
+    """
+    CSV/TSV (yeşil mod): psycopg2 gevent/eventlet altında COPY desteklemediği için
+    satırlar sunucu tarafı cursor ile partiler halinde okunup csv modülüyle yazılır.
+    """
+    batches = stream_query(query, values, columnar=True)
+    output = io.StringIO()
+    writer = csv.writer(output, delimiter=delimiter, lineterminator='\n')
+    row_count = 0
+    try:
+        writer.writerow(next(batches))
+        for rows in batches:
+            writer.writerows(rows)
+            row_count += len(rows)
+            if output.tell() >= STREAM_CHUNK_BYTES:
+                yield output.getvalue().encode('utf-8')
+                output.seek(0)
+                output.truncate()
+        yield output.getvalue().encode('utf-8')
+    finally:
+        batches.close()
+    return row_count
+
+def _xlsx_chunks(report_name, query, values):
+    """XLSX: satırları sunucu tarafı cursor'dan okuyup XlsxStreamWriter ile yazar."""
+    batches = stream_query(query, values, json_types=True, columnar=True)
+    writer = XlsxStreamWriter(report_name)
+    try:
+        writer.write_rows([next(batches)])
+        for rows in batches:
+            writer.write_rows(rows)
+            chunk = writer.drain()
+            if chunk:
+                yield chunk
+            if writer.full:
+                logging.warning(f"'{report_name}' dışa aktarımı Excel satır sınırında kesildi ({writer.row_count} satır)")
+                break
+        yield writer.close()
+    finally:
+        batches.close()
+    return writer.row_count - 1
+
+def export_report(report_name, sql_query, params, table_name, export_format='csv', run=None):
+    """
+    Rapor sonucunun tamamını dosya olarak dışa aktaran bir generator döndürür.
+    Şablondaki sabit LIMIT uygulanmaz; sonuç hiçbir zaman bellekte toplanmaz.
+
+    - csv/tsv: COPY (<rapor sorgusu>) TO STDOUT çıktısı olduğu gibi aktarılır; satırlar
+      Python'a hiç dönüştürülmez. Yeşil modda (gevent/eventlet) sunucu tarafı cursor
+      ve csv modülü kullanılır.
+    - xlsx: satırlar sunucu tarafı cursor'dan partiler halinde okunup sabit bellekle
+      yazılır (utils/xlsx_stream.py).
+
+    stream_report'ta olduğu gibi ilk parça fonksiyon dönmeden önce üretilir, böylece
+    SQL hataları yanıt başlamadan önce istisna olarak yakalanabilir. Akış sırasında
+    oluşan hatalar loglanır ve dosya yarıda kalır.
+
+    Args:
+        report_name (str): Rapor adı
+        sql_query (str): Yer tutucuları içeren SQL sorgusu
+        params (dict): Parametre değerleri
+        table_name (str): Varsayılan kaynak tablo adı
+        export_format (str): 'csv', 'tsv' veya 'xlsx'
+        run (dict): Metrik kaydı; veritabanı süresi ve satır sayısı akış bittiğinde
+            buraya yazılır
+
+    Returns:
+        generator: Dosya içeriğinin bayt parçaları
+    """
+    query, values = build_report_query(strip_trailing_limit(sql_query), params, table_name)
+    prepare_system_tables(sql_query, params.get('TABLE_NAME') or table_name)
+    logging.debug(f"Rapor dışa aktarılıyor: {report_name} ({export_format}), parametreler: {values}")
+
+    if export_format == 'xlsx':
+        chunks = _xlsx_chunks(report_name, query, values)
+    elif is_green_io():
+        chunks = _csv_chunks(query, values, EXPORT_DELIMITERS[export_format])
+    else:
+        chunks = _copy_chunks(query, values, EXPORT_DELIMITERS[export_format])
+
+    db_start = time.monotonic()
+    try:
+        first_chunk = next(chunks)
+    except StopIteration:
+        first_chunk = b''
+    db_seconds = time.monotonic() - db_start
+    if run is not None:
+        run.update({'query': query, 'values': values})
+
+    def generate():
+        nonlocal db_seconds
+        row_count = None
+        error = None
+
+        try:
+            if export_format in EXPORT_DELIMITERS:
+                yield UTF8_BOM
+            yield first_chunk
+
+            while True:
+                fetch_start = time.monotonic()
+                try:
+                    chunk = next(chunks)
+                except StopIteration as stop:
+                    row_count = stop.value
+                    break
+                finally:
+                    db_seconds += time.monotonic() - fetch_start
+                yield chunk
+        except Exception as e:
+            logging.error(f"Rapor dışa aktarımı sırasında hata: {e} (Rapor: {report_name})")
+            error = str(e)
+        finally:
+            chunks.close()
+            if run is not None:
+                run.update({
+                    'cache_status': 'bypass', 'db_ms': round(db_seconds * 1000, 2),
+                    'row_count': row_count, 'error': error
+                })
+
+        logging.debug(f"'{report_name}' raporu dışa aktarıldı: {row_count} satır ({export_format})")
+
+    return generate()
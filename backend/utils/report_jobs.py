@@ -0,0 +1,404 @@
+import os
+import sys
+import json
+import time
+import uuid
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import psycopg2
+from psycopg2.extras import Json
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import get_db_connection, pinned_connection, execute_query
+from utils.report_metrics import track_report_run
+from utils.report_runner import execute_report, prepare_system_tables, count_rows, COLUMNAR_FORMAT
+from config import (
+    SYSTEM_TABLE_PREFIX, DB_POOL_MAX_SIZE, DB_TRANSACTION_POOLER, REPORT_JOB_WORKERS, REPORT_JOB_TIMEOUT,
+    REPORT_JOB_RETENTION_HOURS, REPORT_JOB_CLEANUP_INTERVAL
+)
+
+REPORT_JOBS_TABLE = f"{SYSTEM_TABLE_PREFIX}report_jobs"
+
+# İş durumları
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_CANCELLING = 'cancelling'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+# Aşama -> ilerleme yüzdesi
+JOB_STAGES = {
+    'queued': 0,
+    'preparing': 10,
+    'querying': 30,
+    'done': 100,
+}
+
+# _update_job'da alanı veritabanı saatine ayarlar
+_NOW = object()
+
+_table_ready = False
+_last_cleanup = 0.0
+_cleanup_lock = threading.Lock()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def create_report_jobs_table():
+    """Rapor işlerinin durumunun ve sonuçlarının saklandığı tabloyu oluşturur."""
+    global _table_ready
+
+    execute_query(f"""
+    CREATE TABLE IF NOT EXISTS {REPORT_JOBS_TABLE} (
+        id VARCHAR(32) PRIMARY KEY,
+        report_name VARCHAR(255) NOT NULL,
+        table_name VARCHAR(255),
+        params JSONB NOT NULL DEFAULT '{{}}',
+        output_format VARCHAR(20) NOT NULL DEFAULT 'json',
+        status VARCHAR(20) NOT NULL,
+        stage VARCHAR(20),
+        progress SMALLINT NOT NULL DEFAULT 0,
+        backend_pid INTEGER,
+        row_count INTEGER,
+        result JSONB,
+        error TEXT,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMPTZ,
+        finished_at TIMESTAMPTZ
+    )
+    """, commit=True)
+    execute_query(f"""
+    CREATE INDEX IF NOT EXISTS idx_{REPORT_JOBS_TABLE}_status_created
+    ON {REPORT_JOBS_TABLE} (status, created_at)
+    """, commit=True)
+    execute_query(f"""
+    CREATE INDEX IF NOT EXISTS idx_{REPORT_JOBS_TABLE}_finished
+    ON {REPORT_JOBS_TABLE} (finished_at)
+    """, commit=True)
+
+    _table_ready = True
+
+def _ensure_table():
+    if not _table_ready:
+        create_report_jobs_table()
+
+def get_job_executor():
+    """
+    Rapor işlerinin çalıştığı worker havuzunu döndürür. Her iş çalışırken bir bağlantıyı
+    elinde tutar ve durum güncellemeleri için ikinci bir bağlantı kullanır; worker sayısı
+    bu yüzden DB_POOL_MAX_SIZE'ın yarısıyla sınırlanır.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = max(1, min(REPORT_JOB_WORKERS, DB_POOL_MAX_SIZE // 2))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-job')
+                logging.info(f"Rapor işi worker havuzu oluşturuldu ({workers} worker)")
+    return _executor
+
+def _json(value):
+    return Json(value, dumps=lambda data: json.dumps(data, default=str))
+
+def _to_iso(value):
+    return value.isoformat() if value is not None else None
+
+def job_to_dict(row):
+    """
+    Tablo satırını API yanıtındaki iş nesnesine çevirir (sonuç hariç).
+
+    Returns:
+        dict: id, report_name, status, stage, progress, rowCount, error ve zaman bilgileri
+    """
+    started_at = row['started_at']
+    finished_at = row['finished_at']
+    elapsed_ms = None
+    if started_at is not None:
+        end = finished_at or row['now']
+        elapsed_ms = round((end - started_at).total_seconds() * 1000, 2)
+
+    return {
+        'id': row['id'],
+        'report_name': row['report_name'],
+        'table_name': row['table_name'],
+        'format': row['output_format'],
+        'status': row['status'],
+        'stage': row['stage'],
+        'progress': row['progress'],
+        'rowCount': row['row_count'],
+        'error': row['error'],
+        'created_at': _to_iso(row['created_at']),
+        'started_at': _to_iso(started_at),
+        'finished_at': _to_iso(finished_at),
+        'elapsed_ms': elapsed_ms
+    }
+
+def get_job(job_id, include_result=True):
+    """
+    İşi veritabanından okur. İş hangi süreçte çalışırsa çalışsın durum buradan görülür.
+
+    Args:
+        job_id (str): İş kimliği
+        include_result (bool): Tamamlanan işin sonucu da okunsun mu?
+
+    Returns:
+        tuple: (iş nesnesi, sonuç) veya iş bulunamazsa (None, None)
+    """
+    _ensure_table()
+    result_column = 'result' if include_result else 'NULL AS result'
+    row = execute_query(f"""
+    SELECT id, report_name, table_name, output_format, status, stage, progress, row_count,
+           error, created_at, started_at, finished_at, {result_column}, CURRENT_TIMESTAMP AS now
+    FROM {REPORT_JOBS_TABLE}
+    WHERE id = %(id)s
+    """, {'id': job_id}, fetch_all=False)
+    if row is None:
+        return None, None
+    return job_to_dict(row), row['result']
+
+def submit_job(report_name, sql_query, params, table_name, output_format='json', refresh=False):
+    """
+    Raporu arka planda çalıştırılmak üzere kuyruğa alır.
+
+    Args:
+        report_name (str): Rapor adı
+        sql_query (str): Yer tutucuları içeren SQL sorgusu
+        params (dict): Parametre değerleri
+        table_name (str): Varsayılan kaynak tablo adı
+        output_format (str): Sonucun saklanacağı format ('json' veya 'columnar')
+        refresh (bool): Sonuç önbelleğini yok sayıp sorguyu yeniden çalıştır
+
+    Returns:
+        dict: Oluşturulan iş (job_to_dict)
+    """
+    _ensure_table()
+    cleanup_jobs()
+
+    job_id = uuid.uuid4().hex
+    execute_query(f"""
+    INSERT INTO {REPORT_JOBS_TABLE} (id, report_name, table_name, params, output_format, status, stage, progress)
+    VALUES (%(id)s, %(report_name)s, %(table_name)s, %(params)s, %(output_format)s, %(status)s, 'queued', 0)
+    """, {
+        'id': job_id, 'report_name': report_name, 'table_name': table_name,
+        'params': _json(params),
+        'output_format': output_format, 'status': JOB_QUEUED
+    }, commit=True)
+
+    get_job_executor().submit(
+        _run_job, job_id, report_name, sql_query, dict(params), table_name, output_format, refresh
+    )
+    logging.info(f"'{report_name}' raporu için iş kuyruğa alındı: {job_id}")
+    job, _ = get_job(job_id, include_result=False)
+    return job
+
+def _update_job(job_id, statuses, **fields):
+    """
+    İşin durumu verilen durumlardan biriyse alanlarını günceller.
+
+    Returns:
+        bool: Satır güncellendiyse True
+    """
+    assignments = ', '.join(
+        f"{name} = CURRENT_TIMESTAMP" if value is _NOW else f"{name} = %({name})s"
+        for name, value in fields.items()
+    )
+    row = execute_query(f"""
+    UPDATE {REPORT_JOBS_TABLE} SET {assignments}
+    WHERE id = %(id)s AND status = ANY(%(statuses)s)
+    RETURNING id
+    """, {
+        **{name: value for name, value in fields.items() if value is not _NOW},
+        'id': job_id, 'statuses': list(statuses)
+    }, fetch_all=False, commit=True)
+    return row is not None
+
+def _set_stage(job_id, stage):
+    """Çalışan işin aşamasını günceller; iş bu arada iptal edildiyse False döner."""
+    return _update_job(job_id, (JOB_RUNNING,), stage=stage, progress=JOB_STAGES[stage])
+
+def _finish_job(job_id, status, result=None, row_count=None, error=None):
+    """
+    İşi sonlandırır. Bu sırada iptal istenmişse (cancelling) iş sonucu yazılmadan
+    'cancelled' olarak kapanır.
+    """
+    row = execute_query(f"""
+    UPDATE {REPORT_JOBS_TABLE} SET
+        status = CASE WHEN status = %(cancelling)s THEN %(cancelled)s ELSE %(status)s END,
+        result = CASE WHEN status = %(cancelling)s THEN NULL ELSE %(result)s::jsonb END,
+        row_count = CASE WHEN status = %(cancelling)s THEN NULL ELSE %(row_count)s::integer END,
+        error = CASE WHEN status = %(cancelling)s THEN NULL ELSE %(error)s::text END,
+        stage = 'done',
+        progress = CASE WHEN status = %(cancelling)s THEN progress ELSE 100 END,
+        backend_pid = NULL,
+        finished_at = CURRENT_TIMESTAMP
+    WHERE id = %(id)s AND status IN (%(running)s, %(cancelling)s)
+    RETURNING status
+    """, {
+        'id': job_id, 'status': status, 'row_count': row_count, 'error': error,
+        'result': _json(result) if result is not None else None,
+        'running': JOB_RUNNING, 'cancelling': JOB_CANCELLING, 'cancelled': JOB_CANCELLED
+    }, fetch_all=False, commit=True)
+    return row['status'] if row else None
+
+def _run_job(job_id, report_name, sql_query, params, table_name, output_format, refresh=False):
+    """
+    İşi worker thread'inde çalıştırır.
+
+    İş, havuzdan aldığı bağlantıyı sonuna kadar elinde tutar ve tüm sorgularını
+    (özet tablo güncellemeleri dahil) bu bağlantıda çalıştırır. REPORT_JOB_TIMEOUT her
+    transaction'ın başında SET LOCAL ile uygulanır; oturum ayarı değişmediği için
+    açık kalan transaction havuzda geri alındığında bağlantı temiz döner.
+
+    Doğrudan bağlantıda backend PID'i iş kaydına yazılır; iptal isteği hangi süreçten
+    gelirse gelsin pg_cancel_backend ile bu backend'deki sorguyu durdurur. Son durum
+    bağlantı havuza dönmeden önce yazılır, böylece iptal asla başka bir isteğin sorgusuna
+    gitmez. Transaction pooler'ı (DB_TRANSACTION_POOLER) arkasında PID başka bir istemcinin
+    backend'ine ait olabileceğinden kaydedilmez; iptal edilen iş çalışan sorgusu bitince
+    sonucu yazılmadan kapanır.
+    """
+    try:
+        with get_db_connection() as conn:
+            started = _update_job(
+                job_id, (JOB_QUEUED,), status=JOB_RUNNING, stage='preparing',
+                progress=JOB_STAGES['preparing'],
+                backend_pid=None if DB_TRANSACTION_POOLER else conn.get_backend_pid(), started_at=_NOW
+            )
+            if not started:
+                logging.info(f"Rapor işi başlamadan iptal edildi: {job_id}")
+                return
+
+            timeout = REPORT_JOB_TIMEOUT if REPORT_JOB_TIMEOUT > 0 else None
+            try:
+                with pinned_connection(conn, statement_timeout=timeout):
+                    prepare_system_tables(sql_query, params.get('TABLE_NAME') or table_name)
+                # Özet güncellemesi iptal hatasını yutar; iptal istendiyse sorguya geçilmez
+                if not _set_stage(job_id, 'querying'):
+                    status = _finish_job(job_id, JOB_CANCELLED)
+                    logging.info(f"Rapor işi durduruldu: {job_id} ({status})")
+                    return
+                with track_report_run(report_name, table_name, 'job') as run, \
+                        pinned_connection(conn, statement_timeout=timeout):
+                    results, _ = execute_report(
+                        report_name, sql_query, params, table_name, refresh=refresh, run=run,
+                        columnar=output_format == COLUMNAR_FORMAT
+                    )
+                status = _finish_job(job_id, JOB_SUCCEEDED, result=results, row_count=count_rows(results))
+                logging.info(f"Rapor işi tamamlandı: {job_id} ({status})")
+            except psycopg2.extensions.QueryCanceledError as e:
+                status = _finish_job(job_id, JOB_FAILED, error=f'Sorgu zaman aşımına uğradı veya iptal edildi: {str(e).strip()}')
+                logging.info(f"Rapor işi durduruldu: {job_id} ({status})")
+            except Exception as e:
+                logging.error(f"Rapor işi hatası: {e} (Rapor: {report_name}, iş: {job_id})")
+                _finish_job(job_id, JOB_FAILED, error=f'Sorgu çalıştırma hatası: {str(e).strip()}')
+    except Exception as e:
+        # Bağlantı alınamadı veya durum yazılamadı
+        logging.error(f"Rapor işi çalıştırılamadı: {e} (iş: {job_id})")
+        logging.debug(traceback.format_exc())
+        try:
+            _update_job(
+                job_id, (JOB_QUEUED, JOB_RUNNING, JOB_CANCELLING), status=JOB_FAILED, stage='done',
+                backend_pid=None, error=f'İş çalıştırılamadı: {str(e).strip()}', finished_at=_NOW
+            )
+        except Exception as update_error:
+            logging.error(f"Rapor işinin durumu güncellenemedi: {update_error} (iş: {job_id})")
+
+def cancel_job(job_id):
+    """
+    İşi iptal eder. Kuyruktaki iş hemen 'cancelled' olur; çalışan işin backend'ine
+    pg_cancel_backend gönderilir ve iş, worker sorgunun durduğunu gördüğünde
+    'cancelled' olarak kapanır. Durum güncellemesi ve iptal sinyali aynı transaction'da
+    yapılır: satır kilidi iş kendi son durumunu yazana kadar PID'in işe ait kalmasını sağlar.
+    Transaction pooler'ı arkasında PID kaydedilmediği için sinyal gönderilmez; iş yalnızca
+    'cancelling' olarak işaretlenir (bkz. _run_job).
+
+    Returns:
+        tuple: (iş nesnesi veya None, iptal sinyali gönderildiyse True)
+    """
+    _ensure_table()
+    signalled = False
+    with get_db_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"""
+            UPDATE {REPORT_JOBS_TABLE}
+            SET status = CASE WHEN status = %(queued)s THEN %(cancelled)s ELSE %(cancelling)s END,
+                stage = CASE WHEN status = %(queued)s THEN 'done' ELSE stage END,
+                finished_at = CASE WHEN status = %(queued)s THEN CURRENT_TIMESTAMP ELSE finished_at END
+            WHERE id = %(id)s AND status IN (%(queued)s, %(running)s)
+            RETURNING status, backend_pid, started_at
+            """, {
+                'id': job_id, 'queued': JOB_QUEUED, 'running': JOB_RUNNING,
+                'cancelling': JOB_CANCELLING, 'cancelled': JOB_CANCELLED
+            })
+            row = cursor.fetchone()
+            if row is not None and row[0] == JOB_CANCELLING and row[1] is not None:
+                # Süreç yeniden başladıysa PID başka bir bağlantıya geçmiş olabilir;
+                # yalnızca iş başlamadan önce açılmış backend'e sinyal gönderilir
+                cursor.execute("""
+                SELECT pg_cancel_backend(pid) FROM pg_stat_activity
+                WHERE pid = %(pid)s AND backend_start <= %(started_at)s
+                """, {'pid': row[1], 'started_at': row[2]})
+                result = cursor.fetchone()
+                signalled = bool(result and result[0])
+        conn.commit()
+
+    if signalled:
+        logging.info(f"Rapor işine iptal sinyali gönderildi: {job_id}")
+    job, _ = get_job(job_id, include_result=False)
+    return job, signalled
+
+def cleanup_jobs(force=False):
+    """
+    Saklama süresi (REPORT_JOB_RETENTION_HOURS) dolan işleri siler ve süreci kapanmış
+    (backend'i artık olmayan) çalışan işleri kapatır. PID'i kaydedilmemiş (transaction
+    pooler'ı arkasında çalışan) işler saklama süresinden uzun süredir çalışıyorsa kapatılır.
+    Süreç başına en fazla REPORT_JOB_CLEANUP_INTERVAL saniyede bir çalışır.
+
+    Returns:
+        dict: Silinen ve kapatılan iş sayıları (aralık dolmadıysa None)
+    """
+    global _last_cleanup
+    with _cleanup_lock:
+        now = time.monotonic()
+        if not force and now - _last_cleanup < REPORT_JOB_CLEANUP_INTERVAL:
+            return None
+        _last_cleanup = now
+
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                DELETE FROM {REPORT_JOBS_TABLE}
+                WHERE finished_at < CURRENT_TIMESTAMP - make_interval(hours => %(hours)s)
+                   OR (status = %(queued)s AND created_at < CURRENT_TIMESTAMP - make_interval(hours => %(hours)s))
+                """, {'hours': REPORT_JOB_RETENTION_HOURS, 'queued': JOB_QUEUED})
+                deleted = cursor.rowcount
+                cursor.execute(f"""
+                UPDATE {REPORT_JOBS_TABLE} AS job
+                SET status = CASE WHEN job.status = %(cancelling)s THEN %(cancelled)s ELSE %(failed)s END,
+                    error = CASE WHEN job.status = %(cancelling)s THEN NULL
+                                 ELSE 'İş tamamlanamadı (sunucu süreci yeniden başlatılmış olabilir)' END,
+                    stage = 'done', backend_pid = NULL, finished_at = CURRENT_TIMESTAMP
+                WHERE job.status IN (%(running)s, %(cancelling)s)
+                  AND CASE
+                      WHEN job.backend_pid IS NULL
+                      THEN job.started_at < CURRENT_TIMESTAMP - make_interval(hours => %(hours)s)
+                      ELSE NOT EXISTS (
+                          SELECT 1 FROM pg_stat_activity activity
+                          WHERE activity.pid = job.backend_pid AND activity.backend_start <= job.started_at
+                      )
+                  END
+                """, {
+                    'running': JOB_RUNNING, 'cancelling': JOB_CANCELLING,
+                    'cancelled': JOB_CANCELLED, 'failed': JOB_FAILED,
+                    'hours': REPORT_JOB_RETENTION_HOURS
+                })
+                orphaned = cursor.rowcount
+            conn.commit()
+        if deleted or orphaned:
+            logging.info(f"Rapor işleri temizlendi: {deleted} silindi, {orphaned} sahipsiz iş kapatıldı")
+        return {'deleted': deleted, 'orphaned': orphaned}
+    except Exception as e:
+        logging.error(f"Rapor işleri temizlenemedi: {e}")
+        return None
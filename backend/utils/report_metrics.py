@@ -0,0 +1,409 @@
+import os
+import sys
+import json
+import math
+import time
+import queue
+import logging
+import threading
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+from utils.db import get_db_connection, execute_query
+from config import (
+    SYSTEM_TABLE_PREFIX, REPORT_METRICS_BUFFER_SIZE, REPORT_METRICS_PERSIST,
+    REPORT_SLOW_QUERY_MS, REPORT_AUTO_EXPLAIN, REPORT_AUTO_EXPLAIN_COOLDOWN, REPORT_METRICS_RETENTION_DAYS
+)
+
+REPORT_RUNS_TABLE = f"{SYSTEM_TABLE_PREFIX}report_runs"
+
+# Kalıcı kayıtlar bu boyuta ulaşınca ya da bu süre dolunca topluca yazılır
+_FLUSH_BATCH_SIZE = 100
+_FLUSH_INTERVAL = 2.0
+
+# Eski kayıtlar tabloyu uzun süre kilitlememek için bu boyutta partiler halinde silinir
+_CLEANUP_BATCH_SIZE = 10000
+
+_table_ready = False
+
+def create_report_runs_table():
+    """Rapor çalıştırma metriklerinin saklandığı tabloyu oluşturur."""
+    global _table_ready
+
+    execute_query(f"""
+    CREATE TABLE IF NOT EXISTS {REPORT_RUNS_TABLE} (
+        id BIGSERIAL PRIMARY KEY,
+        report_name VARCHAR(255) NOT NULL,
+        table_name VARCHAR(255),
+        mode VARCHAR(20),
+        wall_ms DOUBLE PRECISION NOT NULL,
+        db_ms DOUBLE PRECISION,
+        row_count INTEGER,
+        bytes BIGINT,
+        cache_status VARCHAR(20),
+        error TEXT,
+        plan JSONB,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """, commit=True)
+    execute_query(f"""
+    CREATE INDEX IF NOT EXISTS idx_{REPORT_RUNS_TABLE}_report_created
+    ON {REPORT_RUNS_TABLE} (report_name, created_at)
+    """, commit=True)
+    execute_query(f"""
+    CREATE INDEX IF NOT EXISTS idx_{REPORT_RUNS_TABLE}_created
+    ON {REPORT_RUNS_TABLE} (created_at)
+    """, commit=True)
+
+    _table_ready = True
+
+def cleanup_report_runs(retention_days=REPORT_METRICS_RETENTION_DAYS):
+    """
+    Saklama süresi dolan çalıştırma kayıtlarını partiler halinde siler. Zamanlayıcı
+    tarafından REPORT_METRICS_CLEANUP_INTERVAL saniyede bir çağrılır.
+
+    Args:
+        retention_days (int): Kayıtların saklanma süresi (gün, 0 = süresiz)
+
+    Returns:
+        dict: Silinen kayıt sayısı
+    """
+    if retention_days <= 0:
+        return {'status': 'disabled', 'deleted': 0}
+    if not _table_ready:
+        create_report_runs_table()
+
+    deleted = 0
+    while True:
+        with get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                DELETE FROM {REPORT_RUNS_TABLE}
+                WHERE id IN (
+                    SELECT id FROM {REPORT_RUNS_TABLE}
+                    WHERE created_at < CURRENT_TIMESTAMP - make_interval(days => %(days)s)
+                    LIMIT %(limit)s
+                )
+                """, {'days': retention_days, 'limit': _CLEANUP_BATCH_SIZE})
+                batch = cursor.rowcount
+            conn.commit()
+        deleted += batch
+        if batch < _CLEANUP_BATCH_SIZE:
+            break
+
+    if deleted:
+        logging.info(f"Rapor metrikleri temizlendi: {deleted} eski kayıt silindi")
+    return {'status': 'cleaned', 'deleted': deleted}
+
+def _percentile(sorted_values, percentile):
+    """Sıralı listede en yakın sıra (nearest-rank) yöntemiyle yüzdelik değeri döndürür."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(percentile / 100.0 * len(sorted_values)) - 1))
+    return round(sorted_values[index], 2)
+
+class ReportRunRecorder:
+    """
+    Rapor çalıştırma metriklerini toplar.
+
+    - Son N çalıştırma bellekte halka tamponda (ring buffer) tutulur; /api/admin/perf
+      yüzdelik değerleri buradan hesaplar
+    - Kayıtlar arka plandaki bir thread tarafından report_runs tablosuna topluca yazılır,
+      böylece istek süresine veritabanı yazması eklenmez
+    - Otomatik plan açıksa eşiği aşan sorgular için EXPLAIN ANALYZE planı da aynı
+      thread'de alınır (rapor başına REPORT_AUTO_EXPLAIN_COOLDOWN saniyede en fazla bir kez)
+    """
+
+    def __init__(self, buffer_size, persist=True, slow_ms=2000, auto_explain=False, explain_cooldown=300):
+        self.persist = persist
+        self.slow_ms = slow_ms
+        self.auto_explain = auto_explain
+        self.explain_cooldown = explain_cooldown
+
+        self._runs = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._last_explain = {}
+        self._queue = queue.Queue(maxsize=buffer_size * 5)
+        self._writer = None
+        self._stats = {
+            'recorded': 0,
+            'persisted': 0,
+            'dropped': 0,
+            'explained': 0
+        }
+
+    def start(self, report_name, table_name=None, mode='json'):
+        """Yeni bir çalıştırma kaydı başlatır. Rapor çalıştırıcı alanları doldurur."""
+        return {
+            'report_name': report_name,
+            'table_name': table_name,
+            'mode': mode,
+            'started': time.monotonic(),
+            'db_ms': None,
+            'row_count': None,
+            'bytes': None,
+            'cache_status': None,
+            'error': None
+        }
+
+    def finish(self, run, error=None):
+        """
+        Çalıştırmayı tamamlar ve kaydeder.
+
+        Args:
+            run (dict): start() ile oluşturulan kayıt
+            error (Exception, str): Çalıştırma hata ile bittiyse hata
+        """
+        query = run.pop('query', None)
+        values = run.pop('values', None)
+        started = run.pop('started')
+
+        record = dict(run)
+        record['wall_ms'] = round((time.monotonic() - started) * 1000, 2)
+        record['error'] = str(error).strip() if error is not None else run.get('error')
+        record['created_at'] = datetime.now(timezone.utc)
+        record['slow'] = record['wall_ms'] >= self.slow_ms
+        record['plan'] = None
+
+        if record['slow']:
+            logging.warning(
+                f"Yavaş rapor: {record['report_name']} {record['wall_ms']} ms "
+                f"(db: {record['db_ms']} ms, satır: {record['row_count']}, önbellek: {record['cache_status']})"
+            )
+
+        explain = (
+            record['slow'] and self.auto_explain and query is not None
+            and record['cache_status'] != 'hit' and record['error'] is None
+            and self._claim_explain(record['report_name'])
+        )
+
+        with self._lock:
+            self._runs.append(record)
+            self._stats['recorded'] += 1
+
+        if self.persist or explain:
+            self._enqueue(record, (query, values) if explain else None)
+        return record
+
+    def _claim_explain(self, report_name):
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_explain.get(report_name)
+            if last is not None and now - last < self.explain_cooldown:
+                return False
+            self._last_explain[report_name] = now
+            return True
+
+    def _enqueue(self, record, explain):
+        try:
+            self._queue.put_nowait((record, explain))
+        except queue.Full:
+            with self._lock:
+                self._stats['dropped'] += 1
+            return
+
+        if self._writer is None or not self._writer.is_alive():
+            with self._lock:
+                if self._writer is None or not self._writer.is_alive():
+                    self._writer = threading.Thread(
+                        target=self._write_loop, name='report-metrics-writer', daemon=True
+                    )
+                    self._writer.start()
+
+    def _explain(self, record, query, values):
+        """Yavaş sorgunun gerçek planını EXPLAIN ANALYZE ile alır (sonuç satırları atılır)."""
+        try:
+            result = execute_query(
+                sql.SQL("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ") + query, values,
+                fetch_all=False, log_error=False
+            )
+            record['plan'] = result['QUERY PLAN'] if result else None
+            with self._lock:
+                self._stats['explained'] += 1
+        except Exception as e:
+            logging.warning(f"'{record['report_name']}' raporu için EXPLAIN ANALYZE alınamadı: {e}")
+
+    def _write_loop(self):
+        while True:
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=60))
+            except queue.Empty:
+                continue
+
+            deadline = time.monotonic() + _FLUSH_INTERVAL
+            while len(batch) < _FLUSH_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            for record, explain in batch:
+                if explain is not None:
+                    self._explain(record, *explain)
+
+            if self.persist:
+                self._persist([record for record, _ in batch])
+
+    def _persist(self, records):
+        try:
+            if not _table_ready:
+                create_report_runs_table()
+
+            rows = [
+                (
+                    record['report_name'], record['table_name'], record['mode'], record['wall_ms'],
+                    record['db_ms'], record['row_count'], record['bytes'], record['cache_status'],
+                    record['error'], json.dumps(record['plan']) if record['plan'] is not None else None,
+                    record['created_at']
+                )
+                for record in records
+            ]
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    execute_values(cursor, f"""
+                    INSERT INTO {REPORT_RUNS_TABLE}
+                        (report_name, table_name, mode, wall_ms, db_ms, row_count, bytes,
+                         cache_status, error, plan, created_at)
+                    VALUES %s
+                    """, rows)
+                conn.commit()
+            with self._lock:
+                self._stats['persisted'] += len(records)
+        except Exception as e:
+            logging.error(f"Rapor metrikleri kaydedilemedi: {e}")
+            logging.debug(traceback.format_exc())
+            with self._lock:
+                self._stats['dropped'] += len(records)
+
+    def summary(self, report_name=None):
+        """
+        Bellekteki çalıştırmalardan rapor bazında yüzdelik değerleri hesaplar.
+
+        Returns:
+            list: Rapor başına çalıştırma sayısı, p50/p95/p99 süreleri, satır/bayt ortalamaları
+        """
+        with self._lock:
+            runs = [run for run in self._runs if report_name is None or run['report_name'] == report_name]
+
+        grouped = {}
+        for run in runs:
+            grouped.setdefault(run['report_name'], []).append(run)
+
+        reports = []
+        for name, items in grouped.items():
+            wall = sorted(run['wall_ms'] for run in items)
+            db = sorted(run['db_ms'] for run in items if run['db_ms'] is not None)
+            rows = [run['row_count'] for run in items if run['row_count'] is not None]
+            sizes = [run['bytes'] for run in items if run['bytes'] is not None]
+            reports.append({
+                'report_name': name,
+                'runs': len(items),
+                'errors': sum(1 for run in items if run['error']),
+                'slow_runs': sum(1 for run in items if run['slow']),
+                'cache_hits': sum(1 for run in items if run['cache_status'] == 'hit'),
+                'wall_ms': {
+                    'p50': _percentile(wall, 50),
+                    'p95': _percentile(wall, 95),
+                    'p99': _percentile(wall, 99),
+                    'max': wall[-1]
+                },
+                'db_ms': {
+                    'p50': _percentile(db, 50),
+                    'p95': _percentile(db, 95),
+                    'p99': _percentile(db, 99)
+                },
+                'avg_rows': round(sum(rows) / len(rows), 1) if rows else None,
+                'avg_bytes': round(sum(sizes) / len(sizes)) if sizes else None,
+                'last_run': items[-1]['created_at'].isoformat()
+            })
+
+        reports.sort(key=lambda item: item['wall_ms']['p95'] or 0, reverse=True)
+        return reports
+
+    def slow_runs(self, limit=20):
+        """Bellekteki en son yavaş çalıştırmaları (varsa planlarıyla) döndürür."""
+        with self._lock:
+            runs = [run for run in self._runs if run['slow']]
+        return [
+            {**run, 'created_at': run['created_at'].isoformat()}
+            for run in reversed(runs[-limit:])
+        ]
+
+    def stats(self):
+        """Toplayıcının kendi metriklerini döndürür."""
+        with self._lock:
+            return {
+                'buffered': len(self._runs),
+                'buffer_size': self._runs.maxlen,
+                'pending': self._queue.qsize(),
+                'persist': self.persist,
+                'slow_ms': self.slow_ms,
+                'auto_explain': self.auto_explain,
+                **self._stats
+            }
+
+# Süreç genelindeki rapor metrik toplayıcısı
+report_metrics = ReportRunRecorder(
+    REPORT_METRICS_BUFFER_SIZE,
+    persist=REPORT_METRICS_PERSIST,
+    slow_ms=REPORT_SLOW_QUERY_MS,
+    auto_explain=REPORT_AUTO_EXPLAIN,
+    explain_cooldown=REPORT_AUTO_EXPLAIN_COOLDOWN
+)
+
+@contextmanager
+def track_report_run(report_name, table_name=None, mode='json'):
+    """
+    Bir rapor çalıştırmasını ölçen context manager. Blok hata ile biterse hata da kaydedilir.
+
+    Kullanım:
+        with track_report_run(report_name, table_name) as run:
+            results, cache_info = execute_report(..., run=run)
+    """
+    run = report_metrics.start(report_name, table_name, mode)
+    try:
+        yield run
+    except Exception as e:
+        report_metrics.finish(run, error=e)
+        raise
+    report_metrics.finish(run)
+
+def get_persisted_summary(hours=24, report_name=None):
+    """
+    report_runs tablosundan son `hours` saatin rapor bazında yüzdelik değerlerini hesaplar.
+
+    Returns:
+        list: Rapor başına çalıştırma sayısı ve p50/p95/p99 süreleri
+    """
+    query = f"""
+    SELECT
+        report_name,
+        COUNT(*) AS runs,
+        COUNT(*) FILTER (WHERE error IS NOT NULL) AS errors,
+        COUNT(*) FILTER (WHERE cache_status = 'hit') AS cache_hits,
+        ROUND(percentile_cont(0.5) WITHIN GROUP (ORDER BY wall_ms)::numeric, 2) AS wall_p50,
+        ROUND(percentile_cont(0.95) WITHIN GROUP (ORDER BY wall_ms)::numeric, 2) AS wall_p95,
+        ROUND(percentile_cont(0.99) WITHIN GROUP (ORDER BY wall_ms)::numeric, 2) AS wall_p99,
+        ROUND(percentile_cont(0.5) WITHIN GROUP (ORDER BY db_ms)::numeric, 2) AS db_p50,
+        ROUND(percentile_cont(0.95) WITHIN GROUP (ORDER BY db_ms)::numeric, 2) AS db_p95,
+        ROUND(percentile_cont(0.99) WITHIN GROUP (ORDER BY db_ms)::numeric, 2) AS db_p99,
+        ROUND(AVG(row_count), 1) AS avg_rows,
+        ROUND(AVG(bytes)) AS avg_bytes,
+        MAX(created_at) AS last_run
+    FROM {REPORT_RUNS_TABLE}
+    WHERE created_at >= NOW() - make_interval(hours => %(hours)s)
+        AND (%(report_name)s::text IS NULL OR report_name = %(report_name)s)
+    GROUP BY report_name
+    ORDER BY wall_p95 DESC
+    """
+    if not _table_ready:
+        create_report_runs_table()
+    return execute_query(query, {'hours': int(hours), 'report_name': report_name})
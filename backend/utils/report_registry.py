@@ -0,0 +1,275 @@
+import os
+import re
+import sys
+import json
+import logging
+import threading
+import traceback
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SQL_SCRIPTS_FOLDER, REPORT_REGISTRY_POLL_INTERVAL
+from utils.sql_helper import (
+    read_sql_file, extract_parameters, get_default_parameter_value, normalize_report_name
+)
+from utils.pagination import parse_order_key
+
+# Rapor olarak listelenmeyecek markdown dosyaları
+EXCLUDED_MD_FILES = ('checklist.md', 'README.md')
+
+def build_default_parameters(param_names, metadata=None):
+    """
+    Raporun varsayılan parametre değerlerini döndürür. Genel varsayılanlar
+    (get_default_parameter_value) report_metadata.json'daki defaultParameters ile
+    rapora özel olarak ezilebilir (örn. kelime raporlarında boş tarih = tüm günler).
+
+    Args:
+        param_names (list): Parametre adları
+        metadata (dict): Raporun report_metadata.json'daki tanımı
+
+    Returns:
+        dict: Parametre adı -> varsayılan değer
+    """
+    overrides = (metadata or {}).get('defaultParameters') or {}
+    return {
+        param: str(overrides[param]) if param in overrides else get_default_parameter_value(param)
+        for param in param_names
+    }
+
+def build_parameter_specs(param_names, metadata=None):
+    """
+    Parametre adlarından arayüzde kullanılan parametre tanımlarını oluşturur.
+    report_metadata.json'da tanım varsa tip, etiket ve zorunluluk bilgisi oradan alınır.
+
+    Args:
+        param_names (list): Parametre adları
+        metadata (dict): Raporun report_metadata.json'daki tanımı
+
+    Returns:
+        list: Parametre tanımları
+    """
+    defaults = build_default_parameters(param_names, metadata)
+    metadata_params = {
+        param['name']: param for param in (metadata or {}).get('parameters', [])
+    }
+
+    specs = []
+    for param in param_names:
+        param_type = "string"
+        if "DATE" in param:
+            param_type = "date"
+        elif "COUNT" in param or "LIMIT" in param:
+            param_type = "number"
+
+        spec = {
+            "name": param,
+            "type": param_type,
+            "label": param.replace("_", " ").title(),
+            "required": param != "TABLE_NAME",
+            "default_value": defaults[param]
+        }
+
+        if param in metadata_params:
+            meta = metadata_params[param]
+            spec["type"] = meta.get("type", spec["type"])
+            spec["label"] = meta.get("label", spec["label"])
+            if param != "TABLE_NAME":
+                spec["required"] = meta.get("required", spec["required"])
+
+        specs.append(spec)
+    return specs
+
+class ReportRegistry:
+    """
+    sql_scripts/ klasöründeki rapor şablonlarının bellekteki derlenmiş hali.
+
+    Uygulama açılışında tüm .md/.sql dosyaları ve report_metadata.json bir kez okunur;
+    SQL sorgusu, parametre tanımları, görünen ad ve kategori bellekte tutulur.
+    Dosyalar değiştiğinde (mtime) kayıt defteri arka planda yeniden oluşturulur, böylece
+    istek sırasında dosya okuması yapılmaz.
+    """
+
+    def __init__(self, scripts_folder):
+        self.scripts_folder = scripts_folder
+        self.sql_files_folder = os.path.join(scripts_folder, "sql_files")
+        self.metadata_file = os.path.join(scripts_folder, "report_metadata.json")
+
+        self._lock = threading.Lock()
+        self._reports = {}
+        self._aliases = {}
+        self._snapshot = None
+        self._loaded = False
+        self._watcher = None
+        self._stop_event = threading.Event()
+
+    def _take_snapshot(self):
+        """Rapor dosyalarının yol -> mtime eşlemesini döndürür."""
+        snapshot = {}
+        for folder in (self.scripts_folder, self.sql_files_folder):
+            if not os.path.isdir(folder):
+                continue
+            for file in os.listdir(folder):
+                if file.endswith(('.md', '.sql')):
+                    path = os.path.join(folder, file)
+                    try:
+                        snapshot[path] = os.path.getmtime(path)
+                    except OSError:
+                        pass
+        try:
+            snapshot[self.metadata_file] = os.path.getmtime(self.metadata_file)
+        except OSError:
+            pass
+        return snapshot
+
+    def _load_metadata(self):
+        try:
+            with open(self.metadata_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {
+                os.path.splitext(report['sqlFile'])[0]: report
+                for report in data.get('reports', [])
+                if report.get('sqlFile')
+            }
+        except (OSError, ValueError) as e:
+            logging.warning(f"report_metadata.json okunamadı: {e}")
+            return {}
+
+    def _parse_markdown(self, md_path):
+        """Markdown dosyasından başlık ve açıklamayı çıkarır."""
+        with open(md_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        # Başlık (ilk satır)
+        title_match = re.search(r'^# (.*?)$', content, re.MULTILINE)
+        title = title_match.group(1) if title_match else None
+
+        # Açıklama (ikinci satır)
+        desc_match = re.search(r'^# .*?\n(.*?)(?=\n```|\n#|$)', content, re.DOTALL)
+        description = desc_match.group(1).strip() if desc_match else ""
+
+        return title, description
+
+    def _build(self):
+        """Tüm rapor şablonlarını okuyup yeni bir kayıt tablosu oluşturur."""
+        metadata = self._load_metadata()
+        reports = {}
+
+        # Rapor adları: .md dosyaları (mevcut davranış) + yalnızca SQL olarak bulunanlar
+        names = []
+        if os.path.isdir(self.scripts_folder):
+            for file in sorted(os.listdir(self.scripts_folder)):
+                if file.endswith('.md') and file not in EXCLUDED_MD_FILES:
+                    names.append(file[:-3])
+        known = {normalize_report_name(name) for name in names}
+        if os.path.isdir(self.sql_files_folder):
+            for file in sorted(os.listdir(self.sql_files_folder)):
+                if file.endswith('.sql') and file[:-4] not in known:
+                    names.append(file[:-4])
+
+        for report_name in names:
+            try:
+                sql_query = read_sql_file(report_name)
+
+                display_name = None
+                description = ""
+                md_path = os.path.join(self.scripts_folder, f"{report_name}.md")
+                if os.path.exists(md_path):
+                    display_name, description = self._parse_markdown(md_path)
+
+                report_metadata = metadata.get(normalize_report_name(report_name))
+                if report_metadata:
+                    display_name = display_name or report_metadata.get('name')
+                    description = description or report_metadata.get('description', '')
+
+                param_names = extract_parameters(sql_query)
+                reports[report_name] = {
+                    'report_name': report_name,
+                    'display_name': display_name or report_name,
+                    'description': description,
+                    'category': report_metadata.get('category') if report_metadata else None,
+                    'sql': sql_query,
+                    'parameter_names': param_names,
+                    'parameters': build_parameter_specs(param_names, report_metadata),
+                    'default_parameters': build_default_parameters(param_names, report_metadata),
+                    'order_key': parse_order_key(report_metadata),
+                    'metadata': report_metadata or {}
+                }
+            except Exception as e:
+                logging.error(f"Rapor şablonu yüklenemedi ({report_name}): {e}")
+
+        aliases = {normalize_report_name(name): name for name in reports}
+        return reports, aliases
+
+    def reload(self):
+        """Kayıt defterini dosyalardan yeniden oluşturur."""
+        snapshot = self._take_snapshot()
+        reports, aliases = self._build()
+        with self._lock:
+            self._reports = reports
+            self._aliases = aliases
+            self._snapshot = snapshot
+            self._loaded = True
+        logging.info(f"Rapor kayıt defteri yüklendi: {len(reports)} rapor")
+
+    def refresh_if_changed(self):
+        """
+        Dosyaların mtime değerlerini kontrol eder, değişiklik varsa yeniden yükler.
+
+        Returns:
+            bool: Yeniden yükleme yapıldıysa True
+        """
+        if self._take_snapshot() != self._snapshot:
+            logging.info("Rapor dosyalarında değişiklik algılandı, kayıt defteri yenileniyor")
+            self.reload()
+            return True
+        return False
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.reload()
+
+    def get(self, report_name):
+        """
+        Rapor tanımını döndürür. Türkçe karakterli ve normalize edilmiş adlar kabul edilir.
+
+        Returns:
+            dict: Rapor tanımı, bulunamazsa None
+        """
+        self._ensure_loaded()
+        with self._lock:
+            report = self._reports.get(report_name)
+            if report is None:
+                alias = self._aliases.get(normalize_report_name(report_name))
+                report = self._reports.get(alias) if alias else None
+            return report
+
+    def list_reports(self):
+        """Tüm rapor tanımlarını rapor adına göre sıralı döndürür."""
+        self._ensure_loaded()
+        with self._lock:
+            return [self._reports[name] for name in sorted(self._reports)]
+
+    def start_watcher(self, interval=REPORT_REGISTRY_POLL_INTERVAL):
+        """
+        Dosya değişikliklerini belirli aralıklarla kontrol eden arka plan thread'ini başlatır.
+        """
+        if self._watcher and self._watcher.is_alive():
+            return
+
+        def watch():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.refresh_if_changed()
+                except Exception as e:
+                    logging.error(f"Rapor kayıt defteri yenileme hatası: {e}")
+                    logging.error(traceback.format_exc())
+
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=watch, name='report-registry-watcher', daemon=True)
+        self._watcher.start()
+        logging.info(f"Rapor dosyası izleyicisi başlatıldı ({interval} sn aralıkla)")
+
+    def stop_watcher(self):
+        """Arka plan izleyici thread'ini durdurur."""
+        self._stop_event.set()
+
+# Süreç genelindeki rapor kayıt defteri
+report_registry = ReportRegistry(SQL_SCRIPTS_FOLDER)
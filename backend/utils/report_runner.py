@@ -0,0 +1,422 @@
+import os
+import sys
+import json
+import time
+import logging
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import execute_query, stream_query
+from utils.sql_helper import extract_parameters, build_report_query, get_system_tables
+from utils.report_cache import (
+    report_cache, get_table_watermark, get_report_cache_ttl, get_report_schedule, load_snapshot, save_snapshot
+)
+from utils.pagination import (
+    PaginationError, strip_trailing_order_and_limit, parse_page_size,
+    encode_cursor, decode_cursor, build_page_query
+)
+from utils.rollups import ensure_rollup
+from utils.schema_cache import schema_cache
+from utils.json_types import fallback_columns
+from utils.http_cache import make_etag
+
+# Akış modunda istemciye tek parça halinde gönderilecek yaklaşık bayt miktarı
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Desteklenen akış formatları
+STREAM_FORMATS = ('ndjson', 'json-stream')
+
+# Kolon bazlı çıktı: {columns: [...], types: [...], data: {kolon: [değerler]}}
+COLUMNAR_FORMAT = 'columnar'
+
+def serialize_value(value):
+    """
+    JSON'a hazır olmayan tipteki bir değeri string'e çevirir (None olduğu gibi kalır).
+    """
+    return str(value) if value is not None else None
+
+def serialize_rows(columns, type_oids, rows):
+    """
+    Düz cursor'dan gelen tuple satırlarını kolon adı -> değer sözlüklerine çevirir.
+    Değerler cursor'a kaydedilen JSON typecaster'larıyla okunduğundan (bkz.
+    utils/json_types.py) yalnızca tipi tanınmayan kolonlar ayrıca dönüştürülür;
+    bunlar cursor.description'a göre bir kez belirlenir.
+
+    Args:
+        columns (list): Kolon adları
+        type_oids (list): Kolonların PostgreSQL tip OID'leri
+        rows (list): Satır tuple'ları
+
+    Returns:
+        list: Serileştirilebilir satırlar
+    """
+    fallback = fallback_columns(type_oids)
+    if not fallback:
+        return [dict(zip(columns, row)) for row in rows]
+
+    results = []
+    for row in rows:
+        row = list(row)
+        for index in fallback:
+            row[index] = serialize_value(row[index])
+        results.append(dict(zip(columns, row)))
+    return results
+
+def serialize_columnar(columns, type_oids, rows):
+    """
+    Düz cursor'dan gelen tuple satırlarını kolon bazlı sonuca çevirir. Satırlar tek
+    seferde kolonlara ayrılır (zip); yalnızca tipi tanınmayan kolonlar hücre hücre
+    dönüştürülür.
+
+    Args:
+        columns (list): Kolon adları
+        type_oids (list): Kolonların PostgreSQL tip OID'leri
+        rows (list): Satır tuple'ları
+
+    Returns:
+        dict: {'columns': [...], 'types': [...], 'data': {kolon: [değerler]}}
+    """
+    column_values = list(zip(*rows)) if rows else [()] * len(columns)
+    fallback = set(fallback_columns(type_oids))
+    data = {}
+    for index, (name, values) in enumerate(zip(columns, column_values)):
+        if index in fallback:
+            data[name] = [serialize_value(value) for value in values]
+        else:
+            data[name] = list(values)
+    return {
+        'columns': columns,
+        'types': schema_cache.get_type_names(type_oids),
+        'data': data
+    }
+
+def count_rows(results):
+    """Satır listesi veya kolon bazlı sonucun satır sayısını döndürür."""
+    if isinstance(results, dict):
+        columns = results['columns']
+        return len(results['data'][columns[0]]) if columns else 0
+    return len(results)
+
+def parse_bool_param(params, name):
+    """
+    Parametre sözlüğünden bayrak niteliğindeki bir parametreyi çıkarır.
+    Parametre SQL'e aktarılmaması için sözlükten silinir.
+    """
+    value = params.pop(name, None)
+    return str(value).lower() in ('1', 'true', 'yes') if value is not None else False
+
+def parse_format_param(params, default='json'):
+    """
+    Parametre sözlüğünden çıktı formatını çıkarır (json, columnar, ndjson, json-stream;
+    dışa aktarmada csv, tsv, xlsx). Parametre SQL'e aktarılmaması için sözlükten silinir.
+    """
+    return str(params.pop('format', default) or default).lower()
+
+def _cache_info(status):
+    stats = report_cache.stats()
+    return {
+        'status': status,
+        'hits': stats['hits'],
+        'misses': stats['misses']
+    }
+
+def _filter_params(sql_query, params):
+    """Sorguyu gerçekten etkileyen parametreleri (TABLE_NAME hariç) döndürür."""
+    return {
+        name: params[name]
+        for name in extract_parameters(sql_query)
+        if name in params and name != 'TABLE_NAME'
+    }
+
+def get_report_etag(report_name, sql_query, params, table_name, output_format='json', page=None):
+    """
+    Rapor yanıtı için sorguyu çalıştırmadan hesaplanabilen bir ETag üretir.
+
+    ETag rapor adı, SQL, sorguyu etkileyen parametreler, tablo, çıktı formatı ve sayfa
+    bilgisinin yanında kaynak tablonun veri filigranını (get_table_watermark) ve raporun
+    cacheTtl süresine göre zaman dilimini içerir. Tabloya yeni veri gelince ya da dilim
+    değişince ETag da değişir; böylece now() kullanan raporlar da en fazla cacheTtl kadar
+    aynı kalır.
+
+    Args:
+        report_name (str): Rapor adı
+        sql_query (str): Yer tutucuları içeren SQL sorgusu
+        params (dict): Parametre değerleri
+        table_name (str): Varsayılan kaynak tablo adı
+        output_format (str): Çıktı formatı (json, columnar, ndjson, json-stream)
+        page: Sayfalama bilgisi (ör. (page_size, cursor)); sayfasız çalıştırmada None
+
+    Returns:
+        tuple: (etag veya None, cacheTtl). Önbelleği kapalı raporlar ve filigranı
+            okunamayan tablolar için ETag üretilmez.
+    """
+    ttl = get_report_cache_ttl(report_name)
+    if ttl <= 0:
+        return None, 0
+
+    effective_table = params.get('TABLE_NAME') or table_name
+    watermark = get_table_watermark(effective_table)
+    if watermark is None:
+        return None, ttl
+
+    etag = make_etag(
+        report_name, sql_query, _filter_params(sql_query, params), effective_table,
+        output_format, page, watermark, int(time.time() // ttl)
+    )
+    return etag, ttl
+
+# Şablondaki sistem tablosu yer tutucusu -> rapordan önce güncellenecek özet
+SYSTEM_TABLE_ROLLUPS = {
+    'ROLLUP_HOURLY_TABLE': 'hourly',
+    'SESSIONS_TABLE': 'sessions',
+    'QA_PAIRS_TABLE': 'qa_pairs',
+    'WORD_COUNTS_TABLE': 'word_counts',
+    'MESSAGE_TOPICS_TABLE': 'message_topics',
+}
+
+def prepare_system_tables(sql_query, table_name):
+    """
+    Şablonun okuduğu özet tablolarını, kaynak tablodaki yeni mesajlarla günceller.
+    """
+    for placeholder in sorted(get_system_tables(sql_query)):
+        rollup_name = SYSTEM_TABLE_ROLLUPS.get(placeholder)
+        if rollup_name:
+            ensure_rollup(rollup_name, table_name)
+
+def execute_report(report_name, sql_query, params, table_name, use_cache=True, refresh=False, page=None, run=None,
+                   columnar=False, publish=False):
+    """
+    Rapor sorgusunu parametrelerle çalıştırır. Aynı rapor, parametre ve tablo için
+    geçerli bir sonuç önbellekte varsa veritabanına gidilmez.
+
+    Zamanlanmış raporlarda (report_metadata.json'da schedule) bellek içi önbellekte
+    kayıt yoksa zamanlayıcının paylaşılan tabloya yazdığı sonuç kullanılır ('warm').
+
+    Args:
+        report_name (str): Rapor adı
+        sql_query (str): Yer tutucuları içeren SQL sorgusu
+        params (dict): Parametre değerleri
+        table_name (str): Varsayılan kaynak tablo adı
+        use_cache (bool): Sonuç önbelleği kullanılsın mı?
+        refresh (bool): Önbellekteki kaydı yok sayıp sorguyu yeniden çalıştır
+        page (dict): Keyset sayfalama bilgisi (order_key, after, page_size); verilirse
+            sorgu sayfalama sorgusuyla sarılır ve page_size + 1 satır döner
+        run (dict): Metrik kaydı (report_metrics.track_report_run); verilirse veritabanı
+            süresi, satır sayısı ve önbellek durumu buraya yazılır
+        columnar (bool): Sonucu satır listesi yerine kolon bazlı döndür (serialize_columnar)
+        publish (bool): Sonucu diğer worker'lar için paylaşılan tabloya da yaz (zamanlayıcı)
+
+    Returns:
+        tuple: (serileştirilmiş sonuçlar, önbellek bilgisi)
+    """
+    effective_table = params.get('TABLE_NAME') or table_name
+
+    # Önbellek anahtarına yalnızca sorguyu gerçekten etkileyen parametreler girer
+    cache_params = _filter_params(sql_query, params)
+
+    if page:
+        query, values = build_report_query(strip_trailing_order_and_limit(sql_query), params, table_name)
+        query, values = build_page_query(query, values, page['order_key'], page['after'], page['page_size'])
+        cache_params['_page_size'] = page['page_size']
+        cache_params['_after'] = json.dumps(page['after'], default=str)
+    else:
+        query, values = build_report_query(sql_query, params, table_name)
+    if columnar:
+        cache_params['_format'] = COLUMNAR_FORMAT
+
+    cache_key = None
+    watermark = None
+    ttl = get_report_cache_ttl(report_name) if use_cache else 0
+
+    if ttl > 0:
+        watermark = get_table_watermark(effective_table)
+        if watermark is not None:
+            cache_key = report_cache.make_key(report_name, cache_params, effective_table)
+            if not refresh:
+                cached = report_cache.get(cache_key, watermark)
+                if cached is not None:
+                    logging.debug(f"'{report_name}' raporu önbellekten döndü")
+                    if run is not None:
+                        run.update({'cache_status': 'hit', 'db_ms': 0, 'row_count': count_rows(cached)})
+                    return cached, _cache_info('hit')
+
+                if not page and get_report_schedule(report_name):
+                    snapshot = load_snapshot(cache_key, watermark)
+                    if snapshot is not None:
+                        results, remaining = snapshot
+                        report_cache.put(cache_key, results, min(remaining, ttl), watermark)
+                        logging.debug(f"'{report_name}' raporu paylaşılan önbellekten döndü")
+                        if run is not None:
+                            run.update({'cache_status': 'warm', 'db_ms': 0, 'row_count': count_rows(results)})
+                        return results, _cache_info('warm')
+
+    prepare_system_tables(sql_query, effective_table)
+
+    logging.debug(f"Rapor sorgusu çalıştırılıyor: {report_name}, parametreler: {values}")
+    db_start = time.monotonic()
+    columns, type_oids, rows = execute_query(query, values, prepare=True, columnar=True, json_types=True)
+    db_ms = round((time.monotonic() - db_start) * 1000, 2)
+    if columnar:
+        results = serialize_columnar(columns, type_oids, rows)
+    else:
+        results = serialize_rows(columns, type_oids, rows)
+
+    status = 'bypass'
+    if cache_key is not None:
+        report_cache.put(cache_key, results, ttl, watermark)
+        status = 'refresh' if refresh else 'miss'
+        if publish:
+            save_snapshot(cache_key, results, ttl, watermark)
+
+    if run is not None:
+        run.update({
+            'cache_status': status, 'db_ms': db_ms, 'row_count': count_rows(results),
+            'query': query, 'values': values
+        })
+    return results, _cache_info(status)
+
+def execute_report_page(report, params, table_name, page_size, cursor=None, refresh=False, run=None,
+                        columnar=False):
+    """
+    Raporun tek bir sayfasını keyset sayfalama ile çalıştırır. Sayfalar raporun
+    report_metadata.json'da tanımlı orderKey'ine göre ilerler; cursor, önceki
+    sayfanın son satırının anahtar değerlerini taşıyan opak bir değerdir.
+
+    Args:
+        report (dict): Kayıt defterindeki rapor tanımı
+        params (dict): Parametre değerleri
+        table_name (str): Varsayılan kaynak tablo adı
+        page_size (int, str): Sayfa boyutu
+        cursor (str): Önceki yanıttaki nextCursor değeri (ilk sayfa için None)
+        refresh (bool): Önbellekteki kaydı yok sayıp sorguyu yeniden çalıştır
+        run (dict): Metrik kaydı (bkz. execute_report)
+        columnar (bool): Sayfayı kolon bazlı döndür
+
+    Returns:
+        tuple: (sayfadaki satırlar, önbellek bilgisi, sayfalama bilgisi)
+    """
+    order_key = report['order_key']
+    if not order_key:
+        raise PaginationError(f"'{report['report_name']}' raporu için sıralama anahtarı (orderKey) tanımlı değil")
+
+    report_name = report['report_name']
+    page_size = parse_page_size(page_size)
+    filter_params = _filter_params(report['sql'], params)
+    filter_params['TABLE_NAME'] = params.get('TABLE_NAME') or table_name
+    after = decode_cursor(cursor, report_name, order_key, filter_params) if cursor else None
+
+    rows, cache_info = execute_report(
+        report_name, report['sql'], params, table_name, refresh=refresh,
+        page={'order_key': order_key, 'after': after, 'page_size': page_size}, run=run,
+        columnar=columnar
+    )
+
+    has_more = count_rows(rows) > page_size
+    if columnar:
+        # Önbellekteki sonuç değiştirilmemesi için kolonlar kopyalanarak kesilir
+        rows = {**rows, 'data': {name: values[:page_size] for name, values in rows['data'].items()}}
+        last_row = {name: values[-1] for name, values in rows['data'].items()} if has_more else None
+    else:
+        rows = rows[:page_size]
+        last_row = rows[-1] if has_more else None
+    next_cursor = encode_cursor(report_name, order_key, filter_params, last_row) if has_more else None
+
+    return rows, cache_info, {
+        'pageSize': page_size,
+        'hasMore': has_more,
+        'nextCursor': next_cursor
+    }
+
+def stream_report(report_name, sql_query, params, table_name, output_format='ndjson', results_key='results', run=None):
+    """
+    Rapor sorgusunu sunucu tarafı cursor ile çalıştırır ve sonucu parça parça
+    üreten bir generator döndürür. Bellek kullanımı satır sayısından bağımsızdır;
+    sonuç önbelleği bu modda kullanılmaz.
+    
+    İlk satır partisi fonksiyon dönmeden önce çekilir, böylece SQL hataları yanıt
+    başlamadan önce istisna olarak yakalanabilir. Akış sırasında oluşan hatalar
+    yanıtın sonuna eklenir (ndjson: {"error": ...} satırı, json-stream: "status": "error").
+    
+    Args:
+        report_name (str): Rapor adı
+        sql_query (str): Yer tutucuları içeren SQL sorgusu
+        params (dict): Parametre değerleri
+        table_name (str): Varsayılan kaynak tablo adı
+        output_format (str): 'ndjson' (satır başına bir JSON nesnesi) veya
+            'json-stream' (parça parça gönderilen tek JSON nesnesi)
+        results_key (str): json-stream modunda satırların yer alacağı anahtar
+        run (dict): Metrik kaydı; veritabanından parti çekme süresi ve satır sayısı
+            akış bittiğinde buraya yazılır
+        
+    Returns:
+        generator: UTF-8 kodlanmış yanıt parçaları
+    """
+    query, values = build_report_query(sql_query, params, table_name)
+    prepare_system_tables(sql_query, params.get('TABLE_NAME') or table_name)
+    logging.debug(f"Rapor sorgusu akış modunda çalıştırılıyor: {report_name}, parametreler: {values}")
+    
+    db_start = time.monotonic()
+    batches = stream_query(query, values, json_types=True)
+    first_batch = next(batches, [])
+    db_seconds = time.monotonic() - db_start
+    if run is not None:
+        run.update({'query': query, 'values': values})
+    
+    def encode(row):
+        # Değerler JSON typecaster'larıyla okunur; tanınmayan tipler default=str ile çevrilir
+        return json.dumps(row, ensure_ascii=False, default=str)
+    
+    def generate():
+        nonlocal db_seconds
+        row_count = 0
+        buffer = []
+        buffered_bytes = 0
+        error = None
+        
+        if output_format == 'json-stream':
+            yield f'{{"{results_key}": ['.encode('utf-8')
+        
+        try:
+            batch = first_batch
+            while batch:
+                for row in batch:
+                    line = encode(row)
+                    if output_format == 'ndjson':
+                        line += '\n'
+                    elif row_count:
+                        line = ',' + line
+                    row_count += 1
+                    
+                    buffer.append(line)
+                    buffered_bytes += len(line)
+                    if buffered_bytes >= STREAM_CHUNK_BYTES:
+                        yield ''.join(buffer).encode('utf-8')
+                        buffer = []
+                        buffered_bytes = 0
+                fetch_start = time.monotonic()
+                batch = next(batches, [])
+                db_seconds += time.monotonic() - fetch_start
+        except Exception as e:
+            logging.error(f"Rapor akışı sırasında hata: {e} (Rapor: {report_name})")
+            error = str(e)
+        finally:
+            batches.close()
+            if run is not None:
+                run.update({
+                    'cache_status': 'bypass', 'db_ms': round(db_seconds * 1000, 2),
+                    'row_count': row_count, 'error': error
+                })
+        
+        if buffer:
+            yield ''.join(buffer).encode('utf-8')
+        
+        if output_format == 'ndjson':
+            if error:
+                yield (json.dumps({'error': error}, ensure_ascii=False) + '\n').encode('utf-8')
+        else:
+            trailer = {'rowCount': row_count, 'status': 'error' if error else 'success'}
+            if error:
+                trailer['message'] = f'Sorgu çalıştırma hatası: {error}'
+            yield ('],' + json.dumps(trailer, ensure_ascii=False)[1:]).encode('utf-8')
+        
+        logging.debug(f"'{report_name}' raporu akış modunda tamamlandı: {row_count} satır")
+    
+    return generate()
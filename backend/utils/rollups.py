@@ -0,0 +1,684 @@
+import os
+import sys
+import time
+import logging
+import threading
+import traceback
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+from utils.db import get_db_connection, execute_query
+from utils.topics import label_messages
+from config import (
+    SYSTEM_TABLE_PREFIX, ROLLUP_REFRESH_INTERVAL, ROLLUP_OVERLAP_HOURS, ROLLUP_BACKFILL_DAYS,
+    QA_FILL_RESPONSE_TIME
+)
+
+ROLLUP_HOURLY_TABLE = f"{SYSTEM_TABLE_PREFIX}rollup_hourly"
+ROLLUP_STATE_TABLE = f"{SYSTEM_TABLE_PREFIX}rollup_state"
+SESSIONS_TABLE = f"{SYSTEM_TABLE_PREFIX}sessions"
+QA_PAIRS_TABLE = f"{SYSTEM_TABLE_PREFIX}qa_pairs"
+WORD_COUNTS_TABLE = f"{SYSTEM_TABLE_PREFIX}word_counts"
+MESSAGE_TOPICS_TABLE = f"{SYSTEM_TABLE_PREFIX}message_topics"
+
+_tables_ready = False
+_last_refresh = {}
+_refresh_lock = threading.Lock()
+
+def create_rollup_tables():
+    """
+    Özet (rollup) tablolarını oluşturur.
+
+    - rollup_hourly: Kaynak tablo ve saat bazında mesaj/oturum/context sayıları
+    - sessions: Kaynak tablo ve oturum bazında başlangıç/bitiş, mesaj sayıları, ilk soru,
+      context kullanımı ve ortalama yanıt süresi
+    - qa_pairs: Kullanıcı sorusu ve hemen ardından gelen AI yanıtı çiftleri, yanıt süresiyle
+    - word_counts: Kaynak tablo, gün ve rol bazında kelime kullanım sayıları
+    - message_topics: Kullanıcı mesajlarının konu sözlüğüne göre etiketlenmiş konuları
+    - rollup_state: Her özet için işlenen son created_date değeri (high-water mark)
+    """
+    global _tables_ready
+
+    execute_query(f"""
+    CREATE TABLE IF NOT EXISTS {ROLLUP_HOURLY_TABLE} (
+        source_table VARCHAR(255) NOT NULL,
+        bucket TIMESTAMPTZ NOT NULL,
+        message_count INTEGER NOT NULL DEFAULT 0,
+        user_messages INTEGER NOT NULL DEFAULT 0,
+        ai_messages INTEGER NOT NULL DEFAULT 0,
+        context_messages INTEGER NOT NULL DEFAULT 0,
+        ai_context_messages INTEGER NOT NULL DEFAULT 0,
+        active_sessions INTEGER NOT NULL DEFAULT 0,
+        new_sessions INTEGER NOT NULL DEFAULT 0,
+        message_length_sum BIGINT NOT NULL DEFAULT 0,
+        message_length_count INTEGER NOT NULL DEFAULT 0,
+        response_time_sum BIGINT NOT NULL DEFAULT 0,
+        response_time_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (source_table, bucket)
+    )
+    """, commit=True)
+
+    execute_query(f"""
+    CREATE TABLE IF NOT EXISTS {ROLLUP_STATE_TABLE} (
+        source_table VARCHAR(255) NOT NULL,
+        rollup_name VARCHAR(50) NOT NULL,
+        high_water TIMESTAMPTZ,
+        rows_processed BIGINT NOT NULL DEFAULT 0,
+        refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (source_table, rollup_name)
+    )
+    """, commit=True)
+
+    execute_query(f"""
+    CREATE TABLE IF NOT EXISTS {SESSIONS_TABLE} (
+        source_table VARCHAR(255) NOT NULL,
+        session_id TEXT NOT NULL,
+        started_at TIMESTAMPTZ NOT NULL,
+        ended_at TIMESTAMPTZ NOT NULL,
+        duration_seconds NUMERIC NOT NULL DEFAULT 0,
+        message_count INTEGER NOT NULL DEFAULT 0,
+        user_messages INTEGER NOT NULL DEFAULT 0,
+        ai_messages INTEGER NOT NULL DEFAULT 0,
+        context_messages INTEGER NOT NULL DEFAULT 0,
+        ai_context_messages INTEGER NOT NULL DEFAULT 0,
+        total_content_length BIGINT NOT NULL DEFAULT 0,
+        avg_response_length NUMERIC,
+        first_question TEXT,
+        first_question_length INTEGER,
+        response_count INTEGER NOT NULL DEFAULT 0,
+        avg_response_time_seconds NUMERIC,
+        max_gap_seconds NUMERIC,
+        min_user_message_length INTEGER,
+        max_user_message_length INTEGER,
+        avg_user_message_length NUMERIC,
+        updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (source_table, session_id)
+    )
+    """, commit=True)
+
+    # Oturum özetine sonradan eklenen kolonlar; eski tabloya eklenirse özet bir sonraki
+    # güncellemede baştan hesaplanır
+    missing = execute_query("""
+    SELECT NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = %s AND column_name = 'max_gap_seconds'
+    ) AS missing
+    """, (SESSIONS_TABLE.lower(),), fetch_all=False)
+    if missing and missing['missing']:
+        execute_query(f"""
+        ALTER TABLE {SESSIONS_TABLE}
+            ADD COLUMN IF NOT EXISTS max_gap_seconds NUMERIC,
+            ADD COLUMN IF NOT EXISTS min_user_message_length INTEGER,
+            ADD COLUMN IF NOT EXISTS max_user_message_length INTEGER,
+            ADD COLUMN IF NOT EXISTS avg_user_message_length NUMERIC
+        """, commit=True)
+        execute_query(
+            f"DELETE FROM {ROLLUP_STATE_TABLE} WHERE rollup_name = 'sessions'", commit=True
+        )
+    execute_query(f"""
+    CREATE INDEX IF NOT EXISTS idx_{SESSIONS_TABLE}_started
+    ON {SESSIONS_TABLE} (source_table, started_at)
+    """, commit=True)
+    execute_query(f"""
+    CREATE INDEX IF NOT EXISTS idx_{SESSIONS_TABLE}_ended
+    ON {SESSIONS_TABLE} (source_table, ended_at)
+    """, commit=True)
+
+    execute_query(f"""
+    CREATE TABLE IF NOT EXISTS {QA_PAIRS_TABLE} (
+        source_table VARCHAR(255) NOT NULL,
+        session_id TEXT NOT NULL,
+        question_id TEXT NOT NULL,
+        answer_id TEXT NOT NULL,
+        question_row_id UUID NOT NULL,
+        answer_row_id UUID NOT NULL,
+        question_order INTEGER NOT NULL,
+        question_time TIMESTAMPTZ NOT NULL,
+        answer_time TIMESTAMPTZ NOT NULL,
+        question_length INTEGER,
+        answer_length INTEGER,
+        has_context BOOLEAN,
+        response_seconds NUMERIC NOT NULL,
+        PRIMARY KEY (source_table, question_row_id)
+    )
+    """, commit=True)
+    execute_query(f"""
+    CREATE INDEX IF NOT EXISTS idx_{QA_PAIRS_TABLE}_question_time
+    ON {QA_PAIRS_TABLE} (source_table, question_time)
+    """, commit=True)
+    execute_query(f"""
+    CREATE INDEX IF NOT EXISTS idx_{QA_PAIRS_TABLE}_response
+    ON {QA_PAIRS_TABLE} (source_table, response_seconds)
+    """, commit=True)
+    execute_query(f"""
+    CREATE INDEX IF NOT EXISTS idx_{QA_PAIRS_TABLE}_session
+    ON {QA_PAIRS_TABLE} (source_table, session_id)
+    """, commit=True)
+
+    execute_query(f"""
+    CREATE TABLE IF NOT EXISTS {WORD_COUNTS_TABLE} (
+        source_table VARCHAR(255) NOT NULL,
+        day DATE NOT NULL,
+        role VARCHAR(50) NOT NULL,
+        word TEXT NOT NULL,
+        word_count INTEGER NOT NULL,
+        PRIMARY KEY (source_table, day, role, word)
+    )
+    """, commit=True)
+
+    execute_query(f"""
+    CREATE TABLE IF NOT EXISTS {MESSAGE_TOPICS_TABLE} (
+        source_table VARCHAR(255) NOT NULL,
+        message_row_id UUID NOT NULL,
+        session_id TEXT,
+        created_date TIMESTAMPTZ NOT NULL,
+        message_length INTEGER,
+        topic VARCHAR(255) NOT NULL,
+        dictionary_version VARCHAR(32) NOT NULL,
+        PRIMARY KEY (source_table, message_row_id)
+    )
+    """, commit=True)
+    execute_query(f"""
+    CREATE INDEX IF NOT EXISTS idx_{MESSAGE_TOPICS_TABLE}_created
+    ON {MESSAGE_TOPICS_TABLE} (source_table, created_date)
+    """, commit=True)
+    execute_query(f"""
+    CREATE INDEX IF NOT EXISTS idx_{MESSAGE_TOPICS_TABLE}_topic
+    ON {MESSAGE_TOPICS_TABLE} (source_table, topic, created_date)
+    """, commit=True)
+
+    _tables_ready = True
+
+def get_rollup_state(cursor, source_table, rollup_name):
+    """Özetin son işlenen created_date değerini döndürür (hiç çalışmadıysa None)."""
+    cursor.execute(f"""
+    SELECT high_water FROM {ROLLUP_STATE_TABLE}
+    WHERE source_table = %s AND rollup_name = %s
+    """, (source_table, rollup_name))
+    row = cursor.fetchone()
+    return row['high_water'] if row else None
+
+def set_rollup_state(cursor, source_table, rollup_name, high_water, rows_processed):
+    """Özetin high-water mark değerini günceller."""
+    cursor.execute(f"""
+    INSERT INTO {ROLLUP_STATE_TABLE} (source_table, rollup_name, high_water, rows_processed, refreshed_at)
+    VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+    ON CONFLICT (source_table, rollup_name) DO UPDATE SET
+        high_water = EXCLUDED.high_water,
+        rows_processed = {ROLLUP_STATE_TABLE}.rows_processed + EXCLUDED.rows_processed,
+        refreshed_at = CURRENT_TIMESTAMP
+    """, (source_table, rollup_name, high_water, rows_processed))
+
+_HOURLY_REFRESH_SQL = """
+WITH src AS (
+    SELECT session_id, role, created_date, has_context, message_length, response_time
+    FROM {source}
+    WHERE created_date >= %(recompute_from)s AND created_date < %(recompute_to)s
+),
+first_seen AS (
+    SELECT session_id, MIN(created_date) AS first_at
+    FROM src
+    GROUP BY session_id
+),
+new_sessions AS (
+    SELECT date_trunc('hour', f.first_at) AS bucket, COUNT(*) AS new_sessions
+    FROM first_seen f
+    WHERE NOT EXISTS (
+        SELECT 1 FROM {source} o
+        WHERE o.session_id = f.session_id AND o.created_date < %(recompute_from)s
+    )
+    GROUP BY 1
+),
+hourly AS (
+    SELECT
+        date_trunc('hour', created_date) AS bucket,
+        COUNT(*) AS message_count,
+        COUNT(*) FILTER (WHERE role = 'userMessage') AS user_messages,
+        COUNT(*) FILTER (WHERE role = 'apiMessage') AS ai_messages,
+        COUNT(*) FILTER (WHERE has_context = TRUE) AS context_messages,
+        COUNT(*) FILTER (WHERE role = 'apiMessage' AND has_context = TRUE) AS ai_context_messages,
+        COUNT(DISTINCT session_id) AS active_sessions,
+        COALESCE(SUM(message_length), 0) AS message_length_sum,
+        COUNT(message_length) AS message_length_count,
+        COALESCE(SUM(response_time), 0) AS response_time_sum,
+        COUNT(response_time) AS response_time_count
+    FROM src
+    GROUP BY 1
+)
+INSERT INTO {rollup} (
+    source_table, bucket, message_count, user_messages, ai_messages, context_messages,
+    ai_context_messages, active_sessions, new_sessions, message_length_sum,
+    message_length_count, response_time_sum, response_time_count, updated_at
+)
+SELECT
+    %(source_table)s, h.bucket, h.message_count, h.user_messages, h.ai_messages, h.context_messages,
+    h.ai_context_messages, h.active_sessions, COALESCE(n.new_sessions, 0), h.message_length_sum,
+    h.message_length_count, h.response_time_sum, h.response_time_count, CURRENT_TIMESTAMP
+FROM hourly h
+LEFT JOIN new_sessions n ON n.bucket = h.bucket
+ON CONFLICT (source_table, bucket) DO UPDATE SET
+    message_count = EXCLUDED.message_count,
+    user_messages = EXCLUDED.user_messages,
+    ai_messages = EXCLUDED.ai_messages,
+    context_messages = EXCLUDED.context_messages,
+    ai_context_messages = EXCLUDED.ai_context_messages,
+    active_sessions = EXCLUDED.active_sessions,
+    new_sessions = EXCLUDED.new_sessions,
+    message_length_sum = EXCLUDED.message_length_sum,
+    message_length_count = EXCLUDED.message_length_count,
+    response_time_sum = EXCLUDED.response_time_sum,
+    response_time_count = EXCLUDED.response_time_count,
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+_SESSIONS_REFRESH_SQL = """
+WITH touched AS (
+    SELECT DISTINCT session_id
+    FROM {source}
+    WHERE created_date >= %(recompute_from)s AND created_date < %(recompute_to)s
+),
+ordered AS (
+    SELECT
+        m.session_id, m.role, m.created_date, m.content, m.message_length, m.has_context,
+        LAG(m.role) OVER w AS prev_role,
+        LAG(m.created_date) OVER w AS prev_date
+    FROM {source} m
+    JOIN touched t ON t.session_id = m.session_id
+    WHERE m.created_date IS NOT NULL
+    WINDOW w AS (PARTITION BY m.session_id ORDER BY m.created_date)
+),
+first_questions AS (
+    SELECT DISTINCT ON (session_id)
+        session_id, content AS first_question, message_length AS first_question_length
+    FROM ordered
+    WHERE role = 'userMessage'
+    ORDER BY session_id, created_date
+),
+stats AS (
+    SELECT
+        session_id,
+        MIN(created_date) AS started_at,
+        MAX(created_date) AS ended_at,
+        COUNT(*) AS message_count,
+        COUNT(*) FILTER (WHERE role = 'userMessage') AS user_messages,
+        COUNT(*) FILTER (WHERE role = 'apiMessage') AS ai_messages,
+        COUNT(*) FILTER (WHERE has_context = TRUE) AS context_messages,
+        COUNT(*) FILTER (WHERE role = 'apiMessage' AND has_context = TRUE) AS ai_context_messages,
+        COALESCE(SUM(message_length), 0) AS total_content_length,
+        AVG(message_length) FILTER (WHERE role = 'apiMessage') AS avg_response_length,
+        -- Yanıt süresi: kullanıcı mesajından hemen sonra gelen AI mesajına kadar geçen süre
+        COUNT(*) FILTER (WHERE role = 'apiMessage' AND prev_role = 'userMessage') AS response_count,
+        AVG(EXTRACT(EPOCH FROM (created_date - prev_date)))
+            FILTER (WHERE role = 'apiMessage' AND prev_role = 'userMessage') AS avg_response_time_seconds,
+        MAX(EXTRACT(EPOCH FROM (created_date - prev_date))) AS max_gap_seconds,
+        MIN(message_length) FILTER (WHERE role = 'userMessage') AS min_user_message_length,
+        MAX(message_length) FILTER (WHERE role = 'userMessage') AS max_user_message_length,
+        AVG(message_length) FILTER (WHERE role = 'userMessage') AS avg_user_message_length
+    FROM ordered
+    GROUP BY session_id
+)
+INSERT INTO {rollup} (
+    source_table, session_id, started_at, ended_at, duration_seconds, message_count,
+    user_messages, ai_messages, context_messages, ai_context_messages, total_content_length,
+    avg_response_length, first_question, first_question_length, response_count,
+    avg_response_time_seconds, max_gap_seconds, min_user_message_length,
+    max_user_message_length, avg_user_message_length, updated_at
+)
+SELECT
+    %(source_table)s, s.session_id::text, s.started_at, s.ended_at,
+    EXTRACT(EPOCH FROM (s.ended_at - s.started_at)), s.message_count,
+    s.user_messages, s.ai_messages, s.context_messages, s.ai_context_messages, s.total_content_length,
+    s.avg_response_length, f.first_question, f.first_question_length, s.response_count,
+    s.avg_response_time_seconds, s.max_gap_seconds, s.min_user_message_length,
+    s.max_user_message_length, s.avg_user_message_length, CURRENT_TIMESTAMP
+FROM stats s
+LEFT JOIN first_questions f ON f.session_id = s.session_id
+ON CONFLICT (source_table, session_id) DO UPDATE SET
+    started_at = EXCLUDED.started_at,
+    ended_at = EXCLUDED.ended_at,
+    duration_seconds = EXCLUDED.duration_seconds,
+    message_count = EXCLUDED.message_count,
+    user_messages = EXCLUDED.user_messages,
+    ai_messages = EXCLUDED.ai_messages,
+    context_messages = EXCLUDED.context_messages,
+    ai_context_messages = EXCLUDED.ai_context_messages,
+    total_content_length = EXCLUDED.total_content_length,
+    avg_response_length = EXCLUDED.avg_response_length,
+    first_question = EXCLUDED.first_question,
+    first_question_length = EXCLUDED.first_question_length,
+    response_count = EXCLUDED.response_count,
+    avg_response_time_seconds = EXCLUDED.avg_response_time_seconds,
+    max_gap_seconds = EXCLUDED.max_gap_seconds,
+    min_user_message_length = EXCLUDED.min_user_message_length,
+    max_user_message_length = EXCLUDED.max_user_message_length,
+    avg_user_message_length = EXCLUDED.avg_user_message_length,
+    updated_at = CURRENT_TIMESTAMP
+"""
+
+# Soru-cevap çiftleri, yeni mesajı olan oturumlar için silinip yeniden oluşturulur; böylece
+# araya sonradan yazılan mesajlar eski eşleşmeleri de doğru şekilde değiştirir
+_TOUCHED_SESSIONS_SQL = """
+    SELECT DISTINCT session_id::text
+    FROM {source}
+    WHERE created_date >= %(recompute_from)s AND created_date < %(recompute_to)s
+"""
+
+_QA_PAIRS_DELETE_SQL = """
+DELETE FROM {rollup}
+WHERE source_table = %(source_table)s
+    AND session_id IN (""" + _TOUCHED_SESSIONS_SQL + """)
+"""
+
+_QA_PAIRS_INSERT_SQL = """
+WITH touched AS (
+    SELECT DISTINCT session_id
+    FROM {source}
+    WHERE created_date >= %(recompute_from)s AND created_date < %(recompute_to)s
+),
+ordered AS (
+    SELECT
+        m.id, m.session_id, m.message_id, m.role, m.created_date, m.message_length,
+        COUNT(*) FILTER (WHERE m.role = 'userMessage') OVER w AS question_order,
+        LEAD(m.id) OVER w AS next_id,
+        LEAD(m.message_id) OVER w AS next_message_id,
+        LEAD(m.role) OVER w AS next_role,
+        LEAD(m.created_date) OVER w AS next_created_date,
+        LEAD(m.message_length) OVER w AS next_message_length,
+        LEAD(m.has_context) OVER w AS next_has_context
+    FROM {source} m
+    JOIN touched t ON t.session_id = m.session_id
+    WHERE m.created_date IS NOT NULL
+    WINDOW w AS (PARTITION BY m.session_id ORDER BY m.created_date)
+)
+INSERT INTO {rollup} (
+    source_table, session_id, question_id, answer_id, question_row_id, answer_row_id,
+    question_order, question_time, answer_time, question_length, answer_length,
+    has_context, response_seconds
+)
+SELECT
+    %(source_table)s, session_id::text, message_id::text, next_message_id::text, id, next_id,
+    question_order, created_date, next_created_date, message_length, next_message_length,
+    next_has_context, EXTRACT(EPOCH FROM (next_created_date - created_date))
+FROM ordered
+WHERE role = 'userMessage' AND next_role = 'apiMessage'
+ON CONFLICT (source_table, question_row_id) DO NOTHING
+"""
+
+# Mesaj tablosundaki response_time (ms) kolonu, yanıt mesajına yazılır
+_QA_RESPONSE_TIME_SQL = """
+UPDATE {source} m
+SET response_time = LEAST(ROUND(p.response_seconds * 1000), 2147483647)::int
+FROM {rollup} p
+WHERE p.source_table = %(source_table)s
+    AND p.session_id IN (""" + _TOUCHED_SESSIONS_SQL + """)
+    AND m.id = p.answer_row_id
+    AND m.response_time IS DISTINCT FROM LEAST(ROUND(p.response_seconds * 1000), 2147483647)::int
+"""
+
+# Kelime sayıları gün bazında tutulur; yeni mesajı olan günler silinip o günün tüm
+# mesajlarından yeniden hesaplanır
+_TOUCHED_DAYS_SQL = """
+    SELECT DISTINCT DATE(created_date) AS day
+    FROM {source}
+    WHERE created_date >= %(recompute_from)s AND created_date < %(recompute_to)s
+"""
+
+_WORD_COUNTS_DELETE_SQL = """
+DELETE FROM {rollup}
+WHERE source_table = %(source_table)s
+    AND day IN (""" + _TOUCHED_DAYS_SQL + """)
+"""
+
+# Kelimelere ayırma: Türkçe büyük/küçük harf dönüşümü (İ -> i, I -> ı; veritabanı
+# collation'ı C olsa da doğru çalışması için TRANSLATE ile), noktalama işaretlerinin
+# atılması ve boşluklardan bölme. 2 karakterden kısa ve 100 karakterden uzun parçalar
+# saklanmaz; hariç tutulan kelimeler ve uzunluk/sayı eşikleri rapor sorgusunda uygulanır.
+_WORD_COUNTS_INSERT_SQL = """
+WITH days AS (""" + _TOUCHED_DAYS_SQL + """),
+tokens AS (
+    SELECT
+        DATE(m.created_date) AS day,
+        m.role,
+        regexp_split_to_table(
+            regexp_replace(
+                LOWER(TRANSLATE(m.content, 'İIÇĞÖŞÜÂÎÛ', 'iıçğöşüâîû')),
+                '[^[:alnum:]à-öø-ÿğış]+', ' ', 'g'
+            ),
+            ' '
+        ) AS word
+    FROM {source} m
+    WHERE m.created_date >= (SELECT MIN(day) FROM days)
+        AND m.created_date < (SELECT MAX(day) FROM days) + 1
+        AND DATE(m.created_date) IN (SELECT day FROM days)
+        AND m.role IS NOT NULL
+        AND LENGTH(m.content) > 0
+)
+INSERT INTO {rollup} (source_table, day, role, word, word_count)
+SELECT %(source_table)s, day, role, word, COUNT(*)
+FROM tokens
+WHERE LENGTH(word) BETWEEN 2 AND 100
+GROUP BY day, role, word
+"""
+
+# Özet adı -> hedef tablo, açıklama ve sırayla çalışan sorgular (satır sayısı, count
+# olarak işaretli sorgudan alınır). SQL ile ifade edilemeyen adımlar fonksiyon olarak
+# verilir; fonksiyon (cursor, kaynak tablo, özet tablosu, parametreler) ile çağrılır ve
+# işlediği satır sayısını döndürür.
+ROLLUPS = {
+    'hourly': {
+        'table': ROLLUP_HOURLY_TABLE,
+        'label': 'Saatlik özet',
+        'statements': [(_HOURLY_REFRESH_SQL, True)],
+    },
+    'sessions': {
+        'table': SESSIONS_TABLE,
+        'label': 'Oturum özeti',
+        'statements': [(_SESSIONS_REFRESH_SQL, True)],
+    },
+    'qa_pairs': {
+        'table': QA_PAIRS_TABLE,
+        'label': 'Soru-cevap çiftleri',
+        'statements': [(_QA_PAIRS_DELETE_SQL, False), (_QA_PAIRS_INSERT_SQL, True)]
+            + ([(_QA_RESPONSE_TIME_SQL, False)] if QA_FILL_RESPONSE_TIME else []),
+    },
+    'word_counts': {
+        'table': WORD_COUNTS_TABLE,
+        'label': 'Kelime sayıları',
+        'statements': [(_WORD_COUNTS_DELETE_SQL, False), (_WORD_COUNTS_INSERT_SQL, True)],
+    },
+    'message_topics': {
+        'table': MESSAGE_TOPICS_TABLE,
+        'label': 'Konu etiketleri',
+        'statements': [(label_messages, True)],
+    },
+}
+
+def refresh_rollup(rollup_name, source_table, rebuild=False):
+    """
+    Özet tablosunu kaynak tablodaki yeni mesajlarla günceller.
+
+    Son işlenen created_date değerinin saatinden (ROLLUP_OVERLAP_HOURS kadar geriden)
+    itibaren gelen mesajlar yeniden işlenip özetin ilgili satırlarının üzerine yazılır;
+    böylece hem yeni gelen hem de biraz gecikmeli yazılan mesajlar sayılır ve işlem
+    tekrarlandığında sonuç değişmez. Saatlik özette bu saatler, oturum özeti ve soru-cevap
+    çiftlerinde bu aralıkta mesajı olan oturumlar (tüm mesajlarıyla), kelime sayılarında
+    bu aralıkta mesajı olan günler, konu etiketlerinde ise bu aralıktaki kullanıcı mesajları
+    yeniden hesaplanır.
+
+    İlk oluşturmada tablo ROLLUP_BACKFILL_DAYS günlük partiler halinde, her parti ayrı
+    transaction'da işlenir ve high-water mark her partiden sonra kaydedilir; yarıda kalan
+    bir ilk oluşturma kaldığı yerden devam eder. Aynı tablo için eşzamanlı çalışmalar
+    advisory lock ile engellenir.
+
+    Args:
+        rollup_name (str): ROLLUPS anahtarı ('hourly' | 'sessions' | 'qa_pairs' | 'word_counts' |
+            'message_topics')
+        source_table (str): Mesajların bulunduğu müşteri tablosu
+        rebuild (bool): Özeti baştan oluştur
+
+    Returns:
+        dict: İşlem özeti (status: 'refreshed' | 'up_to_date' | 'locked' | 'empty')
+    """
+    if rollup_name not in ROLLUPS:
+        raise ValueError(f"Bilinmeyen özet: {rollup_name}")
+    if not _tables_ready:
+        create_rollup_tables()
+
+    spec = ROLLUPS[rollup_name]
+    start = time.monotonic()
+    source = sql.Identifier(*source_table.split('.'))
+    rollup = sql.SQL(spec['table'])
+    statements = [
+        (statement if callable(statement) else sql.SQL(statement).format(source=source, rollup=rollup), counted)
+        for statement, counted in spec['statements']
+    ]
+    lock_key = f"rollup_{rollup_name}:{source_table}"
+
+    with get_db_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            # Aynı tablo için başka bir worker güncelleme yapıyorsa bekleme. Kilit ilk
+            # oluşturmadaki partiler boyunca tutulduğu için transaction değil oturum seviyesindedir
+            cursor.execute("SELECT pg_try_advisory_lock(hashtext(%s)) AS locked", (lock_key,))
+            locked = cursor.fetchone()['locked']
+            conn.commit()
+            if not locked:
+                return {'status': 'locked'}
+
+            try:
+                high_water = None
+                if rebuild:
+                    cursor.execute(
+                        f"DELETE FROM {spec['table']} WHERE source_table = %s", (source_table,)
+                    )
+                    cursor.execute(
+                        f"DELETE FROM {ROLLUP_STATE_TABLE} WHERE source_table = %s AND rollup_name = %s",
+                        (source_table, rollup_name)
+                    )
+                else:
+                    high_water = get_rollup_state(cursor, source_table, rollup_name)
+
+                cursor.execute(sql.SQL(
+                    "SELECT MIN(created_date) AS min_date, MAX(created_date) AS max_date FROM {}"
+                ).format(source))
+                bounds = cursor.fetchone()
+                max_date = bounds['max_date']
+
+                if max_date is None:
+                    conn.rollback()
+                    return {'status': 'empty'}
+                if high_water is not None and max_date <= high_water:
+                    conn.rollback()
+                    return {'status': 'up_to_date', 'high_water': high_water.isoformat()}
+
+                backfill = high_water is None and ROLLUP_BACKFILL_DAYS > 0
+                cursor.execute(
+                    "SELECT date_trunc('hour', %s::timestamptz) - make_interval(hours => %s) AS recompute_from",
+                    (bounds['min_date'], 0) if high_water is None else (high_water, ROLLUP_OVERLAP_HOURS)
+                )
+                recompute_from = cursor.fetchone()['recompute_from']
+
+                rows = 0
+                batches = 0
+                while True:
+                    recompute_to = None
+                    if backfill:
+                        cursor.execute(
+                            "SELECT %s::timestamptz + make_interval(days => %s) AS recompute_to",
+                            (recompute_from, ROLLUP_BACKFILL_DAYS)
+                        )
+                        recompute_to = cursor.fetchone()['recompute_to']
+                        if recompute_to > max_date:
+                            recompute_to = None
+
+                    params = {
+                        'recompute_from': recompute_from,
+                        'recompute_to': recompute_to or 'infinity',
+                        'source_table': source_table
+                    }
+                    batch_rows = 0
+                    for statement, counted in statements:
+                        if callable(statement):
+                            processed = statement(cursor, source, rollup, params)
+                        else:
+                            cursor.execute(statement, params)
+                            processed = cursor.rowcount
+                        if counted:
+                            batch_rows = processed
+
+                    set_rollup_state(cursor, source_table, rollup_name, recompute_to or max_date, batch_rows)
+                    conn.commit()
+                    rows += batch_rows
+                    batches += 1
+
+                    if recompute_to is None:
+                        break
+                    logging.info(f"{spec['label']} ilk oluşturma: {source_table}, {recompute_to.isoformat()} öncesi işlendi")
+                    recompute_from = recompute_to
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                try:
+                    cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", (lock_key,))
+                    conn.commit()
+                except Exception as e:
+                    logging.warning(f"Özet kilidi bırakılamadı ({lock_key}): {e}")
+
+    duration = round((time.monotonic() - start) * 1000, 2)
+    logging.info(f"{spec['label']} güncellendi: {source_table}, {rows} satır, {batches} parti, {duration} ms")
+    return {
+        'status': 'refreshed',
+        'rows': rows,
+        'batches': batches,
+        'high_water': max_date.isoformat(),
+        'duration_ms': duration
+    }
+
+def refresh_hourly_rollup(source_table, rebuild=False):
+    """Saatlik özet tablosunu günceller (bkz. refresh_rollup)."""
+    return refresh_rollup('hourly', source_table, rebuild=rebuild)
+
+def refresh_session_summary(source_table, rebuild=False):
+    """Oturum özet tablosunu günceller (bkz. refresh_rollup)."""
+    return refresh_rollup('sessions', source_table, rebuild=rebuild)
+
+def ensure_rollup(rollup_name, source_table):
+    """
+    Özet tablosunu okuyan raporlardan önce çağrılır. Son güncellemeden bu yana
+    ROLLUP_REFRESH_INTERVAL saniye geçtiyse özeti günceller. Güncelleme başarısız
+    olursa rapor mevcut özet verisiyle çalışmaya devam eder.
+    """
+    key = (rollup_name, source_table)
+    now = time.monotonic()
+    with _refresh_lock:
+        last = _last_refresh.get(key)
+        if last is not None and now - last < ROLLUP_REFRESH_INTERVAL:
+            return
+        _last_refresh[key] = now
+
+    try:
+        refresh_rollup(rollup_name, source_table)
+    except Exception as e:
+        logging.error(f"{ROLLUPS[rollup_name]['label']} güncellenemedi ({source_table}): {e}")
+        logging.error(traceback.format_exc())
+        with _refresh_lock:
+            _last_refresh.pop(key, None)
+
+def ensure_hourly_rollup(source_table):
+    """Saatlik özeti gerekiyorsa günceller (bkz. ensure_rollup)."""
+    ensure_rollup('hourly', source_table)
+
+def ensure_session_summary(source_table):
+    """Oturum özetini gerekiyorsa günceller (bkz. ensure_rollup)."""
+    ensure_rollup('sessions', source_table)
+
+def get_rollup_status():
+    """Tüm özetlerin durumunu (high-water mark, son güncelleme) döndürür."""
+    if not _tables_ready:
+        create_rollup_tables()
+    return execute_query(f"""
+    SELECT source_table, rollup_name, high_water, rows_processed, refreshed_at
+    FROM {ROLLUP_STATE_TABLE}
+    ORDER BY source_table, rollup_name
+    """)
@@ -0,0 +1,312 @@
+import os
+import sys
+import time
+import uuid
+import socket
+import logging
+import threading
+import traceback
+from functools import partial
+from datetime import datetime, timezone
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import execute_query
+from utils.report_registry import report_registry
+from utils.report_cache import get_table_watermark, get_report_schedule
+from utils.report_runner import execute_report, count_rows, COLUMNAR_FORMAT
+from utils.report_metrics import track_report_run, cleanup_report_runs
+from utils.rollups import ROLLUPS, refresh_rollup
+from utils.system_summary import get_system_summary
+from utils.audit_log import maintain_audit_log_partitions
+from config import (
+    SYSTEM_TABLE_PREFIX, REPORT_SCHEDULER_TICK, REPORT_SCHEDULER_LEADER_RETRY, REPORT_SCHEDULER_LEASE_TTL,
+    REPORT_SCHEDULER_ROLLUP_INTERVAL, REPORT_SCHEDULER_SUMMARY_INTERVAL, AUDIT_LOG_MAINTENANCE_INTERVAL,
+    REPORT_METRICS_CLEANUP_INTERVAL
+)
+
+# Lider seçiminde kullanılan kira (lease) tablosu ve kayıt adı
+SCHEDULER_LEASES_TABLE = f"{SYSTEM_TABLE_PREFIX}scheduler_leases"
+SCHEDULER_LEASE_NAME = 'report_scheduler'
+
+# Zamanlayıcının metriklerde (report_runs.mode) görünen çalıştırma modu
+SCHEDULE_MODE = 'schedule'
+
+def _utc_now():
+    return datetime.now(timezone.utc).isoformat()
+
+_table_ready = False
+
+def create_scheduler_leases_table():
+    """Zamanlayıcı liderlik kiralarının tutulduğu tabloyu oluşturur."""
+    global _table_ready
+
+    execute_query(f"""
+    CREATE TABLE IF NOT EXISTS {SCHEDULER_LEASES_TABLE} (
+        lease_name VARCHAR(100) PRIMARY KEY,
+        holder VARCHAR(255) NOT NULL,
+        acquired_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        expires_at TIMESTAMPTZ NOT NULL
+    )
+    """, commit=True)
+
+    _table_ready = True
+
+class ReportScheduler:
+    """
+    Gösterge paneli raporlarını kullanıcılar istemeden önce hesaplayan arka plan thread'i.
+
+    - Her worker zamanlayıcıyı başlatır, ancak işleri yalnızca scheduler_leases tablosundaki
+      kira kaydını alan tek worker (lider) çalıştırır. Kira REPORT_SCHEDULER_LEASE_TTL
+      saniyelik bir bitiş zamanı taşır ve lider tarafından her turda ve her işten önce
+      yenilenir. Worker kapanır veya veritabanına ulaşamazsa kira süresi dolar ve başka bir
+      worker REPORT_SCHEDULER_LEADER_RETRY saniye içinde liderliği devralır.
+    - Kilit oturuma değil tek satırlık kayıtlara bağlı olduğundan Supabase pooler'ı
+      (pgbouncer transaction modu) arkasında da çalışır; session seviyesindeki advisory
+      lock bu modda farklı istemcilerin bağlantılarına dağılabildiği için kullanılmaz.
+    - Lider her REPORT_SCHEDULER_TICK saniyede zamanı gelen işleri sırayla çalıştırır:
+      özet (rollup) tabloları, /summary özeti, report_metadata.json'da schedule tanımı
+      olan raporlar (varsayılan parametrelerle), denetim kaydı bölümlerinin bakımı ve eski
+      rapor çalıştırma metriklerinin (report_runs) silinmesi.
+    - Sonuçlar lider worker'ın önbelleğine ve diğer worker'ların okuduğu paylaşılan
+      tabloya (report_cache.REPORT_SNAPSHOTS_TABLE) yazılır.
+    """
+
+    def __init__(self, tick=REPORT_SCHEDULER_TICK, leader_retry=REPORT_SCHEDULER_LEADER_RETRY,
+                 lease_ttl=REPORT_SCHEDULER_LEASE_TTL):
+        self.tick = tick
+        self.leader_retry = leader_retry
+        self.lease_ttl = max(lease_ttl, tick * 2)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._is_leader = False
+        self._leader_since = None
+        self._last_run = {}
+        self._task_stats = {}
+        self._stats_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        return self._is_leader
+
+    def _claim_lease(self):
+        """
+        Kira kaydını bu süreç adına alır veya yeniler. Kayıt başka bir sürecindeyse ve
+        süresi dolmadıysa değişmez.
+
+        Returns:
+            bool: Kira bu süreçteyse True
+        """
+        if not _table_ready:
+            create_scheduler_leases_table()
+
+        row = execute_query(f"""
+        INSERT INTO {SCHEDULER_LEASES_TABLE} AS lease (lease_name, holder, acquired_at, expires_at)
+        VALUES (%(name)s, %(holder)s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP + make_interval(secs => %(ttl)s))
+        ON CONFLICT (lease_name) DO UPDATE SET
+            holder = EXCLUDED.holder,
+            acquired_at = CASE WHEN lease.holder = EXCLUDED.holder THEN lease.acquired_at ELSE EXCLUDED.acquired_at END,
+            expires_at = EXCLUDED.expires_at
+        WHERE lease.holder = EXCLUDED.holder OR lease.expires_at < CURRENT_TIMESTAMP
+        RETURNING holder
+        """, {'name': SCHEDULER_LEASE_NAME, 'holder': self.holder, 'ttl': self.lease_ttl},
+            fetch_all=False, commit=True)
+        return row is not None
+
+    def _acquire_leadership(self):
+        """Liderlik kirasını almayı dener."""
+        try:
+            claimed = self._claim_lease()
+        except Exception as e:
+            logging.warning(f"Zamanlayıcı liderlik kirası alınamadı: {e}")
+            return False
+
+        if not claimed:
+            return False
+
+        self._is_leader = True
+        self._leader_since = _utc_now()
+        # Yeni lider ilk turda tüm işleri çalıştırır
+        self._last_run.clear()
+        logging.info(f"Rapor zamanlayıcısı bu süreçte lider olarak çalışıyor (pid {os.getpid()})")
+        return True
+
+    def _check_leadership(self):
+        """Kirayı yeniler; yenilenemezse (süresi dolup başka worker aldıysa) liderlik bırakılır."""
+        try:
+            claimed = self._claim_lease()
+        except Exception as e:
+            logging.warning(f"Zamanlayıcı liderlik kirası yenilenemedi, liderlik bırakılıyor: {e}")
+            claimed = False
+
+        if not claimed:
+            self._is_leader = False
+            self._leader_since = None
+        return claimed
+
+    def _release_leadership(self):
+        was_leader, self._is_leader = self._is_leader, False
+        self._leader_since = None
+        if was_leader:
+            try:
+                # Kira silinir, böylece diğer worker'lar süre dolmasını beklemeden devralır
+                execute_query(
+                    f"DELETE FROM {SCHEDULER_LEASES_TABLE} WHERE lease_name = %s AND holder = %s",
+                    (SCHEDULER_LEASE_NAME, self.holder), commit=True
+                )
+            except Exception:
+                pass
+
+    def _warm_report(self, report_name, params, output_format, table_name):
+        report = report_registry.get(report_name)
+        if report is None:
+            return {'status': 'missing'}
+        # Rapor ekranının gönderdiği varsayılan parametrelerle aynı önbellek anahtarı oluşur
+        params = {**report['default_parameters'], **params}
+        with track_report_run(report_name, table_name, SCHEDULE_MODE) as run:
+            results, _ = execute_report(
+                report_name, report['sql'], params, table_name, refresh=True, run=run,
+                columnar=output_format == COLUMNAR_FORMAT, publish=True
+            )
+        return {'status': 'refreshed', 'rows': count_rows(results)}
+
+    def _warm_summary(self, table_name):
+        watermark = get_table_watermark(table_name)
+        get_system_summary(table_name, watermark, refresh=True, publish=True)
+        return {'status': 'refreshed' if watermark is not None else 'bypass'}
+
+    def _maintain_audit_log(self):
+        result = maintain_audit_log_partitions()
+        return {'status': 'maintained', **result}
+
+    def _tasks(self):
+        """
+        Tüm işleri (ad, aralık, çağrılacak fonksiyon) olarak döndürür. Rapor listesi her
+        turda kayıt defterinden okunur; schedule değişiklikleri yeniden başlatma gerektirmez.
+        """
+        table_name = os.environ.get('CUSTOMER_TABLE', 'customer_denizmuzesi')
+        tasks = []
+
+        # Özetler önce güncellenir, böylece ardından çalışan raporlar güncel veriyi okur
+        if REPORT_SCHEDULER_ROLLUP_INTERVAL > 0:
+            for rollup_name in ROLLUPS:
+                tasks.append((
+                    f"rollup:{rollup_name}", REPORT_SCHEDULER_ROLLUP_INTERVAL,
+                    partial(refresh_rollup, rollup_name, table_name)
+                ))
+
+        if REPORT_SCHEDULER_SUMMARY_INTERVAL > 0:
+            tasks.append(("summary", REPORT_SCHEDULER_SUMMARY_INTERVAL, partial(self._warm_summary, table_name)))
+
+        # Gelecek ayların bölümleri oluşturulur, saklama süresi dolanlar silinir
+        if AUDIT_LOG_MAINTENANCE_INTERVAL > 0:
+            tasks.append(("audit_log:partitions", AUDIT_LOG_MAINTENANCE_INTERVAL, self._maintain_audit_log))
+
+        # Saklama süresi dolan rapor çalıştırma metrikleri silinir
+        if REPORT_METRICS_CLEANUP_INTERVAL > 0:
+            tasks.append(("report_runs:cleanup", REPORT_METRICS_CLEANUP_INTERVAL, cleanup_report_runs))
+
+        for report in report_registry.list_reports():
+            report_name = report['report_name']
+            schedule = get_report_schedule(report_name)
+            if not schedule:
+                continue
+            for output_format in schedule['formats']:
+                tasks.append((
+                    f"report:{report_name}:{output_format}", schedule['interval'],
+                    partial(self._warm_report, report_name, schedule['params'], output_format, table_name)
+                ))
+        return tasks
+
+    def run_pending(self):
+        """
+        Aralığı dolan işleri sırayla çalıştırır. Hata alan iş loglanır ve bir sonraki
+        aralıkta yeniden denenir; diğer işler etkilenmez.
+
+        Returns:
+            int: Çalıştırılan iş sayısı
+        """
+        executed = 0
+        for name, interval, task in self._tasks():
+            if self._stop_event.is_set() or not self.is_leader:
+                break
+            last = self._last_run.get(name)
+            if last is not None and time.monotonic() - last < interval:
+                continue
+            # Uzun süren işler arasında kiranın dolmaması için her işten önce yenilenir
+            if not self._check_leadership():
+                break
+
+            self._last_run[name] = time.monotonic()
+            start = time.monotonic()
+            error = None
+            result = None
+            try:
+                result = task()
+            except Exception as e:
+                logging.error(f"Zamanlanmış iş başarısız ({name}): {e}")
+                logging.error(traceback.format_exc())
+                error = str(e)
+            duration = round((time.monotonic() - start) * 1000, 2)
+            executed += 1
+
+            with self._stats_lock:
+                stats = self._task_stats.setdefault(name, {'runs': 0, 'errors': 0})
+                stats['runs'] += 1
+                stats['errors'] += 1 if error else 0
+                stats.update({
+                    'interval': interval,
+                    'last_run': _utc_now(),
+                    'duration_ms': duration,
+                    'status': (result or {}).get('status') if error is None else 'error',
+                    'error': error
+                })
+            logging.debug(f"Zamanlanmış iş tamamlandı: {name} ({duration} ms)")
+        return executed
+
+    def _loop(self):
+        while True:
+            if not self.is_leader:
+                self._acquire_leadership()
+            elif not self._check_leadership():
+                continue
+
+            if self.is_leader:
+                try:
+                    self.run_pending()
+                except Exception as e:
+                    logging.error(f"Rapor zamanlayıcısı hatası: {e}")
+                    logging.error(traceback.format_exc())
+
+            if self._stop_event.wait(self.tick if self.is_leader else self.leader_retry):
+                break
+        self._release_leadership()
+
+    def start(self):
+        """Zamanlayıcı thread'ini başlatır (süreç başına bir kez)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name='report-scheduler', daemon=True)
+        self._thread.start()
+        logging.info(f"Rapor zamanlayıcısı başlatıldı ({self.tick} sn aralıkla)")
+
+    def stop(self):
+        """Zamanlayıcıyı durdurur; lider ise kira bırakılır."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.tick + 5)
+
+    def stats(self):
+        """Bu süreçteki zamanlayıcının durumunu ve iş metriklerini döndürür."""
+        with self._stats_lock:
+            return {
+                'running': bool(self._thread and self._thread.is_alive()),
+                'leader': self.is_leader,
+                'leader_since': self._leader_since,
+                'pid': os.getpid(),
+                'holder': self.holder,
+                'tasks': {name: dict(stats) for name, stats in self._task_stats.items()}
+            }
+
+# Süreç genelindeki rapor zamanlayıcısı
+report_scheduler = ReportScheduler()
@@ -0,0 +1,264 @@
+import os
+import re
+import sys
+import time
+import logging
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+from utils.db import get_db_connection
+from config import SCHEMA_CACHE_TTL
+
+# is_setup_done()'ın eski sorgusundaki LIKE 'knowhy_%config' deseninin karşılığı
+CONFIG_TABLE_PATTERN = re.compile(r'knowhy.+config')
+
+def _split_table_name(table_name):
+    """'şema.tablo' veya 'tablo' biçimindeki adı (şema, tablo) çiftine ayırır."""
+    parts = table_name.split('.')
+    return (parts[0], parts[1]) if len(parts) == 2 else ('public', parts[0])
+
+class SchemaCache:
+    """
+    Kurulum durumu ve şema bilgileri için bellek içi önbellek.
+
+    - public şemasındaki tablo listesi tek bir katalog sorgusuyla yüklenir;
+      tablo varlık kontrolleri bu listeden yanıtlanır
+    - Kurulum durumu yalnızca tamamlanmışsa saklanır; kurulum öncesinde her
+      çağrı veritabanına bakar, böylece başka bir worker'da yapılan kurulum
+      hemen görülür
+    - Tablo şemaları (kolonlar, tipler, indeksler) tablo başına saklanır
+    - Listede bulunmayan tablo sorulduğunda liste yeniden yüklenir; yeni
+      oluşturulan tablolar TTL beklenmeden görülür
+    - Kurulum, sıfırlama ve tablo adı değişikliklerinde invalidate()/refresh()
+      çağrılır; TTL yalnızca diğer süreçlerdeki değişiklikler için üst sınırdır
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._setup_done_at = None
+        self._tables = None
+        self._tables_loaded_at = None
+        self._schemas = {}
+        self._type_names = {}
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'catalog_queries': 0,
+            'invalidations': 0
+        }
+
+    def _is_fresh(self, loaded_at):
+        return loaded_at is not None and time.monotonic() - loaded_at < self.ttl
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    def _load_tables(self, cursor):
+        """public şemasındaki tablo adlarını yükler ve önbelleğe yazar."""
+        cursor.execute("SELECT tablename FROM pg_catalog.pg_tables WHERE schemaname = 'public'")
+        tables = frozenset(row['tablename'] for row in cursor.fetchall())
+        with self._lock:
+            self._tables = tables
+            self._tables_loaded_at = time.monotonic()
+            self._stats['catalog_queries'] += 1
+        return tables
+
+    def get_tables(self, reload=False):
+        """
+        public şemasındaki tablo adlarını döndürür.
+
+        Args:
+            reload (bool): Önbellekteki listeyi yok sayıp yeniden yükle
+
+        Returns:
+            frozenset: Tablo adları
+        """
+        with self._lock:
+            if not reload and self._is_fresh(self._tables_loaded_at):
+                return self._tables
+
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                return self._load_tables(cursor)
+
+    def table_exists(self, table_name):
+        """
+        Tablonun public şemasında var olup olmadığını döndürür. Listede olmayan
+        tablo için liste bir kez yeniden yüklenir.
+        """
+        if table_name in self.get_tables():
+            self._count('hits')
+            return True
+
+        self._count('misses')
+        return table_name in self.get_tables(reload=True)
+
+    def is_setup_done(self):
+        """
+        Herhangi bir knowhy_*config tablosunda IS_SETUP_DONE = 'TRUE' kaydı olup
+        olmadığını döndürür. Tüm config tabloları tek sorguda kontrol edilir.
+        """
+        with self._lock:
+            if self._is_fresh(self._setup_done_at):
+                self._stats['hits'] += 1
+                return True
+            self._stats['misses'] += 1
+
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                tables = self._load_tables(cursor)
+                config_tables = sorted(t for t in tables if CONFIG_TABLE_PATTERN.fullmatch(t))
+                if not config_tables:
+                    logging.info("Kurulum kontrolü: Hiçbir config tablosu bulunamadı")
+                    return False
+
+                logging.debug(f"Bulunan config tabloları: {config_tables}")
+                checks = sql.SQL(' OR ').join(
+                    sql.SQL(
+                        "EXISTS (SELECT 1 FROM {} WHERE config_key = 'IS_SETUP_DONE' AND config_value = 'TRUE')"
+                    ).format(sql.Identifier(table))
+                    for table in config_tables
+                )
+                cursor.execute(sql.SQL("SELECT {} AS setup_done").format(checks))
+                setup_done = bool(cursor.fetchone()['setup_done'])
+                self._count('catalog_queries')
+
+        if setup_done:
+            with self._lock:
+                self._setup_done_at = time.monotonic()
+        return setup_done
+
+    def get_table_schema(self, table_name):
+        """
+        Tablonun kolonlarını, tiplerini ve indekslerini döndürür.
+
+        Args:
+            table_name (str): Tablo adı ('şema.tablo' biçiminde de verilebilir)
+
+        Returns:
+            dict: {'columns': [{'name', 'type', 'nullable'}], 'indexes': [{'indexname', 'indexdef'}]}
+                veya tablo yoksa None
+        """
+        with self._lock:
+            entry = self._schemas.get(table_name)
+            if entry and self._is_fresh(entry['loaded_at']):
+                self._stats['hits'] += 1
+                return entry['schema']
+            self._stats['misses'] += 1
+
+        schema, table = _split_table_name(table_name)
+        with get_db_connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                SELECT a.attname AS name,
+                       format_type(a.atttypid, a.atttypmod) AS type,
+                       NOT a.attnotnull AS nullable
+                FROM pg_catalog.pg_attribute a
+                JOIN pg_catalog.pg_class c ON c.oid = a.attrelid
+                JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s AND c.relname = %s
+                  AND a.attnum > 0 AND NOT a.attisdropped
+                ORDER BY a.attnum
+                """, (schema, table))
+                columns = [dict(row) for row in cursor.fetchall()]
+
+                indexes = []
+                if columns:
+                    cursor.execute("""
+                    SELECT indexname, indexdef
+                    FROM pg_indexes
+                    WHERE schemaname = %s AND tablename = %s
+                    ORDER BY indexname
+                    """, (schema, table))
+                    indexes = [dict(row) for row in cursor.fetchall()]
+
+        table_schema = {'columns': columns, 'indexes': indexes} if columns else None
+        with self._lock:
+            self._stats['catalog_queries'] += 1
+            if table_schema is None:
+                self._schemas.pop(table_name, None)
+            else:
+                self._schemas[table_name] = {'schema': table_schema, 'loaded_at': time.monotonic()}
+        return table_schema
+
+    def get_type_names(self, type_oids):
+        """
+        cursor.description'daki tip OID'lerini PostgreSQL tip adlarına çevirir
+        (ör. 23 -> 'integer'). Bilinmeyen OID'ler tek sorguda yüklenir; tip adları
+        değişmediği için TTL ve invalidate() ile silinmez.
+
+        Args:
+            type_oids (list): Tip OID'leri
+
+        Returns:
+            list: Tip adları (aynı sırayla)
+        """
+        with self._lock:
+            missing = sorted({oid for oid in type_oids if oid not in self._type_names})
+
+        if missing:
+            with get_db_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT oid::int, format_type(oid, NULL) FROM pg_catalog.pg_type WHERE oid = ANY(%s::oid[])",
+                        (missing,)
+                    )
+                    rows = cursor.fetchall()
+            with self._lock:
+                self._stats['catalog_queries'] += 1
+                self._type_names.update(rows)
+
+        with self._lock:
+            return [self._type_names.get(oid, 'unknown') for oid in type_oids]
+
+    def invalidate(self, table_name=None):
+        """
+        Önbelleği geçersiz kılar. table_name verilirse yalnızca o tablonun şeması
+        ve tablo listesi, verilmezse kurulum durumu dahil her şey silinir.
+        """
+        with self._lock:
+            self._stats['invalidations'] += 1
+            self._tables = None
+            self._tables_loaded_at = None
+            if table_name is None:
+                self._setup_done_at = None
+                self._schemas.clear()
+            else:
+                self._schemas.pop(table_name, None)
+
+    def refresh(self, table_name=None):
+        """
+        Önbelleği temizleyip kurulum durumunu, tablo listesini ve (verilirse)
+        tablonun şemasını yeniden yükler.
+        """
+        self.invalidate()
+        setup_done = self.is_setup_done()
+        if table_name:
+            self.get_table_schema(table_name)
+        logging.info(f"Şema önbelleği yenilendi (kurulum: {setup_done}, tablo: {table_name or '-'})")
+
+    def stats(self):
+        """Önbellek metriklerini ve saklanan şemaların özetini döndürür."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                **self._stats,
+                'ttl': self.ttl,
+                'setup_done_cached': self._is_fresh(self._setup_done_at),
+                'table_count': len(self._tables) if self._tables is not None else None,
+                'tables_age_seconds': round(now - self._tables_loaded_at, 1) if self._tables_loaded_at else None,
+                'schemas': {
+                    name: {
+                        'columns': len(entry['schema']['columns']),
+                        'indexes': len(entry['schema']['indexes']),
+                        'age_seconds': round(now - entry['loaded_at'], 1)
+                    }
+                    for name, entry in self._schemas.items()
+                }
+            }
+
+# Süreç genelindeki şema önbelleği
+schema_cache = SchemaCache(SCHEMA_CACHE_TTL)
@@ -2,10 +2,24 @@ import os
 import re
 import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
 import sys
+from psycopg2 import sql
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import SQL_SCRIPTS_FOLDER, SYSTEM_TABLE_PREFIX
 
+def normalize_report_name(report_name):
+    """
+    Rapor adındaki Türkçe karakterleri SQL dosya adlarında kullanılan karşılıklarıyla değiştirir.
+    
+    Args:
+        report_name (str): Rapor adı
+        
+    Returns:
+        str: Normalize edilmiş rapor adı
+    """
+    return report_name.replace('İ', 'I').replace('ı', 'i').replace('ğ', 'g').replace('ü', 'u').replace('ş', 's').replace('ç', 'c').replace('ö', 'o')
+
 def get_sql_file_path(report_name):
     """
     Rapor adına göre SQL dosya yolunu döndürür.
@@ -76,46 +90,266 @@ def extract_parameters(sql_query):
     # {PARAMETER} şeklindeki parametreleri bul
     param_matches = re.findall(r'\{([A-Z_]+)\}', sql_query)
     
+    # Sistem tablosu yer tutucuları ve admin tanımlı SQL ifadeleri kullanıcıdan istenmez
+    param_matches = [
+        param for param in param_matches
+        if param not in SYSTEM_TABLE_PARAMETERS and param not in SQL_FRAGMENT_PARAMETERS
+    ]
+    
     # Tekrar eden parametreleri çıkar ve sırala
     return sorted(list(set(param_matches)))
 
-def replace_placeholders(sql_query, params, default_table_name=None):
+# Tanımlayıcı olarak (tablo/kolon adı) bağlanan parametreler
+IDENTIFIER_PARAMETERS = ('TABLE_NAME',)
+
+# Admin tarafından config tablosuna kaydedilen SQL ifadeleri; bind parametresi olamayacakları
+# için metin olarak eklenir. İstek parametresi olarak kabul edilmezler (check_request_parameters)
+SQL_FRAGMENT_PARAMETERS = ('TOPIC_CASE_EXPRESSION', 'CONTEXT_FILTER')
+
+# Virgülle ayrılmış liste olarak alınıp text[] bind parametresi olarak gönderilen parametreler
+ARRAY_PARAMETERS = ('EXCLUDED_WORDS',)
+
+class ReportParameterError(ValueError):
+    """Rapor isteğinde kabul edilmeyen bir parametre var."""
+    pass
+
+def check_request_parameters(params):
     """
-    SQL sorgusundaki yer tutucuları gerçek değerlerle değiştirir.
+    İstekten gelen parametrelerde yalnızca admin tarafından tanımlanabilen SQL ifadeleri
+    olmadığını doğrular.
     
     Args:
-        sql_query (str): SQL sorgusu
-        params (dict): Parametre adı-değer çiftleri
-        default_table_name (str, optional): Eğer TABLE_NAME parametresi bulunamazsa kullanılacak tablo adı
+        params (dict): İstek parametreleri
+        
+    Raises:
+        ReportParameterError: SQL ifadesi parametrelerinden biri istekte verilmişse
+    """
+    forbidden = sorted(name for name in SQL_FRAGMENT_PARAMETERS if name in (params or {}))
+    if forbidden:
+        raise ReportParameterError(
+            f"{', '.join(forbidden)} parametresi istekle verilemez; admin ayarlarından tanımlanmalıdır"
+        )
+
+def parse_list_parameter(value):
+    """
+    Liste parametresini Python listesine çevirir. "'ve', 'veya'" ya da "ve, veya" biçimindeki
+    metinler ve hazır listeler kabul edilir; boş öğeler atılır.
+    
+    Args:
+        value (str | list): Parametre değeri
         
     Returns:
-        str: Parametrelerle değiştirilmiş SQL sorgusu
+        list: Metin listesi
+    """
+    if value is None:
+        return []
+    items = value if isinstance(value, (list, tuple)) else str(value).split(',')
+    parsed = []
+    for item in items:
+        item = str(item).strip()
+        if len(item) >= 2 and item[0] == item[-1] and item[0] in ('"', "'"):
+            item = item[1:-1].strip()
+        if item:
+            parsed.append(item)
+    return parsed
+
+def load_sql_fragment(param_name):
     """
-    result = sql_query
-    
-    # Önce TABLE_NAME parametresini kontrol et ve işle
-    if 'TABLE_NAME' in result and 'TABLE_NAME' not in params and default_table_name:
-        result = result.replace('{TABLE_NAME}', default_table_name)
-    # table_name parametresi varsa ve TABLE_NAME yoksa
-    elif 'table_name' in params and 'TABLE_NAME' not in params:
-        result = result.replace('{TABLE_NAME}', params['table_name'])
-    
-    # Diğer tüm parametreleri işle
-    for key, value in params.items():
-        # Güvenlik: Tehlikeli karakterleri temizle
-        if isinstance(value, str):
-            # SQL injection önleme için özel karakterleri escape et
-            value = value.replace("'", "''")
+    Admin tarafından config tablosuna kaydedilmiş SQL ifadesini okur; kayıt yoksa
+    varsayılan değeri döndürür.
+    
+    Args:
+        param_name (str): SQL_FRAGMENT_PARAMETERS içindeki parametre adı
         
-        # {KEY} placeholder'ını değerle değiştir
-        result = result.replace(f"{{{key}}}", str(value))
+    Returns:
+        str: SQL ifadesi
+    """
+    from utils.db import execute_query
+    
+    config_table = f"{SYSTEM_TABLE_PREFIX}config"
+    row = None
+    if execute_query("SELECT to_regclass(%s) IS NOT NULL AS exists", (config_table,), fetch_all=False)['exists']:
+        row = execute_query(
+            f"SELECT config_value FROM {config_table} WHERE config_key = %s", (param_name,), fetch_all=False
+        )
+    if row and row['config_value']:
+        return row['config_value']
+    return get_default_parameter_value(param_name)
+
+# Sistemin oluşturduğu özet tabloları; şablonda {ROLLUP_HOURLY_TABLE} şeklinde yazılır ve
+# SYSTEM_TABLE_PREFIX ile başlayan tablo adına çevrilir
+SYSTEM_TABLE_PARAMETERS = {
+    'ROLLUP_HOURLY_TABLE': 'rollup_hourly',
+    'SESSIONS_TABLE': 'sessions',
+    'QA_PAIRS_TABLE': 'qa_pairs',
+    'WORD_COUNTS_TABLE': 'word_counts',
+    'MESSAGE_TOPICS_TABLE': 'message_topics',
+}
+
+_PLACEHOLDER_PATTERN = re.compile(r'\{+([A-Z_]+)\}+')
+
+@lru_cache(maxsize=256)
+def compile_template(sql_query):
+    """
+    SQL şablonunu bir kez ayrıştırıp parçalarına ayırır. Yorum satırları atılır,
+    yer tutucular türlerine göre işaretlenir.
+    
+    Parça türleri:
+        ('sql', metin)            - Değişmeyen SQL metni
+        ('identifier', ad)        - psycopg2.sql.Identifier ile bağlanacak tablo adı
+        ('system_table', ad)      - SYSTEM_TABLE_PREFIX ile başlayan sistem tablosu adı
+        ('fragment', ad)          - Config tablosundan okunup metin olarak eklenecek SQL ifadesi
+        ('value', ad)             - Bind parametresi olarak gönderilecek değer ('{X}' veya {X})
+        ('literal', şablon)       - İçinde yer tutucu geçen string sabiti; tamamı tek değer olarak bağlanır
+    
+    Args:
+        sql_query (str): {PARAMETRE} yer tutuculu SQL şablonu
+        
+    Returns:
+        tuple: Şablon parçaları
+    """
+    parts = []
+    buffer = []
+    
+    def flush():
+        if buffer:
+            parts.append(('sql', ''.join(buffer)))
+            buffer.clear()
+    
+    i = 0
+    length = len(sql_query)
+    while i < length:
+        char = sql_query[i]
+        
+        # Satır yorumu: satır sonuna kadar atla
+        if sql_query.startswith('--', i):
+            end = sql_query.find('\n', i)
+            i = length if end == -1 else end
+            continue
+        
+        # String sabiti
+        if char == "'":
+            end = i + 1
+            while end < length:
+                if sql_query[end] == "'":
+                    if sql_query.startswith("''", end):
+                        end += 2
+                        continue
+                    break
+                end += 1
+            literal = sql_query[i:end + 1]
+            inner = literal[1:-1]
+            
+            whole = _PLACEHOLDER_PATTERN.fullmatch(inner)
+            if whole and whole.group(1) not in IDENTIFIER_PARAMETERS + SQL_FRAGMENT_PARAMETERS + tuple(SYSTEM_TABLE_PARAMETERS):
+                flush()
+                parts.append(('value', whole.group(1)))
+            elif _PLACEHOLDER_PATTERN.search(inner):
+                flush()
+                parts.append(('literal', inner.replace("''", "'")))
+            else:
+                buffer.append(literal)
+            i = end + 1
+            continue
+        
+        # Yer tutucu
+        if char == '{':
+            match = _PLACEHOLDER_PATTERN.match(sql_query, i)
+            if match:
+                name = match.group(1)
+                flush()
+                if name in IDENTIFIER_PARAMETERS:
+                    parts.append(('identifier', name))
+                elif name in SYSTEM_TABLE_PARAMETERS:
+                    parts.append(('system_table', name))
+                elif name in SQL_FRAGMENT_PARAMETERS:
+                    parts.append(('fragment', name))
+                else:
+                    parts.append(('value', name))
+                i = match.end()
+                continue
+        
+        buffer.append(char)
+        i += 1
+    
+    flush()
+    return tuple(parts)
+
+def get_system_tables(sql_query):
+    """
+    Şablonun okuduğu sistem tablolarının yer tutucu adlarını döndürür
+    (örn. {'ROLLUP_HOURLY_TABLE'}).
+    """
+    return {content for kind, content in compile_template(sql_query) if kind == 'system_table'}
+
+def build_report_query(sql_query, params, default_table_name=None):
+    """
+    SQL şablonunu çalıştırılabilir sorguya dönüştürür. Değerler SQL metnine
+    eklenmez, bind parametresi olarak ayrı döndürülür; böylece aynı rapor farklı
+    tarih/ID değerleriyle çalıştırıldığında sorgu metni değişmez ve sunucu tarafında
+    hazırlanmış ifade (prepared statement) tekrar kullanılabilir.
+    
+    Args:
+        sql_query (str): SQL şablonu
+        params (dict): Parametre adı-değer çiftleri
+        default_table_name (str, optional): TABLE_NAME parametresi verilmezse kullanılacak tablo adı
+        
+    Returns:
+        tuple: (psycopg2.sql.Composed sorgu, bind parametreleri sözlüğü)
+    """
+    params = params or {}
+    table_name = params.get('TABLE_NAME') or params.get('table_name') or default_table_name
+    
+    pieces = []
+    values = {}
+    missing = set()
+    
+    for kind, content in compile_template(sql_query):
+        if kind == 'sql':
+            pieces.append(content)
+        elif kind == 'identifier':
+            if not table_name:
+                raise ValueError(f"{content} parametresi için değer verilmedi")
+            pieces.append(sql.Identifier(*str(table_name).split('.')))
+        elif kind == 'system_table':
+            pieces.append(sql.SQL(f"{SYSTEM_TABLE_PREFIX}{SYSTEM_TABLE_PARAMETERS[content]}"))
+        elif kind == 'fragment':
+            # İstekten gelen değer kullanılmaz; ifade yalnızca admin ayarlarından okunur
+            pieces.append(load_sql_fragment(content))
+        elif kind == 'value':
+            if content not in params:
+                missing.add(content)
+            if content in ARRAY_PARAMETERS:
+                values[content] = parse_list_parameter(params.get(content))
+            else:
+                values[content] = params.get(content)
+            pieces.append(sql.Placeholder(content))
+        else:
+            # Yer tutucu içeren string sabiti tek bir değer olarak bağlanır
+            key = f"_literal_{len(values)}"
+            
+            def substitute(match):
+                # Özet tablolarındaki source_table = '{TABLE_NAME}' gibi karşılaştırmalar
+                if match.group(1) in IDENTIFIER_PARAMETERS and table_name:
+                    return str(table_name)
+                if match.group(1) not in params:
+                    missing.add(match.group(1))
+                return str(params.get(match.group(1), ''))
+            
+            values[key] = _PLACEHOLDER_PATTERN.sub(substitute, content)
+            pieces.append(sql.Placeholder(key))
     
     # Eksik parametreler için uyarı log'u
-    missing_params = extract_parameters(result)
-    if missing_params:
-        logging.warning(f"Değiştirilmemiş parametreler mevcut: {', '.join(missing_params)}")
+    if missing:
+        logging.warning(f"Değer verilmemiş parametreler mevcut: {', '.join(sorted(missing))}")
     
-    return result
+    # Sorgu her zaman parametre sözlüğüyle çalıştırıldığından metindeki % karakterleri
+    # kaçırılmalı (örn. LIKE '%saat%')
+    composed = [
+        sql.SQL(piece.replace('%', '%%')) if isinstance(piece, str) else piece
+        for piece in pieces
+    ]
+    return sql.Composed(composed), values
 
 def get_default_parameter_value(param_name):
     """
@@ -150,7 +384,7 @@ def get_default_parameter_value(param_name):
         return '24'
     # İçerik parametreleri
     elif param_name == 'EXCLUDED_WORDS':
-        return "'ve', 'veya', 'için', 'bir', 'ile', 'bu', 'de', 'da'"
+        return 've, veya, için, bir, ile, bu, de, da'
     elif param_name == 'MIN_WORD_LENGTH':
         return '3'
     elif param_name == 'MIN_WORD_COUNT':
@@ -208,11 +442,11 @@ def execute_sql_from_file(report_name, params=None):
         if param not in params:
             params[param] = get_default_parameter_value(param)
     
-    # Parametreleri değiştir
-    sql_with_params = replace_placeholders(sql_query, params)
+    # Şablonu bind parametreli sorguya dönüştür
+    query, values = build_report_query(sql_query, params)
     
     # Sorguyu çalıştır
-    return execute_query(sql_with_params)
+    return execute_query(query, values, prepare=True)
 
 def convert_md_to_sql_files():
     """
@@ -233,7 +467,7 @@ def convert_md_to_sql_files():
             # SQL dosya adını oluştur (.md -> .sql)
             sql_filename = filename[:-3] + '.sql'
             # Türkçe karakterleri düzelt
-            sql_filename = sql_filename.replace('İ', 'I').replace('ı', 'i').replace('ğ', 'g').replace('ü', 'u').replace('ş', 's').replace('ç', 'c').replace('ö', 'o')
+            sql_filename = normalize_report_name(sql_filename)
             sql_file_path = os.path.join(sql_files_dir, sql_filename)
             
             # MD dosyasını oku
@@ -0,0 +1,85 @@
+import os
+import sys
+import logging
+import traceback
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import LOG_FOLDER, SQL_SCRIPTS_FOLDER
+
+def configure_logging():
+    """
+    Ana logger'ı dosya (logs/app.log) ve konsol handler'larıyla yapılandırır.
+    Aynı süreçte birden fazla çağrılırsa handler'lar tekrar eklenmez.
+    """
+    logger = logging.getLogger()
+    if getattr(logger, '_knowhy_configured', False):
+        return logger
+
+    os.makedirs(LOG_FOLDER, exist_ok=True)
+    log_file = os.path.join(LOG_FOLDER, 'app.log')
+    logger.setLevel(logging.DEBUG)
+
+    # Dosya ve konsol handler'ları
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setLevel(logging.DEBUG)
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.DEBUG)
+
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    file_handler.setFormatter(formatter)
+    console_handler.setFormatter(formatter)
+
+    logger.addHandler(file_handler)
+    logger.addHandler(console_handler)
+    logger._knowhy_configured = True
+    return logger
+
+def run_startup_tasks():
+    """
+    Uygulama açılışında bir kez çalışması gereken işleri yapar: MD formatındaki SQL
+    şablonlarını sql_files/ altına dönüştürür ve veritabanı migration'larını çalıştırır.
+
+    gunicorn altında gunicorn.conf.py'deki on_starting kancası bu modülü ayrı bir
+    süreç olarak bir kez çalıştırır; worker'lar yalnızca uygulamayı yükler. Geliştirme
+    sunucusunda (python app.py) app.py'nin __main__ bloğundan çağrılır.
+
+    Returns:
+        bool: Tüm işler hatasız tamamlandıysa True
+    """
+    from utils.sql_helper import convert_md_to_sql_files
+    from migrations.setup_db import run_migrations
+    from utils.db import close_pool
+
+    success = True
+
+    # SQL dosyalarının yolunu kontrol et
+    sql_files_dir = os.path.join(SQL_SCRIPTS_FOLDER, "sql_files")
+    if not os.path.exists(sql_files_dir):
+        os.makedirs(sql_files_dir, exist_ok=True)
+        logging.info("SQL dosyaları dizini oluşturuldu: %s", sql_files_dir)
+
+    # MD formatındaki SQL dosyalarını SQL formatına dönüştür
+    try:
+        convert_md_to_sql_files()
+        logging.info("SQL sorgularının dönüştürülmesi tamamlandı.")
+    except Exception as e:
+        success = False
+        logging.error("SQL sorgularının dönüştürülmesi sırasında hata: %s", str(e))
+        logging.error(traceback.format_exc())
+
+    # Veritabanı migration'larını çalıştır
+    try:
+        run_migrations()
+        logging.info("Veritabanı migrasyonları tamamlandı.")
+    except Exception as e:
+        success = False
+        logging.error("Veritabanı migrasyonları sırasında hata: %s", str(e))
+        logging.error(traceback.format_exc())
+    finally:
+        # Açılış işleri için açılan bağlantılar istek trafiğine taşınmaz
+        close_pool()
+
+    return success
+
+if __name__ == '__main__':
+    configure_logging()
+    sys.exit(0 if run_startup_tasks() else 1)
@@ -0,0 +1,145 @@
+import os
+import sys
+import logging
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db import execute_query
+from utils.rollups import ensure_hourly_rollup, ROLLUP_HOURLY_TABLE
+from utils.report_cache import report_cache, load_snapshot, save_snapshot
+from config import REPORT_SUMMARY_CACHE_TTL, REPORT_SCHEDULER_ENABLED
+
+# Gösterge paneli özetinin rapor sonuç önbelleğindeki adı
+SUMMARY_CACHE_NAME = '__summary__'
+
+def _build_summary_query(table_name, with_delta):
+    """
+    Tek sorgu, tek bağlantı:
+    - Toplam oturum, mesaj ve context sayıları saatlik özet tablosundan okunur;
+      her oturum ilk mesajının saatinde bir kez new_sessions olarak sayılır
+    - Son 24 saatteki aktif oturumlar ve haftalık aktivite, ham tablonun yalnızca
+      son 7 gününü tek geçişte FILTER ile sayar
+    - with_delta ise %(since)s anından sonra gelen mesajlar ayrıca özetlenir
+    """
+    weekly_columns = ",\n".join(
+        f"""            COUNT(DISTINCT session_id) FILTER (
+                WHERE created_date >= CURRENT_DATE - INTERVAL '7 days' AND EXTRACT(DOW FROM created_date) = {day}
+            ) as weekly_{day}"""
+        for day in range(7)
+    )
+
+    delta_cte = ""
+    if with_delta:
+        delta_cte = f"""
+        , delta AS (
+            SELECT
+                COUNT(*) as new_messages,
+                COUNT(DISTINCT session_id) as updated_sessions,
+                COUNT(*) FILTER (WHERE role = 'apiMessage' AND has_context = TRUE) as new_context_used
+            FROM {table_name}
+            WHERE created_date > %(since)s
+        )"""
+
+    return f"""
+        WITH totals AS (
+            SELECT
+                COALESCE(SUM(new_sessions), 0) as total_sessions,
+                COALESCE(SUM(message_count), 0) as total_messages,
+                COALESCE(SUM(ai_context_messages), 0) as context_used,
+                COALESCE(SUM(ai_messages - ai_context_messages), 0) as context_not_used,
+                COALESCE(ROUND(SUM(ai_context_messages) * 100.0 / NULLIF(SUM(ai_messages), 0), 2), 0) as context_usage_percentage
+            FROM {ROLLUP_HOURLY_TABLE}
+            WHERE source_table = %(table_name)s
+        ), recent AS (
+            SELECT
+                COUNT(DISTINCT session_id) FILTER (
+                    WHERE created_date >= CURRENT_TIMESTAMP - INTERVAL '24 hours'
+                ) as active_sessions,
+{weekly_columns}
+            FROM {table_name}
+            WHERE created_date >= LEAST(CURRENT_TIMESTAMP - INTERVAL '24 hours', CURRENT_DATE - INTERVAL '7 days')
+        ){delta_cte}
+        SELECT * FROM totals, recent{', delta' if with_delta else ''}
+        """
+
+def query_system_summary(table_name, since=None):
+    """
+    Sistem özetini veritabanından hesaplar (önbellek kullanılmaz).
+
+    Args:
+        table_name (str): Müşteri mesaj tablosu
+        since (datetime): Verilirse bu andan sonra gelen mesajların özeti de döner
+
+    Returns:
+        tuple: (özet, delta). since verilmediyse delta None'dır.
+    """
+    ensure_hourly_rollup(table_name)
+    result = execute_query(
+        _build_summary_query(table_name, since is not None),
+        {'table_name': table_name, 'since': since}, fetch_all=False
+    )
+
+    # Haftalık aktivite: 0=Pazar, 1=Pazartesi, ... 6=Cumartesi
+    weekly_activity = [result[f'weekly_{day}'] for day in range(7)]
+
+    summary = {
+        'total_sessions': result['total_sessions'],
+        'total_messages': result['total_messages'],
+        'context_usage': {
+            'used': result['context_used'],
+            'not_used': result['context_not_used'],
+            'percentage': float(result['context_usage_percentage'])
+        },
+        'active_sessions': result['active_sessions'],
+        'weekly_activity': weekly_activity
+    }
+
+    delta = None
+    if since is not None:
+        delta = {
+            'since': since.isoformat(),
+            'new_messages': result['new_messages'],
+            'updated_sessions': result['updated_sessions'],
+            'new_context_used': result['new_context_used']
+        }
+    return summary, delta
+
+def get_system_summary(table_name, watermark, refresh=False, publish=False):
+    """
+    Sistem özetini rapor sonuç önbelleği üzerinden döndürür.
+
+    Özet son 24 saat ve son 7 güne göre hesaplandığı için tablo değişmese de
+    eskir; kayıt filigranın yanında REPORT_SUMMARY_CACHE_TTL ile de sınırlanır.
+    Bellek içi önbellekte yoksa zamanlayıcının paylaşılan tabloya yazdığı özet kullanılır.
+
+    Args:
+        table_name (str): Müşteri mesaj tablosu
+        watermark (str): Tablonun veri filigranı (get_table_watermark); None ise önbellek
+            kullanılmaz
+        refresh (bool): Önbelleği yok sayıp özeti yeniden hesapla
+        publish (bool): Özeti diğer worker'lar için paylaşılan tabloya da yaz (zamanlayıcı)
+
+    Returns:
+        tuple: (özet, önbellek durumu: 'hit' | 'warm' | 'miss' | 'refresh' | 'bypass')
+    """
+    if watermark is None or REPORT_SUMMARY_CACHE_TTL <= 0:
+        summary, _ = query_system_summary(table_name)
+        return summary, 'bypass'
+
+    cache_key = report_cache.make_key(SUMMARY_CACHE_NAME, {}, table_name)
+    if not refresh:
+        cached = report_cache.get(cache_key, watermark)
+        if cached is not None:
+            return cached, 'hit'
+
+        if REPORT_SCHEDULER_ENABLED:
+            snapshot = load_snapshot(cache_key, watermark)
+            if snapshot is not None:
+                summary, remaining = snapshot
+                report_cache.put(cache_key, summary, min(remaining, REPORT_SUMMARY_CACHE_TTL), watermark)
+                return summary, 'warm'
+
+    summary, _ = query_system_summary(table_name)
+    report_cache.put(cache_key, summary, REPORT_SUMMARY_CACHE_TTL, watermark)
+    if publish:
+        save_snapshot(cache_key, summary, REPORT_SUMMARY_CACHE_TTL, watermark)
+    logging.debug(f"Sistem özeti hesaplandı: {table_name}")
+    return summary, 'refresh' if refresh else 'miss'
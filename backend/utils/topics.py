@@ -0,0 +1,325 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+import traceback
+from collections import deque
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor, execute_values
+from utils.db import execute_query
+from config import SYSTEM_TABLE_PREFIX, TOPIC_LABEL_BATCH_SIZE
+
+# Konu sözlüğünün config tablosundaki anahtarı
+TOPIC_DICTIONARY_KEY = 'TOPIC_DICTIONARY'
+
+# Admin bir sözlük kaydetmediyse kullanılan sözlük. 26 numaralı raporun eski CASE ifadesindeki
+# konularla aynıdır; böylece rapor aynı konu kümesini döndürür.
+DEFAULT_TOPIC_DICTIONARY = {
+    'default_topic': 'Diğer',
+    'topics': [
+        {'topic': 'Çalışma Saatleri', 'keywords': ['saat', 'açık', 'çalışma saatleri']},
+        {'topic': 'Bilet Fiyatları', 'keywords': ['fiyat', 'ücret']},
+        {'topic': 'Osmanlı Dönemi', 'keywords': ['osmanlı']},
+        {'topic': 'Atatürk', 'keywords': ['atatürk']},
+        {'topic': 'Deniz Araçları', 'keywords': ['gemi', 'tekne']},
+    ]
+}
+
+# Konu adları message_topics.topic kolonuna sığmalı
+MAX_TOPIC_LENGTH = 255
+
+class TopicDictionaryError(ValueError):
+    """Konu sözlüğü geçersiz."""
+    pass
+
+def normalize_text(text):
+    """
+    Metni Türkçe kurallarıyla küçük harfe çevirir (İ -> i, I -> ı). Anahtar kelimeler ve
+    mesajlar aynı şekilde normalize edildiğinden eşleşme büyük/küçük harften bağımsızdır.
+    """
+    return (text or '').replace('İ', 'i').replace('I', 'ı').lower()
+
+def parse_topic_dictionary(data):
+    """
+    Admin tarafından gönderilen konu sözlüğünü doğrular ve normalize eder.
+
+    Args:
+        data (dict): {"default_topic": "Diğer", "topics": [{"topic": "...", "keywords": ["..."]}, ...]}
+
+    Returns:
+        dict: Boş anahtar kelimeleri atılmış, küçük harfe çevrilmiş sözlük
+    """
+    if not isinstance(data, dict) or not isinstance(data.get('topics'), list):
+        raise TopicDictionaryError("Konu listesi (topics) eksik veya geçersiz")
+
+    default_topic = data.get('default_topic', DEFAULT_TOPIC_DICTIONARY['default_topic'])
+    if not isinstance(default_topic, str) or not default_topic.strip():
+        raise TopicDictionaryError("Varsayılan konu (default_topic) boş olamaz")
+
+    topics = []
+    seen = set()
+    for index, entry in enumerate(data['topics']):
+        if not isinstance(entry, dict) or not isinstance(entry.get('topic'), str) or not entry['topic'].strip():
+            raise TopicDictionaryError(f"{index}. konuda topic eksik")
+        topic = entry['topic'].strip()
+        if len(topic) > MAX_TOPIC_LENGTH:
+            raise TopicDictionaryError(f"'{topic[:50]}...' konu adı en fazla {MAX_TOPIC_LENGTH} karakter olabilir")
+        if topic in seen:
+            raise TopicDictionaryError(f"'{topic}' konusu birden fazla kez tanımlanmış")
+        keywords = entry.get('keywords')
+        if not isinstance(keywords, list) or not all(isinstance(keyword, str) for keyword in keywords):
+            raise TopicDictionaryError(f"'{topic}' konusunun anahtar kelimeleri (keywords) bir metin listesi olmalıdır")
+        keywords = list(dict.fromkeys(normalize_text(keyword).strip() for keyword in keywords if keyword.strip()))
+        if not keywords:
+            raise TopicDictionaryError(f"'{topic}' konusu için en az bir anahtar kelime gerekli")
+        seen.add(topic)
+        topics.append({'topic': topic, 'keywords': keywords})
+
+    return {'default_topic': default_topic.strip()[:MAX_TOPIC_LENGTH], 'topics': topics}
+
+def get_dictionary_version(dictionary):
+    """Sözlüğün içeriğinden türetilen kısa sürüm anahtarı."""
+    payload = json.dumps(dictionary, sort_keys=True, ensure_ascii=False)
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()[:16]
+
+class TopicMatcher:
+    """
+    Sözlükteki tüm anahtar kelimeleri metin üzerinde tek geçişte arayan Aho–Corasick
+    otomatı. Metin birden fazla konunun anahtar kelimesini içeriyorsa sözlükte önce
+    tanımlanan konu seçilir (eski CASE WHEN ... sırasıyla aynı).
+    """
+
+    def __init__(self, dictionary):
+        self.topics = [entry['topic'] for entry in dictionary['topics']]
+        self.default_topic = dictionary['default_topic']
+        self.version = get_dictionary_version(dictionary)
+
+        # Durum geçişleri, hata (failure) bağlantıları ve durumda biten en öncelikli konu
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [None]
+
+        for topic_index, entry in enumerate(dictionary['topics']):
+            for keyword in entry['keywords']:
+                self._add(keyword, topic_index)
+        self._build()
+
+    def _add(self, keyword, topic_index):
+        node = 0
+        for char in keyword:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(None)
+            node = child
+        if self._out[node] is None or topic_index < self._out[node]:
+            self._out[node] = topic_index
+
+    def _build(self):
+        # Hata bağlantıları genişlik öncelikli hesaplanır; bir durumun çıktısı, hata
+        # bağlantısının gösterdiği (daha kısa) sonekin çıktısıyla birleştirilir
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                inherited = self._out[self._fail[child]]
+                if inherited is not None and (self._out[child] is None or inherited < self._out[child]):
+                    self._out[child] = inherited
+
+    def match(self, text):
+        """
+        Metnin konusunu döndürür; hiçbir anahtar kelime geçmiyorsa varsayılan konu.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        best = None
+        for char in normalize_text(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            found = out[node]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+        return self.topics[best] if best is not None else self.default_topic
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+def load_topic_dictionary(cursor=None):
+    """
+    Kayıtlı konu sözlüğünü config tablosundan okur; kayıt yoksa varsayılan sözlüğü döndürür.
+
+    Args:
+        cursor: Açık bir transaction içinden okunacaksa kullanılacak cursor (RealDictCursor)
+    """
+    config_table = f"{SYSTEM_TABLE_PREFIX}config"
+    exists_query = "SELECT to_regclass(%s) IS NOT NULL AS exists"
+    query = f"SELECT config_value FROM {config_table} WHERE config_key = %s"
+
+    # Kurulum tamamlanmadıysa config tablosu yoktur; hata özet transaction'ını bozmamalı
+    row = None
+    if cursor is not None:
+        cursor.execute(exists_query, (config_table,))
+        if cursor.fetchone()['exists']:
+            cursor.execute(query, (TOPIC_DICTIONARY_KEY,))
+            row = cursor.fetchone()
+    elif execute_query(exists_query, (config_table,), fetch_all=False)['exists']:
+        row = execute_query(query, (TOPIC_DICTIONARY_KEY,), fetch_all=False)
+
+    if not row or not row['config_value']:
+        return parse_topic_dictionary(DEFAULT_TOPIC_DICTIONARY)
+    try:
+        return parse_topic_dictionary(json.loads(row['config_value']))
+    except (ValueError, TypeError) as e:
+        logging.error(f"Kayıtlı konu sözlüğü okunamadı, varsayılan sözlük kullanılıyor: {e}")
+        return parse_topic_dictionary(DEFAULT_TOPIC_DICTIONARY)
+
+def get_topic_matcher(dictionary):
+    """Sözlük için eşleştiriciyi döndürür; sözlük değişmediyse otomat yeniden kurulmaz."""
+    global _matcher
+    version = get_dictionary_version(dictionary)
+    with _matcher_lock:
+        if _matcher is None or _matcher.version != version:
+            _matcher = TopicMatcher(dictionary)
+        return _matcher
+
+_LABEL_SELECT_SQL = """
+SELECT id, session_id::text AS session_id, created_date, message_length, content
+FROM {source}
+WHERE role = 'userMessage'
+    AND created_date >= %(recompute_from)s AND created_date < %(recompute_to)s
+"""
+
+_LABEL_UPSERT_SQL = """
+INSERT INTO {rollup} (
+    source_table, message_row_id, session_id, created_date, message_length, topic, dictionary_version
+)
+VALUES %s
+ON CONFLICT (source_table, message_row_id) DO UPDATE SET
+    session_id = EXCLUDED.session_id,
+    created_date = EXCLUDED.created_date,
+    message_length = EXCLUDED.message_length,
+    topic = EXCLUDED.topic,
+    dictionary_version = EXCLUDED.dictionary_version
+"""
+
+def label_messages(cursor, source, rollup, params):
+    """
+    Özet güncellemesinin (refresh_rollup) aralığındaki kullanıcı mesajlarını konu
+    sözlüğüyle etiketleyip message_topics tablosuna yazar. Mesajlar sunucu tarafı cursor
+    ile TOPIC_LABEL_BATCH_SIZE'lık partiler halinde okunur.
+
+    Args:
+        cursor: refresh_rollup'ın transaction'ındaki cursor
+        source (sql.Identifier): Kaynak mesaj tablosu
+        rollup (sql.SQL): message_topics tablosu
+        params (dict): recompute_from, recompute_to ve source_table değerleri
+
+    Returns:
+        int: Etiketlenen mesaj sayısı
+    """
+    matcher = get_topic_matcher(load_topic_dictionary(cursor))
+    upsert = sql.SQL(_LABEL_UPSERT_SQL).format(rollup=rollup)
+    labeled = 0
+
+    with cursor.connection.cursor(name='topic_labeler', cursor_factory=RealDictCursor) as reader:
+        reader.itersize = TOPIC_LABEL_BATCH_SIZE
+        reader.execute(sql.SQL(_LABEL_SELECT_SQL).format(source=source), params)
+        while True:
+            rows = reader.fetchmany(TOPIC_LABEL_BATCH_SIZE)
+            if not rows:
+                break
+            execute_values(cursor, upsert, [
+                (
+                    params['source_table'], row['id'], row['session_id'], row['created_date'],
+                    row['message_length'], matcher.match(row['content']), matcher.version
+                )
+                for row in rows
+            ], page_size=1000)
+            labeled += len(rows)
+
+    return labeled
+
+def save_topic_dictionary(dictionary):
+    """
+    Konu sözlüğünü config tablosuna kaydeder ve tüm kaynak tablolar için message_topics
+    özetinin durumunu sıfırlar; özet bir sonraki güncellemede tüm mesajları yeni sözlükle
+    partiler halinde yeniden etiketler.
+
+    Returns:
+        str: Yeni sözlüğün sürüm anahtarı
+    """
+    from utils.rollups import ROLLUP_STATE_TABLE, create_rollup_tables
+
+    create_rollup_tables()
+    execute_query(f"""
+    INSERT INTO {SYSTEM_TABLE_PREFIX}config (config_key, config_value)
+    VALUES (%s, %s)
+    ON CONFLICT (config_key)
+    DO UPDATE SET config_value = EXCLUDED.config_value, updated_at = CURRENT_TIMESTAMP
+    """, (TOPIC_DICTIONARY_KEY, json.dumps(dictionary, ensure_ascii=False)), commit=True)
+    execute_query(
+        f"DELETE FROM {ROLLUP_STATE_TABLE} WHERE rollup_name = 'message_topics'", commit=True
+    )
+    return get_dictionary_version(dictionary)
+
+def relabel_topics(source_table, attempts=30, retry_interval=10):
+    """
+    Kaynak tablonun mesajlarını güncel sözlükle yeniden etiketler. Tablo o sırada başka
+    bir worker tarafından güncelleniyorsa (advisory lock) bir süre sonra tekrar denenir.
+    """
+    from utils.rollups import refresh_rollup
+
+    for _ in range(attempts):
+        result = refresh_rollup('message_topics', source_table)
+        if result['status'] != 'locked':
+            logging.info(f"Konu etiketleri yenilendi: {source_table}, sonuç: {result}")
+            return result
+        time.sleep(retry_interval)
+    logging.warning(f"Konu etiketleri yenilenemedi, tablo kilitli: {source_table}")
+    return {'status': 'locked'}
+
+def start_topic_relabel(source_table):
+    """Yeniden etiketlemeyi arka plan thread'inde başlatır."""
+    def run():
+        try:
+            relabel_topics(source_table)
+        except Exception as e:
+            logging.error(f"Konu etiketleme hatası ({source_table}): {e}")
+            logging.error(traceback.format_exc())
+
+    thread = threading.Thread(target=run, name='topic-relabel', daemon=True)
+    thread.start()
+    return thread
+
+def get_topic_label_status(version):
+    """
+    Kaynak tablo bazında etiketli mesaj sayısını ve bunların ne kadarının güncel
+    sözlükle etiketlendiğini döndürür (yeniden etiketleme ilerlemesi).
+    """
+    from utils.rollups import MESSAGE_TOPICS_TABLE, create_rollup_tables
+
+    create_rollup_tables()
+    return execute_query(f"""
+    SELECT
+        source_table,
+        COUNT(*) AS labeled_messages,
+        COUNT(*) FILTER (WHERE dictionary_version = %s) AS current_version_messages
+    FROM {MESSAGE_TOPICS_TABLE}
+    GROUP BY source_table
+    ORDER BY source_table
+    """, (version,))
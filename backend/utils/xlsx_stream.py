@@ -0,0 +1,150 @@
+import io
+import re
+import json
+import math
+import zipfile
+from xml.sax.saxutils import escape
+
+# Excel çalışma sayfası sınırları
+XLSX_MAX_ROWS = 1048576
+XLSX_MAX_CELL_CHARS = 32767
+
+# XML 1.0'da geçersiz kontrol karakterleri
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_END = '</sheetData></worksheet>'
+
+class _ChunkSink(io.RawIOBase):
+    """ZipFile'ın yazdığı baytları toplayan, geri sarılamayan (unseekable) hedef."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def _cell(value):
+    """Tek bir hücrenin XML'ini üretir."""
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)) and not (isinstance(value, float) and not math.isfinite(value)):
+        return f'<c><v>{value!r}</v></c>'
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False, default=str)
+    text = _INVALID_XML_CHARS.sub('', str(value))[:XLSX_MAX_CELL_CHARS]
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+class XlsxStreamWriter:
+    """
+    Tek sayfalık XLSX dosyasını satır satır, sabit bellekle üreten yazıcı.
+
+    Dosya geri sarılamayan bir zip akışı olarak oluşturulur (boyutlar data descriptor
+    ile yazılır); metinler paylaşılan string tablosu yerine satır içi (inlineStr)
+    yazılır. Böylece ne satırlar ne de string tablosu bellekte tutulur. Her write_rows()
+    çağrısından sonra drain() ile o ana kadar sıkıştırılmış baytlar alınır.
+
+    Kullanım:
+        writer = XlsxStreamWriter('Rapor')
+        writer.write_rows([kolonlar])
+        for rows in batches:
+            writer.write_rows(rows)
+            yield writer.drain()
+        yield writer.close()
+    """
+
+    def __init__(self, sheet_name='Rapor'):
+        sheet_name = _INVALID_SHEET_CHARS.sub('_', sheet_name or 'Rapor')[:31] or 'Rapor'
+        self.row_count = 0
+        self._sink = _ChunkSink()
+        self._zip = zipfile.ZipFile(self._sink, 'w', compression=zipfile.ZIP_DEFLATED)
+        self._zip.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        self._zip.writestr('_rels/.rels', _ROOT_RELS)
+        self._zip.writestr('xl/workbook.xml', _WORKBOOK.format(sheet_name=escape(sheet_name, {'"': '&quot;'})))
+        self._zip.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        self._sheet = self._zip.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True)
+        self._sheet.write(_SHEET_START.encode('utf-8'))
+
+    def write_rows(self, rows):
+        """
+        Satırları sayfaya ekler. Sayfa sınırına (XLSX_MAX_ROWS) ulaşıldıysa fazla
+        satırlar yazılmaz.
+
+        Returns:
+            int: Yazılan satır sayısı
+        """
+        rows = rows[:XLSX_MAX_ROWS - self.row_count]
+        if rows:
+            xml = ''.join('<row>' + ''.join(_cell(value) for value in row) + '</row>' for row in rows)
+            self._sheet.write(xml.encode('utf-8'))
+            self.row_count += len(rows)
+        return len(rows)
+
+    @property
+    def full(self):
+        return self.row_count >= XLSX_MAX_ROWS
+
+    def drain(self):
+        """Şimdiye kadar üretilen zip baytlarını döndürür."""
+        return self._sink.drain()
+
+    def close(self):
+        """Sayfayı ve zip arşivini kapatır, kalan baytları döndürür."""
+        self._sheet.write(_SHEET_END.encode('utf-8'))
+        self._sheet.close()
+        self._zip.close()
+        return self._sink.drain()
@@ -100,7 +100,10 @@ const ReportDetailPage = () => {
           
           reportData.parameters.forEach(param => {
             // Varsayılan değerleri ayarla
-            if (param.type === 'date' || param.type === 'datetime') {
+            if ((param.type === 'date' || param.type === 'datetime') && param.default_value === '') {
+              // Rapor boş tarihle çalışacak şekilde tanımlanmış (örn. tüm günler)
+              initialValues[param.name] = '';
+            } else if (param.type === 'date' || param.type === 'datetime') {
               // Bugünün tarihini YYYY-MM-DD formatında al
               const today = new Date().toISOString().split('T')[0];
               
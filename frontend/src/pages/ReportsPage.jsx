@@ -406,13 +406,20 @@ const ReportsPage = () => {
       console.log('Fetching dashboard data...');
       
       // İlgili verileri almaya çalış
+      // Dashboard raporları tek bir toplu istekte, sunucuda eşzamanlı çalıştırılır
       const requests = [
         api.get('/reports/list').catch(e => ({ data: { reports: [] } })),
         api.get('/reports/favorites').catch(e => ({ data: { favorites: [] } })),
-        api.get('/reports/summary').catch(e => ({ data: { summary: null } }))
+        api.get('/reports/summary').catch(e => ({ data: { summary: null } })),
+        api.post('/reports/batch', {
+          reports: [{ report_name: '14_Saatlik_Aktivite_Analizi', params: {} }]
+        }).catch(e => {
+          console.error('Error fetching dashboard reports:', e);
+          return { data: { results: [] } };
+        })
       ];
       
-      const [reportsResponse, favoritesResponse, summaryResponse] = await Promise.all(requests);
+      const [reportsResponse, favoritesResponse, summaryResponse, batchResponse] = await Promise.all(requests);
       
       // UI state'i güncelle
       if (reportsResponse.data && reportsResponse.data.reports) {
@@ -430,17 +437,13 @@ const ReportsPage = () => {
         console.log('Summary data fetched:', summaryResponse.data.summary);
       }
       
-      // Saatlik Aktivite raporu için çağrı
-      try {
-        // GET metodu ile rapor çalıştır
-        const hourlyActivityResponse = await api.get('/reports/run/14_Saatlik_Aktivite_Analizi');
-        
-        if (hourlyActivityResponse.data && hourlyActivityResponse.data.status === 'success') {
-          setHourlyActivity(hourlyActivityResponse.data.results || []);
-        }
-      } catch (error) {
-        console.error('Error fetching hourly activity data:', error);
-        // Hata durumunda sessizce devam et
+      // Saatlik Aktivite raporu (hata durumunda sessizce devam et)
+      const batchResults = (batchResponse.data && batchResponse.data.results) || [];
+      const hourlyActivityResult = batchResults.find(result => result.report_name === '14_Saatlik_Aktivite_Analizi');
+      if (hourlyActivityResult && hourlyActivityResult.status === 'success') {
+        setHourlyActivity(hourlyActivityResult.data || []);
+      } else if (hourlyActivityResult) {
+        console.error('Error fetching hourly activity data:', hourlyActivityResult.message);
       }
       
       setLoading(false);